@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+App-level shell for multi-screen bundles.
+
+Every page of html_screens/ carries the same chrome: a header that differs
+only by the page title and the same navigation bar. extract_shell() detects
+the chrome shared by all screens and moves it to app.json:
+
+    "shell": {
+        "appBar": {... "title": "{{screen.title}}" ...},
+        "layout": {"type": "column", "children": [<nav>, {"type": "body"}]}
+    }
+
+The app bar is shared when the app bars of all screens are identical once
+the screen's title is replaced by TITLE_PLACEHOLDER; each screen then keeps
+only its "title". Layout children that all screens start (or end) with are
+shared too and the "body" slot marks where the screen's own layout children
+go. Navigating then swaps the body instead of rebuilding the whole layout.
+
+apply_shell() rebuilds the full screen from the shell, it is what the device
+does when it renders a screen.
+"""
+from components import subtree_digest
+
+TITLE_PLACEHOLDER = "{{screen.title}}"
+BODY_SLOT = {"type": "body"}
+
+
+def _replace_strings(node, old: str, new: str):
+    """Copy of node with every string value equal to old replaced by new"""
+    if not isinstance(node, (dict, list)):
+        return new if node == old else node
+    root = {} if isinstance(node, dict) else []
+    stack = [(node, root)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                copy = {} if isinstance(value, dict) else []
+                stack.append((value, copy))
+            else:
+                copy = new if value == old else value
+            if isinstance(target, dict):
+                target[key] = copy
+            else:
+                target.append(copy)
+    return root
+
+
+def _app_bar_template(screen):
+    app_bar = screen.get("appBar")
+    if not isinstance(app_bar, dict) or not isinstance(app_bar.get("title"), str):
+        return None
+    return _replace_strings(app_bar, app_bar["title"], TITLE_PLACEHOLDER)
+
+
+def _shared_count(children_lists, reverse=False):
+    """How many leading (trailing with reverse) children all lists have in common"""
+    count = 0
+    shortest = min(len(children) for children in children_lists)
+    while count < shortest:
+        index = -1 - count if reverse else count
+        if len({subtree_digest(children[index]) for children in children_lists}) != 1:
+            break
+        count += 1
+    return count
+
+
+def extract_shell(screens: dict):
+    """
+    Move the chrome shared by all screens ({name: screen}) to a shell. The
+    screens are modified in place.
+
+    Returns:
+        the shell, or None when the screens share nothing (screens unchanged)
+    """
+    screens = [s for s in screens.values() if isinstance(s, dict)]
+    if len(screens) < 2:
+        return None
+
+    shell = {}
+    templates = [_app_bar_template(screen) for screen in screens]
+    if all(t is not None for t in templates) and len({subtree_digest(t) for t in templates}) == 1:
+        shell["appBar"] = templates[0]
+
+    layouts = [screen.get("layout") for screen in screens]
+    lead = trail = 0
+    if all(isinstance(layout, dict) and isinstance(layout.get("children"), list) for layout in layouts) \
+            and len({layout.get("type") for layout in layouts}) == 1:
+        children_lists = [layout["children"] for layout in layouts]
+        lead = _shared_count(children_lists)
+        trail = _shared_count([children[lead:] for children in children_lists], reverse=True)
+        if lead or trail:
+            first = children_lists[0]
+            shell["layout"] = {
+                "type": layouts[0]["type"],
+                "children": first[:lead] + [dict(BODY_SLOT)] + first[len(first) - trail:],
+            }
+
+    if not shell:
+        return None
+
+    for screen in screens:
+        if "appBar" in shell:
+            # The title takes the app bar's place, after type and id
+            title = screen.pop("appBar")["title"]
+            rest = {k: screen.pop(k) for k in list(screen) if k not in ("type", "id")}
+            screen["title"] = title
+            screen.update(rest)
+        if "layout" in shell:
+            children = screen["layout"]["children"]
+            screen["layout"]["children"] = children[lead:len(children) - trail]
+    return shell
+
+
+def apply_shell(shell: dict, screen):
+    """The full screen (a new dict) with the shell's chrome put back"""
+    if not shell or not isinstance(screen, dict):
+        return screen
+    screen = dict(screen)
+    rebuilt = {}
+    for key in ("type", "id"):
+        if key in screen:
+            rebuilt[key] = screen.pop(key)
+    if "appBar" in shell and "title" in screen:
+        rebuilt["appBar"] = _replace_strings(shell["appBar"], TITLE_PLACEHOLDER, screen.pop("title"))
+    if "layout" in shell and isinstance(screen.get("layout"), dict):
+        layout = dict(screen.pop("layout"))
+        children = []
+        for child in shell["layout"]["children"]:
+            if child == BODY_SLOT:
+                children.extend(layout.get("children", []))
+            else:
+                children.append(child)
+        layout["children"] = children
+        rebuilt["layout"] = layout
+    rebuilt.update(screen)
+    return rebuilt
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Content-addressed asset store shared by the converters.
+
+Assets are named after a hash of their contents (assets/<hash>.<ext>), so
+an image referenced from several screens - or under several names, or two
+different logo.png files from different directories - ends up in the
+bundle exactly as often as there are distinct contents.
+
+Images can optionally be optimized for the device (requires Pillow):
+
+    webp     - re-encode raster images as WebP
+    density  - downscale images with width/height attributes to at most
+               density device pixels per CSS pixel (never upscaled)
+
+Optimized images are kept in a store directory keyed by source hash and
+settings, so other screens, other apps converted into the same output
+directory and later builds reuse them instead of encoding again. The
+optimization runs in a thread pool (Pillow releases the GIL while resizing
+and encoding) while finished assets are written to the bundle in order.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_cache import file_digest
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+STORE_DIR_NAME = ".asset_store"
+DEFAULT_QUALITY = 80
+
+# Raster formats that are worth re-encoding (GIF is skipped - it may be animated)
+OPTIMIZABLE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def _require_pillow():
+    if Image is None:
+        raise ValueError("Image optimization (--webp / --density) requires: pip install Pillow")
+
+
+def _image_size(path: Path):
+    """(width, height) of a raster image Pillow can read, else None"""
+    if path.suffix.lower() not in OPTIMIZABLE_SUFFIXES:
+        return None
+    try:
+        with Image.open(path) as im:
+            return im.size
+    except Exception:
+        return None
+
+
+def _fit(size, box):
+    """size scaled down (keeping the aspect ratio) to fit box, None if it already fits"""
+    width, height = size
+    box_width, box_height = box
+    scale = min(box_width / width if box_width else 1.0, box_height / height if box_height else 1.0)
+    if scale >= 1.0:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def optimize_image(source, size=None, webp=False, quality=DEFAULT_QUALITY) -> bytes:
+    """Image bytes resized to size (if given) and re-encoded (WebP, or the source format)"""
+    _require_pillow()
+    with Image.open(source) as im:
+        fmt = "WEBP" if webp else im.format
+        if size:
+            im = im.resize(size, Image.LANCZOS)
+        if fmt == "JPEG" and im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        out = io.BytesIO()
+        options = {"quality": quality} if fmt in ("WEBP", "JPEG") else {"optimize": True}
+        im.save(out, format=fmt, **options)
+        return out.getvalue()
+
+
+class AssetStore:
+    """The assets of one bundle, named by content"""
+
+    def __init__(self, store_dir=None, webp: bool = False, density: float = None,
+                 quality: int = DEFAULT_QUALITY, jobs: int = None):
+        """
+        Args:
+            store_dir: directory for optimized images, shared between builds (None - in memory)
+            webp: re-encode raster images as WebP
+            density: device pixels per CSS pixel to downscale to (None - keep the size)
+            quality: WebP / JPEG quality
+            jobs: optimization threads (None - default of ThreadPoolExecutor)
+        """
+        if webp or density:
+            _require_pillow()
+        self.store_dir = Path(store_dir) if store_dir else None
+        self.webp = webp
+        self.density = density
+        self.quality = quality
+        self.jobs = jobs
+        self.assets = {}        # archive name -> (source, target size or None, webp)
+        self.references = 0     # add() calls, including duplicates
+        self._digests = {}      # resolved source path -> content hash
+
+    @property
+    def optimizing(self) -> bool:
+        return bool(self.webp or self.density)
+
+    def _digest(self, source: Path) -> str:
+        path = source.resolve()
+        if path not in self._digests:
+            self._digests[path] = file_digest(path)
+        return self._digests[path]
+
+    def _plan(self, source: Path, width, height):
+        """(target size or None, webp) for an image"""
+        if not self.optimizing:
+            return None, False
+        size = _image_size(source)
+        if size is None:
+            return None, False
+        target = None
+        if self.density and (width or height):
+            box = (width * self.density if width else 0, height * self.density if height else 0)
+            target = _fit(size, box)
+        return target, self.webp
+
+    def add(self, source, width: int = None, height: int = None) -> str:
+        """
+        Register an asset file, width/height being its display size in CSS
+        pixels (if known). Returns its path inside the bundle.
+        """
+        source = Path(source)
+        digest = self._digest(source)
+        target, webp = self._plan(source, width, height)
+        suffix = source.suffix.lower()
+        if target or webp:
+            settings = f"{digest}:{target}:{webp}:{self.quality}"
+            digest = hashlib.sha256(settings.encode("ascii")).hexdigest()
+            suffix = ".webp" if webp else suffix
+        name = f"assets/{digest[:16]}{suffix}"
+        self.assets.setdefault(name, (source, target, webp))
+        self.references += 1
+        return name
+
+    def _materialize(self, item):
+        """Path of the file to add for an asset, or its bytes when optimized without a store"""
+        name, (source, target, webp) = item
+        if not (target or webp):
+            return source
+        stored = self.store_dir / Path(name).name if self.store_dir else None
+        if stored is not None and stored.is_file():
+            return stored
+        data = optimize_image(source, target, webp, self.quality)
+        if stored is None:
+            return data
+        # Atomic, other converter processes may share the store
+        stored.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=stored.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, stored)
+        return stored
+
+    def write(self, bundle):
+        """Optimize (in parallel) and add every asset to the bundle"""
+        items = list(self.assets.items())
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for (name, _), result in zip(items, pool.map(self._materialize, items)):
+                if isinstance(result, bytes):
+                    bundle.write_asset(name, result)
+                else:
+                    bundle.write_file(name, result)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Converter benchmark suite.
+
+Runs every converter end to end over html_screens/, the Caspit page (plain
+and .gz), the Caspit page scaled up and generated pages (synthetic_pages.py,
+fixed seed), and splits the time of each run into stages:
+
+    read       - reading the input (including gunzip for .gz)
+    parse      - make_soup()
+    extract    - state / styles / actions extraction and DOM indexing
+    convert    - tree conversion (everything not attributed elsewhere)
+    serialize  - encoding bundle documents
+    zip        - writing entries to the ZIP archive
+
+Stages are measured by wrapping the functions that implement them, with
+nested calls subtracted, so the converters run unmodified. Each run is
+repeated and the median is reported.
+
+    python benchmark.py [--repeat N] [--scale 4 16] [--synthetic 2000 10000] [--json results.json]
+    python benchmark.py --json new.json --compare old.json
+    python benchmark.py --form-scaling 5000
+
+--form-scaling checks that the DOM index and the form conversion of
+HTMLToZipConverter stay linear in the number of form inputs.
+
+The JSON results can be compared across versions with --compare.
+"""
+import contextlib
+import gzip
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bundle_writer
+import convert_multiple_html_to_zip
+import html_to_runtime_converter_v3
+import html_to_zip_converter
+from bundle_writer import BundleWriter
+from compression_policy import DEFAULT_POLICY, available_policies
+from html_parsers import DEFAULT_PARSER, PARSERS
+from synthetic_pages import generate_page
+
+ROOT = Path(__file__).resolve().parent.parent
+STAGES = ["read", "parse", "extract", "convert", "serialize", "zip"]
+
+
+class StageTimer:
+    """Attributes wall time to stages, excluding time spent in nested stages"""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self._stack = []
+        self._patches = []
+
+    def wrap(self, owner, name, stage):
+        """Replace owner.name with a version that counts its time as stage"""
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = self._stack.pop()
+                self.totals[stage] += elapsed - nested
+                if self._stack:
+                    self._stack[-1] += elapsed
+
+        self._patches.append((owner, name, original))
+        setattr(owner, name, timed)
+
+    def restore(self):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+
+
+def _instrument(timer):
+    """Wrap the stage functions of every converter"""
+    modules = (convert_multiple_html_to_zip, html_to_zip_converter, html_to_runtime_converter_v3)
+    for module in modules:
+        timer.wrap(module, "make_soup", "parse")
+    for module in modules + (bundle_writer,):
+        for name in ("encode_document", "encode_json"):
+            if hasattr(module, name):
+                timer.wrap(module, name, "serialize")
+    timer.wrap(BundleWriter, "write_bytes", "zip")
+    timer.wrap(BundleWriter, "write_file", "zip")
+    timer.wrap(BundleWriter, "close", "zip")
+
+    timer.wrap(convert_multiple_html_to_zip.MultiScreenConverter, "extract_vue_state", "extract")
+    timer.wrap(html_to_runtime_converter_v3.RuntimeConverter, "extract_vue_state", "extract")
+    for name in ("_build_index", "_extract_styles", "_extract_actions"):
+        timer.wrap(html_to_zip_converter.HTMLToZipConverter, name, "extract")
+
+
+# =========================================================
+# Converters
+# =========================================================
+# Each runner converts a list of files and returns the files it failed on
+def _run_multi(html_files, out_dir, args):
+    converter = convert_multiple_html_to_zip.MultiScreenConverter(
+        str(html_files[0].parent), str(out_dir), parser=args.parser, use_cache=False, fmt=args.format,
+        compression=args.compression)
+    converter.run()
+    return {}
+
+
+def _run_html_to_zip(html_files, out_dir, args):
+    failed = {}
+    for html_file in html_files:
+        try:
+            converter = html_to_zip_converter.HTMLToZipConverter(
+                str(html_file), str(out_dir), parser=args.parser, write_json_dir=False, fmt=args.format,
+                compression=args.compression)
+            converter.convert()
+        except Exception as e:
+            failed[html_file.name] = f"{type(e).__name__}: {e}"
+    return failed
+
+
+def _run_v3(html_files, out_dir, args):
+    failed = {}
+    for html_file in html_files:
+        try:
+            converter = html_to_runtime_converter_v3.RuntimeConverter(
+                str(html_file), str(out_dir), parser=args.parser, fmt=args.format,
+                compression=args.compression)
+            converter.run()
+        except Exception as e:
+            failed[html_file.name] = f"{type(e).__name__}: {e}"
+    return failed
+
+
+CONVERTERS = {
+    "multi": _run_multi,
+    "html_to_zip": _run_html_to_zip,
+    "runtime_v3": _run_v3,
+}
+
+
+# =========================================================
+# Inputs
+# =========================================================
+def _scaled_page(html: str, factor: int) -> str:
+    """The page with its <body> content repeated factor times"""
+    start = html.find(">", html.lower().find("<body")) + 1
+    end = html.lower().rfind("</body>")
+    if start <= 0 or end < start:
+        return html
+    return html[:start] + html[start:end] * factor + html[end:]
+
+
+def _prepare_inputs(work_dir, scales, synthetic=(), seed=0):
+    """
+    Materialize the benchmark inputs as directories of .html files.
+
+    Returns:
+        [(name, [html files], input bytes, read function)]
+    """
+    inputs = []
+
+    def add(name, sources, read=None):
+        input_dir = work_dir / name
+        input_dir.mkdir(parents=True)
+        files = []
+        for file_name, text in sources:
+            path = input_dir / file_name
+            path.write_text(text, encoding="utf-8")
+            files.append(path)
+        size = sum(len(text.encode("utf-8")) for _, text in sources)
+        inputs.append((name, files, size, read))
+
+    screens = sorted((ROOT / "html_screens").glob("*.html"))
+    if screens:
+        add("html_screens", [(f.name, f.read_text(encoding="utf-8")) for f in screens],
+            lambda: [f.read_bytes() for f in screens])
+
+    caspit = ROOT / "caspit-test-standalone.html"
+    if caspit.exists():
+        html = caspit.read_text(encoding="utf-8")
+        add("caspit", [(caspit.name, html)], caspit.read_bytes)
+        for factor in scales:
+            add(f"caspit_x{factor}", [(caspit.name, _scaled_page(html, factor))])
+
+    caspit_gz = caspit.with_name(caspit.name + ".gz")
+    if caspit_gz.exists():
+        add("caspit_gz", [(caspit.name, gzip.decompress(caspit_gz.read_bytes()).decode("utf-8"))],
+            lambda: gzip.decompress(caspit_gz.read_bytes()))
+
+    for elements in synthetic:
+        add(f"synthetic_{elements}", [("synthetic.html", generate_page(seed=seed, elements=elements))])
+    return inputs
+
+
+# =========================================================
+# Form scaling check
+# =========================================================
+def _form_page(inputs: int, depth: int) -> str:
+    """A page with one <form> of labelled inputs, each nested depth divs deep"""
+    fields = "".join(
+        "<div>" * depth
+        + f'<label for="f{i}">שדה {i}</label><input id="f{i}" name="f{i}" type="text">'
+        + "</div>" * depth
+        for i in range(inputs)
+    )
+    return (f'<html><body><form id="big">{fields}<button type="submit">שליחה</button></form>'
+            f'<input form="big" name="outside"></body></html>')
+
+
+def form_scaling(inputs: int, depth: int = 20, repeat: int = 5, max_ratio: float = 1.5):
+    """
+    Time the DOM index and the form conversion of HTMLToZipConverter on forms
+    of inputs and 2 * inputs fields. Linear work keeps the time per field
+    about the same; returns True if the larger form's time per field is
+    within max_ratio of the smaller one's.
+    """
+    per_field = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (inputs, 2 * inputs):
+            page = Path(tmp) / f"form_{n}.html"
+            page.write_text(_form_page(n, depth), encoding="utf-8")
+            with contextlib.redirect_stdout(io.StringIO()):
+                converter = html_to_zip_converter.HTMLToZipConverter(str(page), tmp)
+            form = converter.elements_by_id["big"]
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                converter._build_index()
+                result = converter._parse_form(form)
+                runs.append((time.perf_counter() - start) * 1000)
+            assert len(result["fields"]) == n + 1
+            ms = statistics.median(runs)
+            per_field.append(ms / n)
+            print(f"{n:>8} inputs (depth {depth}): {ms:>9.1f} ms  {ms / n * 1000:>7.2f} us/input")
+    ratio = per_field[1] / per_field[0]
+    print(f"time per input x{ratio:.2f} for 2x inputs (limit x{max_ratio})")
+    return ratio <= max_ratio
+
+
+# =========================================================
+# Runner
+# =========================================================
+def _measure(run, html_files, read, args):
+    """One timed run, returns {stage: ms}, total ms and the files that failed"""
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        _instrument(timer)
+        try:
+            start = time.perf_counter()
+            if read is not None:
+                read_start = time.perf_counter()
+                read()
+                timer.totals["read"] += time.perf_counter() - read_start
+            failed = run(html_files, Path(tmp), args)
+            total = time.perf_counter() - start
+        finally:
+            timer.restore()
+    stages = dict(timer.totals)
+    stages["convert"] = max(total - sum(v for k, v in stages.items() if k != "convert"), 0.0)
+    return {k: v * 1000 for k, v in stages.items()}, total * 1000, failed
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = _prepare_inputs(Path(tmp), args.scale, args.synthetic, args.seed)
+        for input_name, html_files, size, read in inputs:
+            for converter_name in args.converters:
+                run = CONVERTERS[converter_name]
+                record = {"converter": converter_name, "input": input_name, "bytes": size,
+                          "stages": None, "total": None, "error": None, "failed_files": {}}
+                runs = []
+                try:
+                    for _ in range(args.repeat):
+                        runs.append(_measure(run, html_files, read, args))
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                if runs and record["error"] is None:
+                    record["stages"] = {
+                        stage: round(statistics.median(r[0][stage] for r in runs), 3) for stage in STAGES
+                    }
+                    record["total"] = round(statistics.median(r[1] for r in runs), 3)
+                    record["failed_files"] = runs[-1][2]
+                results.append(record)
+                print(f"  {converter_name:<12} {input_name:<16} "
+                      f"{record['total'] if record['total'] is not None else record['error']}",
+                      file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parser": args.parser,
+            "format": args.format,
+            "compression": args.compression,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def print_table(report, baseline=None):
+    base = {}
+    if baseline:
+        base = {(r["converter"], r["input"]): r for r in baseline["results"]}
+
+    header = f"{'converter':<12} {'input':<16} {'KB':>7} " + " ".join(f"{s:>9}" for s in STAGES) + f" {'total':>9}"
+    if base:
+        header += f" {'vs base':>8}"
+    print(header)
+    for r in report["results"]:
+        line = f"{r['converter']:<12} {r['input']:<16} {r['bytes'] / 1024:>7.1f} "
+        if r["error"]:
+            print(line + f"error: {r['error']}")
+            continue
+        line += " ".join(f"{r['stages'][s]:>9.2f}" for s in STAGES) + f" {r['total']:>9.2f}"
+        old = base.get((r["converter"], r["input"]))
+        if old and old.get("total"):
+            line += f" {old['total'] / r['total']:>7.2f}x"
+        print(line)
+        for name, error in r["failed_files"].items():
+            print(f"  ! {name}: {error}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the HTML converters stage by stage")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per converter and input (median is reported)")
+    parser.add_argument("--scale", type=int, nargs="*", default=[4, 16],
+                        help="synthetic inputs: the Caspit page body repeated N times")
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[2000, 10000],
+                        help="generated inputs: pages with about N elements")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated pages")
+    parser.add_argument("--converters", nargs="+", choices=list(CONVERTERS), default=list(CONVERTERS))
+    parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER)
+    parser.add_argument("--format", choices=bundle_writer.FORMATS, default=bundle_writer.DEFAULT_FORMAT)
+    parser.add_argument("--compression", choices=available_policies(), default=DEFAULT_POLICY)
+    parser.add_argument("--json", help='write the results as JSON to this file ("-" for stdout)')
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare totals against")
+    parser.add_argument("--form-scaling", type=int, metavar="N",
+                        help="only check that indexing and converting a form of N and 2N inputs scales linearly")
+    args = parser.parse_args()
+
+    if args.form_scaling:
+        return 0 if form_scaling(args.form_scaling, repeat=args.repeat) else 1
+
+    report = run_benchmarks(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(report, baseline)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults written to {args.json}")
+
+    return 1 if any(r["error"] for r in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
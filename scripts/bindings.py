@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Per-screen binding dependency index.
+
+Without it, a client has to re-evaluate a whole screen whenever any state
+key changes. index_screen() finds the state every node reads - visibleIf
+(v-if / v-show), bindTo (v-model), classBinding (:class) and {{ }}
+interpolations in its text - and records it in the screen:
+
+    "dependencies": {
+      "activeTab": ["main.1", "main.4", ...],
+      "config.brokerUrl": ["main.17"],
+      ...
+    }
+
+Keys are state paths: the longest member chain (config.brokerUrl) that
+exists in state.json, so a change of config.brokerUrl touches only the
+widgets listed under it and under "config". Variables that are not state
+(v-for items, computed properties, methods) are left out - without a
+state.json nothing is indexed. Nodes that read state get an "id"
+(<screen>.<n>, in document order) unless they have one.
+
+The app shell and the components are indexed the same way under their own
+scope ("shell.<n>", "<component id>.<n>"), after they are taken out of the
+screens - ids would otherwise make the shared chrome differ per screen.
+
+Click handlers only write state and are not indexed.
+"""
+import re
+
+from expressions import compile_expression
+
+DEPENDENCIES_KEY = "dependencies"
+
+# Node keys holding an expression that is read
+READ_KEYS = ("visibleIf", "bindTo", "classBinding")
+
+_INTERPOLATION = re.compile(r"\{\{(.*?)\}\}", re.S)
+
+
+def _path(node):
+    """["v", "a"] / [".", [".", ["v", "a"], "b"], "c"] -> ["a", "b", "c"], else None"""
+    names = []
+    while isinstance(node, list) and node[0] in (".", "?."):
+        names.append(node[2])
+        node = node[1]
+    if isinstance(node, list) and node[0] == "v":
+        names.append(node[1])
+        return names[::-1]
+    return None
+
+
+def _state_path(names, state):
+    """The longest prefix of names that is a state path, None if the root is not state"""
+    if not state or names[0] not in state:
+        return None
+    value, depth = state[names[0]], 1
+    while depth < len(names) and isinstance(value, dict) and names[depth] in value:
+        value = value[names[depth]]
+        depth += 1
+    return ".".join(names[:depth])
+
+
+def expression_dependencies(source: str, state=None) -> set:
+    """State paths read by an expression (empty if it can't be parsed)"""
+    try:
+        ast = compile_expression(source)
+    except (ValueError, RecursionError):
+        return set()
+    found = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, list):
+            continue
+        names = _path(node)
+        if names is not None:
+            path = _state_path(names, state)
+            if path:
+                found.add(path)
+            continue
+        if node[0] == "call" and _path(node[1]) is not None:
+            # Method call - only the arguments (and an object it is called on) are read
+            if node[1][0] != "v":
+                stack.append(node[1][1])
+            stack.extend(node[2:])
+            continue
+        if node[0] in (".", "?."):
+            stack.append(node[1])
+        elif node[0] == "obj":
+            stack.extend(node[2::2])
+        else:
+            stack.extend(node[1:])
+    return found
+
+
+def node_dependencies(node: dict, state=None) -> set:
+    """State paths one node (not its children) reads"""
+    found = set()
+    for key, value in node.items():
+        if not isinstance(value, str):
+            continue
+        if key in READ_KEYS:
+            found |= expression_dependencies(value, state)
+        elif "{{" in value:
+            for match in _INTERPOLATION.finditer(value):
+                found |= expression_dependencies(match.group(1), state)
+    return found
+
+
+def index_screen(screen: dict, state=None, screen_id: str = None, include_root: bool = False) -> dict:
+    """
+    Add ids to the nodes of screen that read state and its "dependencies"
+    index (state path -> node ids), in place. Returns the index.
+    include_root also indexes screen itself (the root of a component is a widget).
+    """
+    screen_id = screen_id or screen.get("id", "screen")
+    index = {}
+    counter = 0
+    stack = [screen]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            found = node_dependencies(node, state) if include_root or node is not screen else set()
+            if found:
+                if "id" not in node:
+                    counter += 1
+                    node["id"] = f"{screen_id}.{counter}"
+                for path in found:
+                    index.setdefault(path, []).append(node["id"])
+            values = node.values()
+        else:
+            values = node
+        # Reversed - ids follow document order
+        stack.extend(reversed([v for v in values if isinstance(v, (dict, list))]))
+    if index:
+        screen[DEPENDENCIES_KEY] = {path: index[path] for path in sorted(index)}
+    return index
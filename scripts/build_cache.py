@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Incremental build cache shared by the converters.
+
+A manifest (.build_cache.json) in the output directory maps each input to
+the SHA-256 of everything its output depends on: the HTML bytes, the local
+images it references, the converter source code and the conversion
+options. When the key is unchanged the converter reuses the previous
+output instead of parsing the HTML again.
+
+Cached documents (e.g. serialized screens) are kept as content-addressed
+blobs next to the manifest, so the manifest stays small and outputs can be
+copied into a bundle without being decoded.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+MANIFEST_NAME = ".build_cache.json"
+MANIFEST_VERSION = 2
+
+_IMG_SRC = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.I)
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def code_fingerprint(*module_files) -> str:
+    """Digest of the converter sources - any code change invalidates the cache"""
+    h = hashlib.sha256()
+    for module_file in module_files:
+        h.update(file_digest(module_file).encode("ascii"))
+    return h.hexdigest()
+
+
+def referenced_images(html_text: str):
+    """Local <img src> references, found without parsing the document"""
+    return sorted({
+        src for src in _IMG_SRC.findall(html_text)
+        if not src.startswith(("http:", "https:", "data:", "//"))
+    })
+
+
+def input_key(html_bytes: bytes, images=(), fingerprint: str = "", options=None) -> str:
+    """Cache key for one HTML input"""
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(html_bytes).digest())
+    for src in images:
+        path = Path(src)
+        digest = file_digest(path) if path.is_file() else "missing"
+        h.update(f"\0img:{src}={digest}".encode("utf-8"))
+    h.update(f"\0code:{fingerprint}".encode("utf-8"))
+    h.update(("\0opts:" + json.dumps(options or {}, sort_keys=True)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def combine_keys(keys) -> str:
+    """Key for an output built from several inputs"""
+    h = hashlib.sha256()
+    for key in keys:
+        h.update(key.encode("utf-8"))
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Persistent manifest of cache keys and cached outputs"""
+
+    def __init__(self, output_dir, enabled: bool = True):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.blob_dir = self.path.with_suffix("")
+        self.enabled = enabled
+        self.entries = {}
+        self.dirty = False
+        if enabled and self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == MANIFEST_VERSION:
+                    self.entries = manifest.get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, name: str, key: str):
+        """Cached record for name if it was built from the same key"""
+        if not self.enabled:
+            return None
+        record = self.entries.get(name)
+        if record and record.get("key") == key:
+            return record
+        return None
+
+    def lookup_file(self, name: str, key: str, output_file):
+        """Like lookup(), but also checks the cached output file is intact"""
+        record = self.lookup(name, key)
+        if record is None:
+            return None
+        output_file = Path(output_file)
+        if not output_file.is_file() or file_digest(output_file) != record.get("sha256"):
+            return None
+        return record
+
+    def store(self, name: str, key: str, **data):
+        if not self.enabled:
+            return
+        self.entries[name] = {"key": key, **data}
+        self.dirty = True
+
+    def store_file(self, name: str, key: str, output_file, **data):
+        self.store(name, key, sha256=file_digest(output_file), **data)
+
+    def put_blob(self, data: bytes):
+        """Store a cached document, returns its digest (None when disabled)"""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_dir / digest
+        if not path.exists():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(digest + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_blob(self, digest):
+        """Cached document bytes, or None if the blob is missing"""
+        if not (self.enabled and digest):
+            return None
+        try:
+            return (self.blob_dir / digest).read_bytes()
+        except OSError:
+            return None
+
+    def save(self):
+        if not (self.enabled and self.dirty):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+        # Drop blobs no entry refers to anymore
+        if self.blob_dir.is_dir():
+            referenced = {record.get("blob") for record in self.entries.values()}
+            for blob in self.blob_dir.iterdir():
+                if blob.name not in referenced:
+                    blob.unlink()
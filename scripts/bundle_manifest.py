@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+manifest.json - what a bundle holds, without opening its entries.
+
+BundleWriter records every entry it writes and adds manifest.json as the
+last entry of the archive:
+
+    {
+      "version": 1,
+      "format": "json",
+      "entries": {
+        "screens/home.json": {
+          "sha256": "...", "size": 2711, "compressedSize": 601,
+          "depends": {"actions": ["navigate_map"], "assets": [...], "components": [...]}
+        },
+        ...
+      }
+    }
+
+sha256 and size are those of the uncompressed entry, compressedSize is its
+size inside the ZIP. "depends" lists the actions (actions.json), assets and
+shared components (components.json) a document refers to, plus the
+sub-screens it loads on demand ("src" of lazily loaded tabs), so a client can
+fetch and verify a single screen and what it needs, and skip entries whose
+hash it already has. manifest.json is always JSON, like app.json.
+"""
+import hashlib
+
+from components import is_ref
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def document_dependencies(document) -> dict:
+    """
+    {"actions": [...], "assets": [...], "components": [...], "screens": [...]}
+    a document refers to (empty kinds left out)
+    """
+    actions, assets, refs, screens = set(), set(), set(), set()
+    stack = [document] if isinstance(document, (dict, list)) else []
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if is_ref(node):
+                refs.add(node["ref"])
+            action = node.get("action")
+            if isinstance(action, str) and action:
+                actions.add(action)
+            asset = node.get("asset")
+            if isinstance(asset, str) and asset.startswith("assets/"):
+                assets.add(asset)
+            src = node.get("src")
+            if isinstance(src, str) and src.startswith("screens/"):
+                screens.add(src)
+            values = node.values()
+        else:
+            values = node
+        stack.extend(v for v in values if isinstance(v, (dict, list)))
+
+    depends = {}
+    for kind, found in (("actions", actions), ("assets", assets), ("components", refs),
+                        ("screens", screens)):
+        if found:
+            depends[kind] = sorted(found)
+    return depends
+
+
+class BundleManifest:
+    """Entries of a bundle being written"""
+
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self.entries = {}
+
+    def add(self, info, sha256: str, depends: dict = None):
+        """Record an entry from its ZipInfo (after it was written) and content hash"""
+        entry = {"sha256": sha256, "size": info.file_size, "compressedSize": info.compress_size}
+        if depends:
+            entry["depends"] = depends
+        self.entries[info.filename] = entry
+
+    def document(self) -> dict:
+        return {"version": MANIFEST_VERSION, "format": self.format, "entries": self.entries}
+
+
+def verify_entries(zf, manifest: dict):
+    """Names of the entries of an open bundle that don't match its manifest (missing ones included)"""
+    bad = []
+    for name, entry in manifest.get("entries", {}).items():
+        try:
+            data = zf.read(name)
+        except KeyError:
+            bad.append(name)
+            continue
+        if len(data) != entry["size"] or hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            bad.append(name)
+    return bad
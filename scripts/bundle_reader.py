@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Reader for the bundles written by the converters.
+
+Works for every document format (see bundle_writer.FORMATS): the format is
+taken from app.json and every document is returned decoded, keyed by its
+.json name, so a bundle reads back the same whatever --format it was built
+with. References to shared components (components.py) are expanded and the
+app shell (app_shell.py) is put back into the screens. manifest.json is
+bundle metadata, not a document: read_manifest() returns it and
+verify_bundle() checks the entries against it.
+
+Running this file builds the multi-screen bundle of html_screens/ in every
+installed format, with and without shell and shared components, checks each one reads
+back identical to the JSON bundle (and matches its manifest) and compares
+size and decode time:
+
+    python bundle_reader.py [html_dir] [--repeat N]
+"""
+import json
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import app_shell
+import components
+from bundle_manifest import MANIFEST_NAME, verify_entries
+from bundle_writer import DEFAULT_FORMAT, FORMAT_EXTENSIONS, FORMATS, available_formats, decode_document
+
+
+def bundle_format(zf: zipfile.ZipFile) -> str:
+    """Document format of an open bundle"""
+    app = json.loads(zf.read("app.json").decode("utf-8"))
+    return app.get("format", DEFAULT_FORMAT)
+
+
+def read_bundle(path, expand: bool = True):
+    """
+    Decode every document of a bundle. With expand, component references are
+    replaced by the components (components.json is left out) and the screens
+    get the chrome of the app shell back.
+
+    Returns:
+        (format, {".json" name: document}) - assets and other files are skipped
+    """
+    with zipfile.ZipFile(path) as zf:
+        fmt = bundle_format(zf)
+        ext = FORMAT_EXTENSIONS[fmt]
+        documents = {}
+        for name in zf.namelist():
+            if name == MANIFEST_NAME:
+                continue
+            if name == "app.json":
+                app = json.loads(zf.read(name).decode("utf-8"))
+                app.pop("format", None)
+                documents[name] = app
+            elif name.endswith(ext):
+                key = name[:-len(ext)] + ".json"
+                documents[key] = decode_document(zf.read(name), fmt)
+    if "routes.json" in documents:
+        documents["routes.json"] = {
+            route: _json_name(target, ext) for route, target in documents["routes.json"].items()
+        }
+    if "components" in documents.get("app.json", {}):
+        if not expand:
+            documents["app.json"]["components"] = components.COMPONENTS_NAME
+        else:
+            del documents["app.json"]["components"]
+            table = documents.pop(components.COMPONENTS_NAME, {})
+            documents = {name: components.expand(doc, table) for name, doc in documents.items()}
+    if expand and "shell" in documents.get("app.json", {}):
+        shell = documents["app.json"].pop("shell")
+        for name in documents.get("routes.json", {}).values():
+            if name in documents:
+                documents[name] = app_shell.apply_shell(shell, documents[name])
+    return fmt, documents
+
+
+def read_manifest(path) -> dict:
+    """manifest.json of a bundle ({} for bundles written before it existed)"""
+    with zipfile.ZipFile(path) as zf:
+        if MANIFEST_NAME not in zf.namelist():
+            return {}
+        return json.loads(zf.read(MANIFEST_NAME).decode("utf-8"))
+
+
+def verify_bundle(path):
+    """Entries of a bundle that don't match its manifest (every entry must be listed)"""
+    manifest = read_manifest(path)
+    with zipfile.ZipFile(path) as zf:
+        bad = verify_entries(zf, manifest)
+        listed = manifest.get("entries", {})
+        bad += [name for name in zf.namelist() if name != MANIFEST_NAME and name not in listed]
+    return bad
+
+
+def _json_name(name: str, ext: str) -> str:
+    return name[:-len(ext)] + ".json" if name.endswith(ext) else name
+
+
+# =========================================================
+# Format comparison
+# =========================================================
+# Bundle options compared for every format: (label suffix, converter options)
+VARIANTS = [
+    ("", {}),
+    ("+comp", {"shared_components": True}),
+    ("+shell", {"shell": True}),
+    ("+shell+comp", {"shared_components": True, "shell": True}),
+]
+
+
+def _build(html_dir, fmt, work_dir, options):
+    from convert_multiple_html_to_zip import MultiScreenConverter
+
+    out_dir = work_dir / (fmt + "".join(sorted(options)))
+    converter = MultiScreenConverter(str(html_dir), str(out_dir), use_cache=False, fmt=fmt, **options)
+    return converter.run()
+
+
+def _decode_ms(zip_path, repeat):
+    """Median time (ms) to decode every document of a bundle"""
+    with zipfile.ZipFile(zip_path) as zf:
+        fmt = bundle_format(zf)
+        blobs = [zf.read(n) for n in zf.namelist() if n not in ("app.json", MANIFEST_NAME)]
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for blob in blobs:
+            decode_document(blob, fmt)
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+def _sizes(zip_path):
+    """(document bytes, bytes after deflate) of a bundle"""
+    raw = deflated = 0
+    with zipfile.ZipFile(zip_path) as zf, tempfile.TemporaryFile() as tmp:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+            for info in zf.infolist():
+                raw += info.file_size
+                out.writestr(info.filename, zf.read(info.filename))
+        for info in zipfile.ZipFile(tmp).infolist():
+            deflated += info.compress_size
+    return raw, deflated
+
+
+def main():
+    import argparse
+    import contextlib
+    import io
+
+    parser = argparse.ArgumentParser(description="Check and compare bundle formats")
+    parser.add_argument("html_dir", nargs="?", default="./html_screens")
+    parser.add_argument("--repeat", type=int, default=20, help="decode runs per format (median is reported)")
+    args = parser.parse_args()
+
+    if not list(Path(args.html_dir).glob("*.html")):
+        print(f"No HTML files found in {args.html_dir}")
+        return 1
+
+    rows = []
+    failures = 0
+    reference = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in available_formats():
+            for suffix, options in VARIANTS:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    zip_path = _build(args.html_dir, fmt, Path(tmp), options)
+                read_fmt, documents = read_bundle(zip_path)
+                if reference is None:
+                    reference = documents
+                same = read_fmt == fmt and documents == reference and not verify_bundle(zip_path)
+                failures += not same
+                raw, deflated = _sizes(zip_path)
+                rows.append((fmt + suffix, raw, deflated, _decode_ms(zip_path, args.repeat), same))
+
+    base = rows[0]
+    print(f"{len(reference)} documents, reference: {base[0]}\n")
+    print(f"{'format':<20} {'raw KB':>9} {'vs ref':>7} {'deflate KB':>11} {'decode ms':>10} {'vs ref':>7}  round-trip")
+    for fmt, raw, deflated, ms, same in rows:
+        print(f"{fmt:<20} {raw / 1024:>9.1f} {raw / base[1]:>6.0%} {deflated / 1024:>11.1f} "
+              f"{ms:>10.2f} {base[3] / ms:>6.2f}x  {'identical' if same else 'DIFFERS'}")
+
+    missing = [f for f in FORMATS if f not in (r[0] for r in rows)]
+    if missing:
+        print(f"\nNot installed: {', '.join(missing)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
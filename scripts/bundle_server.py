@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Local server for converter output - bundles, pages and their JSONs.
+
+Serves a directory over HTTP the way a device expects its updates:
+
+    precompressed  - foo.html is answered with foo.html.br or foo.html.gz
+                     (whichever the client accepts) when that file exists
+                     and is not older than foo.html. A page that only exists
+                     as foo.html.gz (caspit-test-standalone.html.gz) is
+                     served gzip-encoded under foo.html too.
+    ETag           - strong, the SHA-256 of the bytes sent, so each encoding
+                     has its own. Hashes are cached per file (path, size,
+                     mtime), a request does not read the file twice.
+    If-None-Match  - a device polling for an update costs a 304.
+    Range          - a single byte range (also with If-Range), so an
+                     interrupted bundle download can resume.
+
+Variants are not created on the fly; --precompress writes the missing or
+stale .gz (and .br, with pip install brotli) next to every compressible
+file before serving. Media and ZIPs are skipped - already compressed (see
+compression_policy.py).
+
+    python bundle_server.py [DIR] [--port 8000] [--bind 127.0.0.1] [--precompress]
+"""
+import gzip
+import hashlib
+import io
+import mimetypes
+import os
+import sys
+import threading
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from build_cache import file_digest
+from compression_policy import MIN_COMPRESS_BYTES, is_media
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+DEFAULT_PORT = 8000
+
+# Content-Encoding -> suffix of the precompressed variant, in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_CHUNK = 1 << 16
+
+
+def available_encodings():
+    """Encodings --precompress can write in this environment"""
+    return [encoding for encoding, _ in ENCODINGS if encoding != "br" or brotli is not None]
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # mtime=0 - the same input always gives the same bytes (and ETag)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def precompress(root) -> int:
+    """Write missing or stale .gz / .br variants under root; returns how many were written"""
+    written = 0
+    suffixes = {suffix for _, suffix in ENCODINGS}
+    for path in sorted(Path(root).rglob("*")):
+        if not path.is_file() or path.suffix in suffixes or is_media(path.name):
+            continue
+        if path.stat().st_size <= MIN_COMPRESS_BYTES:
+            continue
+        data = None
+        for encoding, suffix in ENCODINGS:
+            if encoding not in available_encodings():
+                continue
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file() and variant.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            compressed = _compress(data, encoding)
+            if len(compressed) >= len(data):
+                continue
+            tmp = variant.with_name(variant.name + ".tmp")
+            tmp.write_bytes(compressed)
+            os.replace(tmp, variant)
+            written += 1
+    return written
+
+
+def _accepted_encodings(header: str) -> set:
+    """Content codings with a non-zero q in an Accept-Encoding header"""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return accepted
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match against a strong ETag (weak comparison, as RFC 9110 asks)"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def parse_range(header: str, size: int):
+    """
+    (start, end) inclusive of a single "bytes=" range.
+
+    Returns None when the header should be ignored (not bytes, several
+    ranges, malformed) - the whole file is sent - and "unsatisfiable" when
+    it starts past the end.
+    """
+    unit, _, spec = (header or "").partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return "unsatisfiable"
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or (last and end < start):
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+class _Representation:
+    """What is sent for a request: a file (or decoded bytes) and its headers"""
+
+    def __init__(self, path: Path, content_type: str, encoding: str = None, data: bytes = None):
+        self.path = path
+        self.content_type = content_type
+        self.encoding = encoding
+        self.data = data
+        stat = path.stat()
+        self.size = len(data) if data is not None else stat.st_size
+        self.mtime = stat.st_mtime
+
+    def open(self):
+        return io.BytesIO(self.data) if self.data is not None else open(self.path, "rb")
+
+
+class BundleRequestHandler(SimpleHTTPRequestHandler):
+    """GET / HEAD of files under the server's directory"""
+
+    server_version = "DynamicUIBundleServer/1.0"
+
+    # (path, size, mtime_ns) -> sha256, shared by all handler threads
+    _digests = {}
+    _digests_lock = threading.Lock()
+
+    def _etag(self, representation: _Representation) -> str:
+        if representation.data is not None:
+            digest = hashlib.sha256(representation.data).hexdigest()
+        else:
+            stat = representation.path.stat()
+            key = (str(representation.path), stat.st_size, stat.st_mtime_ns)
+            with self._digests_lock:
+                digest = self._digests.get(key)
+            if digest is None:
+                digest = file_digest(representation.path)
+                with self._digests_lock:
+                    self._digests[key] = digest
+        return f'"{digest}"'
+
+    def _resolve(self):
+        """Requested file under the root, or None (outside the root, missing, a directory without index)"""
+        root = Path(self.directory).resolve()
+        relative = unquote(urlsplit(self.path).path).lstrip("/")
+        path = (root / relative).resolve()
+        if path != root and root not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        return path
+
+    def _select(self, path: Path):
+        """Representation of path for this client's Accept-Encoding, or None"""
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding"))
+        exists = path.is_file()
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if encoding not in accepted or not variant.is_file():
+                continue
+            # A variant older than its source is stale, the source wins
+            if exists and variant.stat().st_mtime_ns < path.stat().st_mtime_ns:
+                continue
+            return _Representation(variant, content_type, encoding)
+        if exists:
+            return _Representation(path, content_type)
+        # Only the .gz exists and the client can't take gzip - decode it here
+        variant = path.with_name(path.name + ".gz")
+        if variant.is_file():
+            with gzip.open(variant, "rb") as f:
+                return _Representation(variant, content_type, data=f.read())
+        return None
+
+    def send_head(self):
+        path = self._resolve()
+        representation = self._select(path) if path is not None else None
+        if representation is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        etag = self._etag(representation)
+        if _etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_entity_headers(representation, etag)
+            self.end_headers()
+            return None
+
+        size = representation.size
+        byte_range = parse_range(self.headers.get("Range"), size)
+        if_range = self.headers.get("If-Range")
+        if byte_range is not None and if_range is not None and if_range.strip() != etag:
+            byte_range = None
+
+        if byte_range == "unsatisfiable":
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self._send_entity_headers(representation, etag)
+            self.end_headers()
+            return None
+
+        f = representation.open()
+        try:
+            if byte_range is None:
+                start, length = 0, size
+                self.send_response(HTTPStatus.OK)
+            else:
+                start, end = byte_range
+                length = end - start + 1
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                f.seek(start)
+            self.send_header("Content-Length", str(length))
+            self._send_entity_headers(representation, etag)
+            self.end_headers()
+        except Exception:
+            f.close()
+            raise
+        return f, length
+
+    def _send_entity_headers(self, representation: _Representation, etag: str):
+        self.send_header("Content-Type", representation.content_type)
+        if representation.encoding:
+            self.send_header("Content-Encoding", representation.encoding)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(representation.mtime, usegmt=True))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Vary", "Accept-Encoding")
+        # Always revalidate - unchanged content costs a 304
+        self.send_header("Cache-Control", "no-cache")
+
+    def do_GET(self):
+        head = self.send_head()
+        if head is None:
+            return
+        f, length = head
+        try:
+            while length > 0:
+                chunk = f.read(min(_CHUNK, length))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                length -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away (it may resume with Range)
+        finally:
+            f.close()
+
+    def do_HEAD(self):
+        head = self.send_head()
+        if head is not None:
+            head[0].close()
+
+
+def make_server(directory=".", port=DEFAULT_PORT, bind="127.0.0.1"):
+    """A ThreadingHTTPServer serving directory (port 0 - any free port)"""
+
+    class Handler(BundleRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(directory), **kwargs)
+
+    return ThreadingHTTPServer((bind, port), Handler)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve bundles and pages with precompression, ETags and ranges")
+    parser.add_argument("directory", nargs="?", default=".", help="directory to serve")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--precompress", action="store_true",
+                        help=f"write missing .gz/.br variants first ({', '.join(available_encodings())})")
+    args = parser.parse_args()
+
+    if not Path(args.directory).is_dir():
+        print(f"Error: {args.directory} is not a directory", file=sys.stderr)
+        return 1
+    if args.precompress:
+        print(f"Precompressed {precompress(args.directory)} files")
+
+    server = make_server(args.directory, args.port, args.bind)
+    host, port = server.server_address[:2]
+    print(f"Serving {Path(args.directory).resolve()} on http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Bundle writer shared by the converters.
+
+Every document is serialized once and written straight into the ZIP
+archive. Mirroring the bundle to an exploded directory (for inspecting the
+JSONs) is optional and reuses the same serialized bytes instead of
+round-tripping through the disk.
+
+The output can also be "-" (stdout) or any writable binary stream, including
+unseekable ones such as pipes; entries are then streamed out as they are
+written.
+
+Documents can be encoded in one of several formats (--format):
+
+    json      - pretty-printed JSON (default)
+    json-min  - minified JSON
+    msgpack   - MessagePack (pip install msgpack)
+    cbor      - CBOR (pip install cbor2)
+
+Entries are compressed per entry according to a compression policy (see
+compression_policy.py), by default media stored and documents deflated.
+
+The last entry is manifest.json with the hash, sizes and dependencies of
+every other entry (see bundle_manifest.py). A ZIP path is written as
+<name>.tmp and only replaces the target when the with block succeeds; on an
+exception the temporary file is deleted and no manifest is written.
+
+app.json is always pretty-printed JSON so a reader can find out the format;
+for any format other than the default it records it under "format". The
+other documents keep their names with the extension of the format
+(e.g. screens/home.msgpack), and paths inside routes.json follow suit.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import sys
+import zipfile
+from json.encoder import encode_basestring as _encode_string
+from pathlib import Path
+
+from build_cache import file_digest
+from bundle_manifest import MANIFEST_NAME, BundleManifest, document_dependencies
+from compression_policy import DEFAULT_POLICY, CompressionPolicy
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # cbor2 is optional
+    cbor2 = None
+
+
+FORMATS = ["json", "json-min", "msgpack", "cbor"]
+DEFAULT_FORMAT = "json"
+
+FORMAT_EXTENSIONS = {
+    "json": ".json",
+    "json-min": ".json",
+    "msgpack": ".msgpack",
+    "cbor": ".cbor",
+}
+
+# Documents that stay JSON whatever the format
+_JSON_ONLY = {"app.json", MANIFEST_NAME}
+
+
+def is_stream(output) -> bool:
+    """True for "-" (stdout) or a file-like object"""
+    return output == "-" or hasattr(output, "write")
+
+
+def console_for(output):
+    """
+    While the bundle is streamed to stdout, progress messages printed by the
+    converters go to stderr so they don't corrupt the archive.
+    """
+    if is_stream(output):
+        return contextlib.redirect_stdout(sys.stderr)
+    return contextlib.nullcontext()
+
+
+def encode_json(obj) -> bytes:
+    try:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    except RecursionError:
+        return _encode_deep_json(obj, indent=2).encode("utf-8")
+
+
+def _encode_min_json(obj) -> bytes:
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except RecursionError:
+        return _encode_deep_json(obj, indent=None).encode("utf-8")
+
+
+_END = object()
+
+
+def _json_scalar(value) -> str:
+    if isinstance(value, str):
+        return _encode_string(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "Infinity" if value > 0 else "-Infinity"
+        return float.__repr__(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_key(key) -> str:
+    if isinstance(key, str):
+        return _encode_string(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return _encode_string(_json_scalar(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _encode_deep_json(obj, indent=None) -> str:
+    """
+    Same output as json.dumps(obj, ensure_ascii=False, indent=indent) (or the
+    compact separators when indent is None) but with an explicit stack, for
+    documents nested deeper than the recursion limit (e.g. 10,000-level DOMs).
+    """
+    out = []
+    key_sep = ": " if indent is not None else ":"
+
+    def newline(level):
+        return "\n" + " " * (indent * level) if indent is not None else ""
+
+    # Frames: [iterator, is_dict, level, first item]
+    stack = []
+    value, level, pending = obj, 0, True
+    while True:
+        if pending:
+            pending = False
+            if isinstance(value, (list, tuple)) and value:
+                out.append("[")
+                stack.append([iter(value), False, level + 1, True])
+            elif isinstance(value, dict) and value:
+                out.append("{")
+                stack.append([iter(value.items()), True, level + 1, True])
+            elif isinstance(value, (list, tuple)):
+                out.append("[]")
+            elif isinstance(value, dict):
+                out.append("{}")
+            else:
+                out.append(_json_scalar(value))
+        if not stack:
+            break
+        frame = stack[-1]
+        item = next(frame[0], _END)
+        if item is _END:
+            stack.pop()
+            out.append(newline(frame[2] - 1) + ("}" if frame[1] else "]"))
+            continue
+        out.append(("" if frame[3] else ",") + newline(frame[2]))
+        frame[3] = False
+        if frame[1]:
+            key, value = item
+            out.append(_json_key(key) + key_sep)
+        else:
+            value = item
+        level, pending = frame[2], True
+    return "".join(out)
+
+
+def _require(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (choose from: {', '.join(FORMATS)})")
+    if fmt == "msgpack" and msgpack is None:
+        raise ValueError("Format 'msgpack' requires: pip install msgpack")
+    if fmt == "cbor" and cbor2 is None:
+        raise ValueError("Format 'cbor' requires: pip install cbor2")
+
+
+def encode_document(obj, fmt=DEFAULT_FORMAT) -> bytes:
+    """Serialize a bundle document in the given format"""
+    if fmt == "json":
+        return encode_json(obj)
+    _require(fmt)
+    if fmt == "json-min":
+        return _encode_min_json(obj)
+    if fmt == "msgpack":
+        return msgpack.packb(obj, use_bin_type=True)
+    return cbor2.dumps(obj)
+
+
+def decode_document(data: bytes, fmt=DEFAULT_FORMAT):
+    """Inverse of encode_document()"""
+    _require(fmt)
+    if fmt in ("json", "json-min"):
+        return json.loads(data.decode("utf-8"))
+    if fmt == "msgpack":
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return cbor2.loads(data)
+
+
+def entry_name(name: str, fmt=DEFAULT_FORMAT) -> str:
+    """Archive name of a document, e.g. screens/home.json -> screens/home.cbor"""
+    if name in _JSON_ONLY or not name.endswith(".json"):
+        return name
+    return name[:-len(".json")] + FORMAT_EXTENSIONS[fmt]
+
+
+def available_formats():
+    """Bundle formats that can be used in this environment"""
+    available = []
+    for fmt in FORMATS:
+        try:
+            _require(fmt)
+        except ValueError:
+            continue
+        available.append(fmt)
+    return available
+
+
+class BundleWriter:
+    """Writes bundle entries directly into a ZIP archive"""
+
+    def __init__(self, output, exploded_dir=None, compression=DEFAULT_POLICY,
+                 fmt=DEFAULT_FORMAT):
+        """
+        Args:
+            output: ZIP path, "-" for stdout, or a writable binary stream
+            exploded_dir: also mirror every entry into this directory
+            compression: compression policy name, or a zipfile method for every entry
+            fmt: document format (see FORMATS)
+        """
+        _require(fmt)
+        self.format = fmt
+        self._tmp_path = None
+        if output == "-":
+            self.zip_path = None
+            self._stream = sys.__stdout__.buffer
+        elif hasattr(output, "write"):
+            self.zip_path = None
+            self._stream = output
+        else:
+            # Written next to the target and moved there by close() - a failed
+            # build leaves the previous ZIP (or none) in place
+            self.zip_path = Path(output)
+            self._tmp_path = self.zip_path.with_name(self.zip_path.name + ".tmp")
+            self._stream = None
+        self.exploded_dir = Path(exploded_dir) if exploded_dir else None
+        if isinstance(compression, str):
+            self.policy = CompressionPolicy(compression)
+            compression = zipfile.ZIP_STORED
+        else:
+            self.policy = None
+        self.zip = zipfile.ZipFile(self._stream or self._tmp_path, "w", compression)
+        self.manifest = BundleManifest(fmt)
+
+        # I/O accounting (bytes)
+        self.document_bytes = 0   # serialized JSON documents
+        self.asset_bytes = 0      # asset files added to the archive
+        self.disk_io_bytes = 0    # disk reads/writes besides the archive itself
+
+    def write_json(self, name: str, obj):
+        """
+        Serialize a document once and add it to the archive.
+        name is the .json name; the entry gets the extension of the format.
+        """
+        depends = document_dependencies(obj)
+        if name in _JSON_ONLY:
+            if self.format != DEFAULT_FORMAT and isinstance(obj, dict):
+                obj = {**obj, "format": self.format}
+            self.write_bytes(name, encode_json(obj), depends)
+        else:
+            self.write_bytes(self.entry_name(name), encode_document(obj, self.format), depends)
+
+    def entry_name(self, name: str) -> str:
+        """Archive name of a .json document in this bundle's format"""
+        return entry_name(name, self.format)
+
+    def encode(self, obj) -> bytes:
+        """Document bytes in this bundle's format (for write_bytes)"""
+        return encode_document(obj, self.format)
+
+    def _compression(self, name: str, size: int) -> dict:
+        """compress_type / compresslevel arguments for an entry (empty - the archive's method)"""
+        if self.policy is None:
+            return {}
+        method, level = self.policy.method(name, size)
+        return {"compress_type": method, "compresslevel": level}
+
+    def _record(self, name: str, sha256: str, depends: dict = None):
+        self.manifest.add(self.zip.getinfo(name), sha256, depends)
+
+    def write_bytes(self, name: str, data: bytes, depends: dict = None):
+        """Add an encoded document; depends are its dependencies for the manifest"""
+        self.zip.writestr(name, data, **self._compression(name, len(data)))
+        self._record(name, hashlib.sha256(data).hexdigest(), depends)
+        self.document_bytes += len(data)
+        if self.exploded_dir:
+            path = self.exploded_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self.disk_io_bytes += len(data)
+
+    def write_file(self, name: str, source):
+        """Add a file (e.g. an image asset) from its original location"""
+        source = Path(source)
+        size = source.stat().st_size
+        self.zip.write(source, name, **self._compression(name, size))
+        self._record(name, file_digest(source))
+        self.asset_bytes += size
+        self.disk_io_bytes += size
+        if self.exploded_dir:
+            path = self.exploded_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, path)
+            self.disk_io_bytes += 2 * size
+
+    def write_asset(self, name: str, data: bytes):
+        """Add an asset produced in memory (e.g. a re-encoded image)"""
+        self.zip.writestr(name, data, **self._compression(name, len(data)))
+        self._record(name, hashlib.sha256(data).hexdigest())
+        self.asset_bytes += len(data)
+        if self.exploded_dir:
+            path = self.exploded_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self.disk_io_bytes += len(data)
+
+    @property
+    def legacy_io_bytes(self) -> int:
+        """
+        Disk I/O of the old write-then-zip flow: every JSON written and read
+        back, every asset copied (read + write) and read again for the ZIP.
+        """
+        return 2 * self.document_bytes + 3 * self.asset_bytes
+
+    @property
+    def io_bytes_saved(self) -> int:
+        return self.legacy_io_bytes - self.disk_io_bytes
+
+    def close(self):
+        """Write the manifest and finish the archive (moved to its path)"""
+        try:
+            data = encode_json(self.manifest.document())
+            self.zip.writestr(MANIFEST_NAME, data, **self._compression(MANIFEST_NAME, len(data)))
+            if self.exploded_dir:
+                self.exploded_dir.mkdir(parents=True, exist_ok=True)
+                (self.exploded_dir / MANIFEST_NAME).write_bytes(data)
+            self.zip.close()
+        except BaseException:
+            self.abort()
+            raise
+        if self._stream is not None:
+            self._stream.flush()
+        else:
+            os.replace(self._tmp_path, self.zip_path)
+
+    def abort(self):
+        """Drop an unfinished archive - no manifest, the previous ZIP stays"""
+        if self._stream is not None:
+            return  # the archive is streamed out, just stop writing it
+        with contextlib.suppress(Exception):
+            self.zip.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
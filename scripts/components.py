@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Shared component table for bundles.
+
+Screens repeat the same widget subtrees (the navigation menu of every
+html_screens/ page, identical cards and buttons). dedupe() hashes every
+subtree structurally, bottom up, and moves each widget subtree that occurs
+more than once into a component table, replacing every copy with a
+reference:
+
+    {"type": "component", "ref": "c3f1a9..."}
+
+The table is written as components.json and app.json points at it under
+"components". Component ids are derived from the subtree hash, so the same
+subtree gets the same id in every build. expand() puts the subtrees back,
+which gives exactly the documents dedupe() started from.
+
+All passes use explicit stacks, so deeply nested screens are fine.
+"""
+import hashlib
+import json
+from collections import Counter
+
+COMPONENTS_NAME = "components.json"
+REF_TYPE = "component"
+
+# Subtrees smaller than this (compact JSON bytes) stay inline - a reference
+# costs about 40 bytes by itself
+MIN_COMPONENT_BYTES = 64
+
+
+def is_ref(node) -> bool:
+    return isinstance(node, dict) and node.get("type") == REF_TYPE and "ref" in node
+
+
+def _is_widget(node) -> bool:
+    return isinstance(node, dict) and "type" in node and not is_ref(node)
+
+
+def _items(container):
+    return container.items() if isinstance(container, dict) else enumerate(container)
+
+
+def _annotate(root, info):
+    """
+    Post-order pass storing info[id(container)] = (digest, compact size) for
+    every dict/list under root. Key order counts, like in the serialized JSON.
+    """
+    stack = [(root, False)]
+    while stack:
+        container, children_done = stack.pop()
+        if not children_done:
+            stack.append((container, True))
+            for _, value in _items(container):
+                if isinstance(value, (dict, list)) and id(value) not in info:
+                    stack.append((value, False))
+            continue
+
+        h = hashlib.sha256(b"{" if isinstance(container, dict) else b"[")
+        size = 2
+        for key, value in _items(container):
+            if isinstance(container, dict):
+                encoded_key = json.dumps(key, ensure_ascii=False)
+                h.update(encoded_key.encode("utf-8") + b":")
+                size += len(encoded_key) + 1
+            if isinstance(value, (dict, list)):
+                digest, value_size = info[id(value)]
+                h.update(digest.encode("ascii"))
+                size += value_size
+            else:
+                encoded = json.dumps(value, ensure_ascii=False)
+                h.update(encoded.encode("utf-8"))
+                size += len(encoded)
+            h.update(b",")
+            size += 1
+        info[id(container)] = (h.hexdigest(), size)
+
+
+def subtree_digest(node) -> str:
+    """Structural hash of a document or subtree (equal hashes - identical JSON)"""
+    if not isinstance(node, (dict, list)):
+        return hashlib.sha256(json.dumps(node, ensure_ascii=False).encode("utf-8")).hexdigest()
+    info = {}
+    _annotate(node, info)
+    return info[id(node)][0]
+
+
+def _component_id(digest: str) -> str:
+    return "c" + digest[:16]
+
+
+def dedupe(documents: dict, min_bytes: int = MIN_COMPONENT_BYTES):
+    """
+    Replace repeated widget subtrees of documents ({name: document}) with
+    references. The documents are modified in place.
+
+    Returns:
+        component table {id: subtree}
+    """
+    info = {}
+    for document in documents.values():
+        if isinstance(document, (dict, list)):
+            _annotate(document, info)
+
+    # How often each widget subtree occurs (document roots are not candidates)
+    counts = Counter()
+    for document in documents.values():
+        stack = [document] if isinstance(document, (dict, list)) else []
+        while stack:
+            container = stack.pop()
+            for _, value in _items(container):
+                if isinstance(value, (dict, list)):
+                    if _is_widget(value):
+                        counts[info[id(value)][0]] += 1
+                    stack.append(value)
+
+    def shared(node):
+        if not _is_widget(node):
+            return None
+        digest, size = info[id(node)]
+        return digest if counts[digest] > 1 and size >= min_bytes else None
+
+    # Top down: the outermost repeated subtree becomes the component
+    components = {}
+    pending = [d for d in documents.values() if isinstance(d, (dict, list))]
+    while pending:
+        container = pending.pop()
+        for key, value in list(_items(container)):
+            if not isinstance(value, (dict, list)):
+                continue
+            digest = shared(value)
+            if digest is None:
+                pending.append(value)
+                continue
+            component_id = _component_id(digest)
+            container[key] = {"type": REF_TYPE, "ref": component_id}
+            if component_id not in components:
+                components[component_id] = value
+                pending.append(value)   # repeats nested inside the component
+
+    _inline_single_use(documents, components)
+    return components
+
+
+def _refs(root):
+    """(container, key) of every reference under root"""
+    found = []
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for key, value in _items(container):
+            if is_ref(value):
+                found.append((container, key))
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    return found
+
+
+def _inline_single_use(documents, components):
+    """Components referenced only once (e.g. only from one component) go back inline"""
+    while True:
+        roots = [d for d in documents.values() if isinstance(d, (dict, list))]
+        roots += list(components.values())
+        refs = [ref for root in roots for ref in _refs(root)]
+        counts = Counter(container[key]["ref"] for container, key in refs)
+        single = {cid for cid, n in counts.items() if n == 1}
+        if not single:
+            return
+        for container, key in refs:
+            component_id = container[key]["ref"]
+            if component_id in single:
+                container[key] = components.pop(component_id)
+
+
+def expand(document, components: dict):
+    """The document with every reference replaced by its component (a new copy)"""
+    def copy(value):
+        if is_ref(value):
+            value = components[value["ref"]]
+        if isinstance(value, dict):
+            return {}
+        if isinstance(value, list):
+            return []
+        return value
+
+    root = copy(document)
+    if not isinstance(root, (dict, list)):
+        return root
+    source = components[document["ref"]] if is_ref(document) else document
+    stack = [(source, root)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in _items(source):
+            new_value = copy(value)
+            if isinstance(target, dict):
+                target[key] = new_value
+            else:
+                target.append(new_value)
+            if isinstance(new_value, (dict, list)):
+                stack.append((components[value["ref"]] if is_ref(value) else value, new_value))
+    return root
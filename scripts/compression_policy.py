@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Per-entry ZIP compression policies for the bundles.
+
+A policy picks the compression method and level of every archive entry from
+its name, so documents and media are treated differently:
+
+    auto     - media stored, everything else deflated at level 9 (default)
+    stored   - nothing compressed
+    deflate  - everything deflated at zlib's default level
+    lzma     - media stored, everything else LZMA
+    zstd     - media stored, everything else Zstandard (Python 3.14+ zipfile)
+
+Media (PNG, JPEG, WebP, fonts, archives ...) is already compressed, deflating
+it again costs build time and usually makes it slightly bigger. Tiny entries
+are stored too - the compressed stream would not be smaller.
+
+LZMA and zstd give the smallest bundles but the device's unzip library has
+to support them; deflate is supported everywhere.
+
+Running this file builds the fixtures with every policy and reports build
+time against bundle size:
+
+    python compression_policy.py [--repeat N]
+"""
+import sys
+import zipfile
+from pathlib import PurePosixPath
+
+POLICIES = ["auto", "stored", "deflate", "lzma", "zstd"]
+DEFAULT_POLICY = "auto"
+
+ZIP_ZSTANDARD = getattr(zipfile, "ZIP_ZSTANDARD", None)
+
+# Already compressed - stored by every policy except "deflate"
+MEDIA_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif", ".avif", ".heic",
+    ".mp3", ".mp4", ".m4a", ".ogg", ".webm",
+    ".woff", ".woff2",
+    ".gz", ".br", ".zst", ".zip", ".xz",
+}
+
+# Entries up to this size are stored (deflate headers outweigh the savings)
+MIN_COMPRESS_BYTES = 16
+
+# (method, level) for documents / media per policy
+_POLICY_METHODS = {
+    "auto": ((zipfile.ZIP_DEFLATED, 9), (zipfile.ZIP_STORED, None)),
+    "stored": ((zipfile.ZIP_STORED, None), (zipfile.ZIP_STORED, None)),
+    "deflate": ((zipfile.ZIP_DEFLATED, None), (zipfile.ZIP_DEFLATED, None)),
+    "lzma": ((zipfile.ZIP_LZMA, None), (zipfile.ZIP_STORED, None)),
+    "zstd": ((ZIP_ZSTANDARD, 19), (zipfile.ZIP_STORED, None)),
+}
+
+
+def _require(policy):
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown compression policy '{policy}' (choose from: {', '.join(POLICIES)})")
+    if policy == "zstd" and ZIP_ZSTANDARD is None:
+        raise ValueError("Compression 'zstd' requires Python 3.14+ (zipfile.ZIP_ZSTANDARD)")
+
+
+def available_policies():
+    """Compression policies that can be used in this environment"""
+    available = []
+    for policy in POLICIES:
+        try:
+            _require(policy)
+        except ValueError:
+            continue
+        available.append(policy)
+    return available
+
+
+def is_media(name: str) -> bool:
+    return PurePosixPath(name).suffix.lower() in MEDIA_SUFFIXES
+
+
+class CompressionPolicy:
+    """Compression method and level for each archive entry"""
+
+    def __init__(self, policy: str = DEFAULT_POLICY):
+        _require(policy)
+        self.name = policy
+        self.documents, self.media = _POLICY_METHODS[policy]
+
+    def method(self, name: str, size: int):
+        """(compress_type, compresslevel) for an entry of size bytes"""
+        if self.name != "deflate" and size <= MIN_COMPRESS_BYTES:
+            return zipfile.ZIP_STORED, None
+        return self.media if is_media(name) else self.documents
+
+
+# =========================================================
+# Build time / size report
+# =========================================================
+def _bundle_size(output_dir):
+    return sum(p.stat().st_size for p in output_dir.rglob("*.zip"))
+
+
+def main():
+    import argparse
+    import contextlib
+    import io
+    import random
+    import statistics
+    import tempfile
+    import time
+    from pathlib import Path
+
+    import convert_multiple_html_to_zip
+    import html_to_zip_converter
+    from bundle_reader import read_bundle
+    from bundle_writer import BundleWriter
+
+    parser = argparse.ArgumentParser(description="Compare bundle compression policies")
+    parser.add_argument("--repeat", type=int, default=5, help="builds per policy (median is reported)")
+    parser.add_argument("--media", type=int, default=20, help="media files in the mixed bundle")
+    args = parser.parse_args()
+
+    root = Path(__file__).resolve().parent.parent
+
+    def multi(out_dir, policy):
+        convert_multiple_html_to_zip.MultiScreenConverter(
+            str(root / "html_screens"), str(out_dir), use_cache=False, compression=policy).run()
+
+    def html_to_zip(out_dir, policy):
+        html_to_zip_converter.HTMLToZipConverter(
+            str(root / "caspit-test-standalone.html"), str(out_dir), write_json_dir=False,
+            compression=policy).convert()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # Documents of the multi-screen bundle plus already-compressed media
+        # (random bytes, like photos)
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, documents = read_bundle(convert_multiple_html_to_zip.MultiScreenConverter(
+                str(root / "html_screens"), str(tmp / "documents"), use_cache=False).run())
+        rng = random.Random(0)
+        media = []
+        for i in range(args.media):
+            path = tmp / "media" / f"photo_{i:03d}.jpg"
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(rng.randbytes(rng.choice([20, 60, 150]) * 1024))
+            media.append(path)
+
+        def mixed(out_dir, policy):
+            out_dir.mkdir(parents=True)
+            with BundleWriter(out_dir / "mixed.zip", compression=policy) as bundle:
+                for name, document in documents.items():
+                    bundle.write_json(name, document)
+                for path in media:
+                    bundle.write_file(f"assets/{path.name}", path)
+
+        inputs = [("multi", "html_screens", multi),
+                  ("html_to_zip", "caspit", html_to_zip),
+                  ("writer", "docs+media", mixed)]
+
+        print(f"{'converter':<12} {'input':<14} {'policy':<8} {'build ms':>9} {'KB':>8} {'vs stored':>9}")
+        for converter, input_name, build in inputs:
+            stored_size = None
+            for policy in ["stored"] + [p for p in available_policies() if p != "stored"]:
+                times = []
+                for run in range(args.repeat):
+                    out_dir = tmp / f"{converter}-{policy}-{run}"
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        build(out_dir, policy)
+                        times.append((time.perf_counter() - start) * 1000)
+                size = _bundle_size(out_dir)
+                stored_size = stored_size or size
+                print(f"{converter:<12} {input_name:<14} {policy:<8} {statistics.median(times):>9.2f} "
+                      f"{size / 1024:>8.1f} {size / stored_size:>8.0%}")
+
+    missing = [p for p in POLICIES if p not in available_policies()]
+    if missing:
+        print(f"\nNot available: {', '.join(missing)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
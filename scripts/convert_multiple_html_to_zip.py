@@ -3,18 +3,77 @@
 Convert multiple HTML files to a single ZIP file with multiple screens
 Each HTML file becomes a separate screen with navigation between them
 """
-import json
 import re
-import zipfile
 from pathlib import Path
-from bs4 import BeautifulSoup, Tag, NavigableString
+from bs4 import Tag
+
+import app_shell
+import bindings
+import bundle_manifest
+import bundle_writer
+import components
+import compression_policy
+import expressions
+import html_parsers
+import js_literals
+import tailwind_resolver
+import tree_walker
+from build_cache import BuildCache, code_fingerprint, combine_keys, input_key
+from bundle_manifest import document_dependencies
+from bundle_writer import (DEFAULT_FORMAT, FORMATS, BundleWriter, console_for, decode_document,
+                           encode_document, is_stream)
+from compression_policy import DEFAULT_POLICY, available_policies
+from html_parsers import DEFAULT_PARSER, PARSERS, make_soup
+from tailwind_resolver import style_and_layout
+
+APP_ID = "multi_screen_app"
 
 
 class MultiScreenConverter:
-    def __init__(self, html_dir: str, output_dir: str):
+    def __init__(self, html_dir: str, output_dir: str, parser: str = DEFAULT_PARSER,
+                 use_cache: bool = True, fmt: str = DEFAULT_FORMAT, shared_components: bool = False,
+                 shell: bool = False, compression: str = DEFAULT_POLICY, compile_expressions: bool = False,
+                 dependencies: bool = False):
+        """
+        output_dir may be "-" to stream the ZIP to stdout; fmt is the document format.
+        With shared_components, widget subtrees repeated across screens are written
+        once to components.json and referenced from the screens (see components.py).
+        With shell, the header and navigation shared by all screens go to app.json
+        once and the screens keep only their own content (see app_shell.py).
+        compression is the ZIP compression policy (see compression_policy.py).
+        With compile_expressions, visibleIf / bindTo / classBinding (:class) are
+        compiled once into expressions.json and referenced by index (see expressions.py).
+        With dependencies, every screen gets an index of the nodes reading each
+        state key (see bindings.py).
+        """
         self.html_dir = Path(html_dir)
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if output_dir == "-":
+            self.output_dir = None
+            self.output = "-"
+        else:
+            self.output_dir = Path(output_dir)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.output = self.output_dir / f"{APP_ID}.zip"
+        self.parser = parser
+        self.format = fmt
+        self.shared_components = shared_components
+        self.component_table = {}
+        self.use_shell = shell
+        self.shell = None
+        self.compression = compression
+        self.compile_expressions = compile_expressions
+        self.expression_table = expressions.ExpressionTable()
+        self.dependencies = dependencies
+        
+        # Incremental build cache - unchanged HTML files are not parsed again
+        self.cache = BuildCache(self.output_dir or ".", enabled=use_cache and self.output_dir is not None)
+        self.fingerprint = code_fingerprint(__file__, html_parsers.__file__, js_literals.__file__,
+                                            tailwind_resolver.__file__, tree_walker.__file__,
+                                            expressions.__file__, bindings.__file__, components.__file__,
+                                            app_shell.__file__, bundle_manifest.__file__,
+                                            bundle_writer.__file__, compression_policy.__file__)
+        self.input_keys = {}
+        self.screen_order = []
         
         self.runtime = {
             "app": {},
@@ -39,116 +98,30 @@ class MultiScreenConverter:
 
     def extract_vue_state(self, soup):
         """Extract Vue state from script tags"""
-        scripts = soup.find_all("script")
-        for script in scripts:
-            if script.string and "data()" in script.string:
-                match = re.search(
-                    r"data\s*\(\)\s*{[^}]*return\s*{(.*?)}\s*}",
-                    script.string,
-                    re.DOTALL
-                )
-                if match:
-                    raw = match.group(1)
-                    state = {}
-                    pairs = re.findall(r"(\w+)\s*:\s*([^,\n]+)", raw)
-                    for key, value in pairs:
-                        value = value.strip()
-                        if value in ["true", "false"]:
-                            state[key] = value == "true"
-                        elif value == "null":
-                            state[key] = None
-                        elif re.match(r"^\d+$", value):
-                            state[key] = int(value)
-                        elif re.match(r"^\d+\.\d+$", value):
-                            state[key] = float(value)
-                        elif value.startswith(("'", '"')):
-                            state[key] = value.strip("'\"")
-                        else:
-                            state[key] = "DYNAMIC"
-                    return state
+        for script in soup.find_all("script"):
+            state = js_literals.extract_vue_state(script.string)
+            if state is not None:
+                return state
         return {}
 
     def parse_tailwind(self, classes):
         """Parse Tailwind CSS classes to style and layout"""
-        style = {}
-        layout = {}
-        
-        if not classes:
-            return style, layout
-            
-        for c in classes:
-            if not isinstance(c, str):
-                continue
-                
-            # Padding
-            if c.startswith("p-"):
-                try:
-                    style["padding"] = int(c.split("-")[1]) * 4
-                except:
-                    pass
-            
-            # Gap
-            if c.startswith("gap-"):
-                try:
-                    layout["gap"] = int(c.split("-")[1]) * 4
-                except:
-                    pass
-            
-            # Rounded
-            if c.startswith("rounded"):
-                style["radius"] = 16
-            
-            # Shadow
-            if c.startswith("shadow"):
-                style["elevation"] = 4
-            
-            # Grid
-            if c.startswith("grid-cols-"):
-                layout["type"] = "grid"
-                try:
-                    layout["columns"] = int(c.split("-")[-1])
-                except:
-                    layout["columns"] = 2
-            
-            # Flex
-            if c == "flex":
-                layout["type"] = "row"
-            if c == "flex-col":
-                layout["type"] = "column"
-            
-            if c.startswith("justify-"):
-                layout["mainAxis"] = c.split("-")[1]
-            
-            if c.startswith("items-"):
-                layout["crossAxis"] = c.split("-")[1]
-            
-            # Background
-            if c == "bg-white":
-                style["background"] = "#FFFFFF"
-            elif c.startswith("bg-"):
-                # Map common Tailwind colors
-                color_map = {
-                    "bg-blue-500": "#3B82F6",
-                    "bg-green-500": "#10B981",
-                    "bg-purple-500": "#8B5CF6",
-                    "bg-red-500": "#EF4444",
-                    "bg-yellow-500": "#F59E0B",
-                    "bg-indigo-500": "#6366F1",
-                    "bg-pink-500": "#EC4899",
-                    "bg-teal-500": "#14B8A6",
-                    "bg-orange-500": "#F97316",
-                    "bg-gray-500": "#6B7280",
-                }
-                if c in color_map:
-                    style["background"] = color_map[c]
-        
-        return style, layout
+        return style_and_layout(classes)
 
     def convert_element(self, element):
         """Convert HTML element to JSON widget"""
         if not isinstance(element, Tag):
             return None
-        
+        return tree_walker.convert_element(element, self._enter_element, self._finish_element,
+                                           self._convert_text)
+
+    def convert_children(self, element):
+        """Convert element children"""
+        return tree_walker.convert_children(element, self._enter_element, self._finish_element,
+                                            self._convert_text)
+
+    def _enter_element(self, element):
+        """Node for an element, before its children are converted"""
         tag = element.name.lower() if element.name else None
         if not tag:
             return None
@@ -184,6 +157,12 @@ class MultiScreenConverter:
         if model:
             node["bindTo"] = model
         
+        # :class binding (compiled with the other expressions)
+        if self.compile_expressions or self.dependencies:
+            bound_class = element.get(":class") or element.get("v-bind:class")
+            if bound_class:
+                node["classBinding"] = bound_class
+        
         # Tag mapping with better detection
         if tag == "header":
             node["type"] = "appBar"
@@ -214,27 +193,6 @@ class MultiScreenConverter:
         elif tag == "button":
             node["type"] = "button"
             node["text"] = element.get_text(strip=True)
-            # Extract background color from classes
-            for bg_class in ["bg-blue-500", "bg-green-500", "bg-purple-500", "bg-red-500", 
-                           "bg-yellow-500", "bg-indigo-500", "bg-pink-500", "bg-teal-500", 
-                           "bg-orange-500", "bg-gray-500"]:
-                if bg_class in class_str:
-                    color_map = {
-                        "bg-blue-500": "#3B82F6",
-                        "bg-green-500": "#10B981",
-                        "bg-purple-500": "#8B5CF6",
-                        "bg-red-500": "#EF4444",
-                        "bg-yellow-500": "#F59E0B",
-                        "bg-indigo-500": "#6366F1",
-                        "bg-pink-500": "#EC4899",
-                        "bg-teal-500": "#14B8A6",
-                        "bg-orange-500": "#F97316",
-                        "bg-gray-500": "#6B7280",
-                    }
-                    if "style" not in node:
-                        node["style"] = {}
-                    node["style"]["background"] = color_map[bg_class]
-                    break
         elif tag == "input":
             node["type"] = "input"
             node["inputType"] = element.get("type", "text")
@@ -302,8 +260,10 @@ class MultiScreenConverter:
             if k in layout:
                 node[k] = layout[k]
         
-        # Children - but skip text nodes that are already in parent
-        children = self.convert_children(element)
+        return node
+
+    def _finish_element(self, node, children):
+        """Attach the converted children - but skip text nodes that are already in parent"""
         if children:
             # Filter out duplicate text nodes
             filtered_children = []
@@ -320,23 +280,15 @@ class MultiScreenConverter:
         
         return node if node.get("type") else None
 
-    def convert_children(self, element):
-        """Convert element children"""
-        children = []
-        for child in element.children:
-            if isinstance(child, NavigableString):
-                # Skip whitespace-only text nodes
-                text = str(child).strip()
-                if text and len(text) > 1:  # Only meaningful text
-                    children.append({
-                        "type": "text",
-                        "value": text
-                    })
-            elif isinstance(child, Tag):
-                converted = self.convert_element(child)
-                if converted:
-                    children.append(converted)
-        return children
+    def _convert_text(self, child):
+        # Skip whitespace-only text nodes
+        text = str(child).strip()
+        if text and len(text) > 1:  # Only meaningful text
+            return {
+                "type": "text",
+                "value": text
+            }
+        return None
 
     def _camel_to_snake(self, name):
         """Convert camelCase to snake_case"""
@@ -349,12 +301,67 @@ class MultiScreenConverter:
         match = re.search(r"navigate\(['\"](.*?)['\"]\)", click_str)
         return match.group(1) if match else None
 
-    def convert_html_file(self, html_file: Path):
-        """Convert a single HTML file to screen JSON"""
+    def _input_key(self, html: str) -> str:
+        options = {"parser": self.parser, "format": self.format}
+        if self.compile_expressions or self.dependencies:
+            options["classBinding"] = True
+        return input_key(html.encode("utf-8"), fingerprint=self.fingerprint, options=options)
+
+    def convert_html_file(self, html_file: Path, bundle: BundleWriter = None):
+        """
+        Convert a single HTML file to screen JSON (reused from the cache when unchanged).
+        With a bundle, the screen is written to it right away instead of being kept
+        in self.runtime["screens"] until the end (a cached screen is then copied
+        undecoded and its encoded bytes are returned).
+        """
         with open(html_file, "r", encoding="utf-8") as f:
             html = f.read()
         
-        soup = BeautifulSoup(html, "html.parser")
+        screen_name = html_file.stem
+        cache_name = f"{APP_ID}:{screen_name}"
+        key = self._input_key(html)
+        self.input_keys[cache_name] = key
+        
+        cached = self.cache.lookup(cache_name, key)
+        data = self.cache.get_blob(cached.get("blob")) if cached else None
+        if cached and (data is not None or cached.get("blob") is None):
+            self.runtime["state"].update(cached["state"])
+            self.runtime["actions"].update(cached["actions"])
+            # Streamed screens are copied as they are, without decoding
+            screen_json = data if bundle is not None or data is None else decode_document(data, self.format)
+            depends = cached.get("depends")
+            if depends is None and data is not None:
+                depends = document_dependencies(decode_document(data, self.format))
+        else:
+            # Collect this file's actions separately so they can be cached with it
+            all_actions, self.runtime["actions"] = self.runtime["actions"], {}
+            try:
+                state, screen_json = self._convert_html(html_file, html)
+                file_actions = self.runtime["actions"]
+            finally:
+                all_actions.update(self.runtime["actions"])
+                self.runtime["actions"] = all_actions
+            
+            data = encode_document(screen_json, self.format) if screen_json is not None else None
+            depends = document_dependencies(screen_json)
+            blob = self.cache.put_blob(data) if data is not None else None
+            self.cache.store(cache_name, key, state=state, actions=file_actions, blob=blob,
+                             depends=depends)
+        
+        if data is None:
+            return None
+        
+        if screen_name not in self.screen_order:
+            self.screen_order.append(screen_name)
+        if bundle is not None:
+            bundle.write_bytes(bundle.entry_name(f"screens/{screen_name}.json"), data, depends)
+        else:
+            self.runtime["screens"][screen_name] = screen_json
+        return screen_json
+
+    def _convert_html(self, html_file: Path, html: str):
+        """Parse and convert one HTML document, returns (state, screen JSON)"""
+        soup = make_soup(html, self.parser)
         
         # Extract state
         state = self.extract_vue_state(soup)
@@ -366,7 +373,7 @@ class MultiScreenConverter:
         # Convert body content
         body = soup.body
         if not body:
-            return None
+            return state, None
         
         # Separate header, nav, and main content
         header = body.find("header")
@@ -417,66 +424,193 @@ class MultiScreenConverter:
             "children": layout_children
         }
         
-        self.runtime["screens"][screen_name] = screen_json
-        return screen_json
+        return state, screen_json
 
-    def build_zip(self):
-        """Build ZIP file with all screens"""
+    def write_app_documents(self, bundle: BundleWriter):
+        """Write app.json, state.json, actions.json and routes.json"""
         app_json = {
-            "appId": "multi_screen_app",
+            "appId": APP_ID,
             "version": "1.0.0",
             "initialRoute": "home",
             "rtl": True
         }
+        if self.shell:
+            app_json["shell"] = self.shell
+        if self.component_table:
+            app_json["components"] = bundle.entry_name(components.COMPONENTS_NAME)
+        if self.expression_table:
+            app_json["expressions"] = bundle.entry_name(expressions.EXPRESSIONS_NAME)
         
         # Create routes.json
         routes = {}
-        for screen_name in self.runtime["screens"].keys():
-            routes[screen_name] = f"screens/{screen_name}.json"
-        
-        zip_path = self.output_dir / "multi_screen_app.zip"
-        
-        with zipfile.ZipFile(zip_path, "w") as z:
-            z.writestr("app.json", json.dumps(app_json, indent=2, ensure_ascii=False))
-            z.writestr("state.json", json.dumps(self.runtime["state"], indent=2, ensure_ascii=False))
-            z.writestr("actions.json", json.dumps(self.runtime["actions"], indent=2, ensure_ascii=False))
-            z.writestr("routes.json", json.dumps(routes, indent=2, ensure_ascii=False))
+        for screen_name in self.screen_order:
+            routes[screen_name] = bundle.entry_name(f"screens/{screen_name}.json")
+        
+        bundle.write_json("app.json", app_json)
+        bundle.write_json("state.json", self.runtime["state"])
+        bundle.write_json("actions.json", self.runtime["actions"])
+        bundle.write_json("routes.json", routes)
+        if self.component_table:
+            bundle.write_json(components.COMPONENTS_NAME, self.component_table)
+        if self.expression_table:
+            bundle.write_json(expressions.EXPRESSIONS_NAME, self.expression_table.document())
+
+    @property
+    def holds_screens(self) -> bool:
+        """Whether the screens are kept until the end for the bundle-wide passes"""
+        return self.use_shell or self.shared_components or self.compile_expressions or self.dependencies
+
+    def share_screen_parts(self):
+        """
+        Bundle-wide passes over the screens held in self.runtime: the app shell,
+        the component table, then the dependency index (over the shell and the
+        components too, it reads the expressions as written) and the expression table
+        """
+        if self.use_shell:
+            self.shell = app_shell.extract_shell(self.runtime["screens"])
+            print(f"App shell: {', '.join(self.shell) if self.shell else 'nothing shared'}")
+        if self.shared_components:
+            self.component_table = components.dedupe(self.runtime["screens"])
+            print(f"Shared components: {len(self.component_table)}")
+        if self.dependencies:
+            for screen_name, screen_json in self.runtime["screens"].items():
+                bindings.index_screen(screen_json, self.runtime["state"], screen_name)
+            if self.shell:
+                bindings.index_screen(self.shell, self.runtime["state"], "shell")
+            for component_id, component in self.component_table.items():
+                bindings.index_screen(component, self.runtime["state"], component_id, include_root=True)
+        if self.compile_expressions:
+            documents = [self.shell, *self.runtime["screens"].values(), *self.component_table.values()]
+            expressions.compile_documents(dict(enumerate(documents)), self.expression_table)
+            print(f"Expressions: {len(self.expression_table)} distinct of "
+                  f"{self.expression_table.references}")
+
+    def build_zip(self, output=None):
+        """Build ZIP file with all screens converted so far (held in self.runtime)"""
+        output = output or self.output
+        with console_for(output), BundleWriter(output, compression=self.compression,
+                                               fmt=self.format) as bundle:
+            self.share_screen_parts()
+            self.write_app_documents(bundle)
             
             # Write each screen as separate JSON file
             for screen_name, screen_json in self.runtime["screens"].items():
-                z.writestr(
-                    f"screens/{screen_name}.json",
-                    json.dumps(screen_json, indent=2, ensure_ascii=False)
-                )
+                bundle.write_json(f"screens/{screen_name}.json", screen_json)
         
-        print(f"ZIP created: {zip_path}")
-        return zip_path
+        self._finish_build(output)
+        return output
 
-    def run(self):
-        """Convert all HTML files in directory"""
-        html_files = list(self.html_dir.glob("*.html"))
-        
-        if not html_files:
-            print(f"No HTML files found in {self.html_dir}")
-            return
-        
-        print(f"Found {len(html_files)} HTML files")
-        
+    def _bundle_key(self, html_files):
+        keys = []
         for html_file in html_files:
-            print(f"Converting {html_file.name}...")
-            self.convert_html_file(html_file)
-        
-        print("Building ZIP...")
-        zip_path = self.build_zip()
-        print(f"Done! ZIP created at: {zip_path}")
+            with open(html_file, "r", encoding="utf-8") as f:
+                keys.append((f"{APP_ID}:{html_file.stem}", self._input_key(f.read())))
+        return self._zip_key(keys)
+
+    def _zip_key(self, screen_keys):
+        """
+        Key of the ZIP from (cache name, key) of every screen - the screens are
+        cached the same whatever the bundle-wide options. The names count too:
+        a renamed page changes routes.json.
+        """
+        keys = [f"{name}={key}" for name, key in screen_keys] + [f"compression:{self.compression}"]
+        if self.shared_components:
+            keys.append("components")
+        if self.use_shell:
+            keys.append("shell")
+        if self.compile_expressions:
+            keys.append("expressions")
+        if self.dependencies:
+            keys.append("dependencies")
+        return combine_keys(keys)
+
+    def _finish_build(self, output):
+        """Record the finished ZIP in the build cache"""
+        self._prune_cache()
+        if not is_stream(output):
+            self.cache.store_file(f"{APP_ID}:zip", self._zip_key(self.input_keys.items()), output)
+        self.cache.save()
+        print(f"ZIP created: {output if not is_stream(output) else '<stdout>'}")
+
+    def _prune_cache(self):
+        """Drop cached screens whose HTML file is no longer part of the build"""
+        for name in list(self.cache.entries):
+            if name.startswith(f"{APP_ID}:") and name != f"{APP_ID}:zip" \
+                    and name not in self.input_keys:
+                del self.cache.entries[name]
+                self.cache.dirty = True
+
+    def run(self, output=None):
+        """
+        Convert all HTML files in directory.
+        Each screen is written to the ZIP as soon as it is converted, so output
+        can be "-" or a pipe and memory doesn't grow with the number of screens.
+        The shell and shared components need every screen, those are held until the end.
+        """
+        output = output or self.output
+        with console_for(output):
+            html_files = sorted(self.html_dir.glob("*.html"))
+            
+            if not html_files:
+                print(f"No HTML files found in {self.html_dir}")
+                return
+            
+            print(f"Found {len(html_files)} HTML files")
+            
+            # Same inputs as the previous build - keep the existing ZIP
+            if not is_stream(output) and self.cache.enabled:
+                if self.cache.lookup_file(f"{APP_ID}:zip", self._bundle_key(html_files), output):
+                    print(f"Done! ZIP unchanged: {output}")
+                    return output
+            
+            with BundleWriter(output, compression=self.compression, fmt=self.format) as bundle:
+                for html_file in html_files:
+                    print(f"Converting {html_file.name}...")
+                    self.convert_html_file(html_file, None if self.holds_screens else bundle)
+                if self.holds_screens:
+                    self.share_screen_parts()
+                    for screen_name, screen_json in self.runtime["screens"].items():
+                        bundle.write_json(f"screens/{screen_name}.json", screen_json)
+                
+                print("Writing app documents...")
+                self.write_app_documents(bundle)
+            
+            self._finish_build(output)
+            print(f"Done! ZIP created at: {output if not is_stream(output) else '<stdout>'}")
+            return output
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    html_dir = sys.argv[1] if len(sys.argv) > 1 else "./html_screens"
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "./output"
+    arg_parser = argparse.ArgumentParser(description="Convert multiple HTML files to a single multi-screen ZIP")
+    arg_parser.add_argument("html_dir", nargs="?", default="./html_screens")
+    arg_parser.add_argument("output_dir", nargs="?", default="./output",
+                            help='Output directory, or "-" to stream the ZIP to stdout')
+    arg_parser.add_argument("-o", "--output",
+                            help='ZIP file to write, or "-" for stdout (default: <output_dir>/multi_screen_app.zip)')
+    arg_parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER,
+                            help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    arg_parser.add_argument("--format", choices=FORMATS, default=DEFAULT_FORMAT,
+                            help=f"Bundle document format (default: {DEFAULT_FORMAT})")
+    arg_parser.add_argument("--compression", choices=available_policies(), default=DEFAULT_POLICY,
+                            help=f"ZIP compression policy (default: {DEFAULT_POLICY})")
+    arg_parser.add_argument("--components", action="store_true",
+                            help="Write repeated widget subtrees once to components.json")
+    arg_parser.add_argument("--shell", action="store_true",
+                            help="Write the header and navigation shared by all screens once to app.json")
+    arg_parser.add_argument("--expressions", action="store_true",
+                            help="Compile v-if/v-show/v-model/:class expressions once into expressions.json")
+    arg_parser.add_argument("--dependencies", action="store_true",
+                            help="Index which nodes of each screen read each state key")
+    arg_parser.add_argument("--force", action="store_true",
+                            help="Reconvert every file, ignoring the build cache")
+    args = arg_parser.parse_args()
     
-    converter = MultiScreenConverter(html_dir, output_dir)
-    converter.run()
+    converter = MultiScreenConverter(args.html_dir, args.output_dir, parser=args.parser,
+                                     use_cache=not args.force, fmt=args.format,
+                                     shared_components=args.components, shell=args.shell,
+                                     compression=args.compression, compile_expressions=args.expressions,
+                                     dependencies=args.dependencies)
+    converter.run(args.output)
 
@@ -2,238 +2,478 @@
 """
 Convert index.html to static version by removing Vue.js directives
 and making all tabs visible (but only first tab shown by default)
+
+All directive rules are applied in a single pass: one combined pattern
+finds the next directive, and the rule that owns it rewrites it. The output
+of a rule is only rescanned by the rules that come after it. Files are
+streamed in chunks that end right after a tag, a comment or a script/style
+element, so memory is bounded by the largest of those, not by the page.
+
+The static values of {{ }} interpolations and of v-if / v-model / v-for /
+:class bindings come from rules (DEFAULT_RULES - the CASPIT test page),
+which a JSON or YAML file can replace for other apps:
+
+    {
+      "interpolations": {"config.brokerUrl": "https://212.235.22.50:5000", "stats.": "0"},
+      "default": "",
+      "bindings": {
+        "v-if": {"isConnected": "style=\\"display: none;\\""},
+        "v-model": {"config.terminalId": "value=\\"0880264\\""}
+      }
+    }
+
+An interpolation gets the value of the first key (in file order) that
+occurs in its expression, a binding attribute is replaced when its value
+is a key. --stats prints how often every rule fired.
+
+    python convert_to_static.py [index.html] [index_static.html] [--rules rules.json] [--stats]
 """
 
+import json
+import os
 import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional
+    yaml = None
+
+CHUNK_SIZE = 1 << 16
+
+# Bindings whose attribute a rules file can replace
+BINDINGS = ("v-model", "v-if", "v-for", ":class")
+
+# Static values of the CASPIT test page.
+#   interpolations - {{ expr }} -> value of the first key (in order) found in expr
+#   default        - value of an interpolation no key is found in
+#   bindings       - attribute value -> replacement of the whole attribute;
+#                    attributes not listed are left as they are
+DEFAULT_RULES = {
+    "interpolations": {
+        "amount / 100": "100.00",
+        "xmlView": "JSON",
+        "statusText": "לא מחובר",
+        "config.brokerUrl": "https://212.235.22.50:5000",
+        "stats.totalRequests": "0",
+        "stats.successCount": "0",
+        "stats.errorCount": "0",
+        "log.time": "10:39:54",
+        "log.message": "CASPIT SDK נטען בהצלחה",
+        "trans.amount": "0.00",
+        "trans.uid": "",
+        "trans.timestamp": "",
+        "trans.status": "success",
+        "trans.authNo": "",
+        "trans.cardName": "",
+        "trans.pan": "",
+        "filesPagination.statisCurrentRecord": "0",
+        "filesPagination.statisTotalRecords": "0",
+        "filesPagination.tranCurrentRecord": "0",
+        "filesPagination.tranTotalRecords": "0",
+        "advancedTran.showFuel": "▶",
+    },
+    "default": "",
+    "bindings": {
+        "v-if": {
+            # Show the empty states, hide the connection status
+            "filteredLogs.length === 0": "",
+            "transactionHistory.length === 0": "",
+            "isConnected": 'style="display: none;"',
+        },
+    },
+}
+
+
+class StaticRules:
+    """
+    Compiled rules (DEFAULT_RULES by default) with a hit counter per rule.
+
+    The interpolation keys are compiled into one pattern that finds the
+    first key at every position of an expression; the rule of each distinct
+    expression is resolved once and then looked up, like the bindings.
+    """
+
+    def __init__(self, rules=None):
+        rules = DEFAULT_RULES if rules is None else rules
+        _check_rules(rules)
+        self.interpolations = list(rules.get("interpolations", {}).items())
+        self.default = rules.get("default", "")
+        self.bindings = {name: dict(rules.get("bindings", {}).get(name, {})) for name in BINDINGS}
+        # (binding or "{{ }}", key) -> hits, key None for no rule
+        self.hits = Counter()
+        self._finder = re.compile("(?=" + "|".join(
+            f"(?P<k{n}>{re.escape(key)})" for n, (key, _) in enumerate(self.interpolations)
+        ) + ")") if self.interpolations else None
+        self._resolved = {}  # expression -> index of its rule, None for the default
+
+    def _rule_of(self, expression):
+        try:
+            return self._resolved[expression]
+        except KeyError:
+            pass
+        found = None
+        if self._finder is not None:
+            for match in self._finder.finditer(expression):
+                n = int(match.lastgroup[1:])
+                if found is None or n < found:
+                    found = n
+                    if n == 0:
+                        break
+        self._resolved[expression] = found
+        return found
+
+    def interpolate(self, expression: str) -> str:
+        """Static value of a {{ }} expression"""
+        n = self._rule_of(expression)
+        if n is None:
+            self.hits["{{ }}", None] += 1
+            return self.default
+        key, value = self.interpolations[n]
+        self.hits["{{ }}", key] += 1
+        return value
+
+    def binding(self, name: str, attribute: str, value: str) -> str:
+        """Replacement of a binding attribute (name="value")"""
+        table = self.bindings[name]
+        if value in table:
+            self.hits[name, value] += 1
+            return table[value]
+        self.hits[name, None] += 1
+        return attribute
+
+    def report(self):
+        """Hit count lines of every rule, in rule order, then the unmatched ones"""
+        rules = [("{{ }}", key, f"{{{{ {key} }}}}") for key, _ in self.interpolations]
+        for name in BINDINGS:
+            rules += [(name, key, f'{name}="{key}"') for key in self.bindings[name]]
+        rules.append(("{{ }}", None, "{{ }} (default)"))
+        rules += [(name, None, f"{name} (not listed)") for name in BINDINGS]
+        return [f"{self.hits[kind, key]:8}  {label}" for kind, key, label in rules]
+
+
+def _check_rules(rules):
+    if not isinstance(rules, dict):
+        raise ValueError("Rules must be a mapping")
+    unknown = set(rules) - {"interpolations", "default", "bindings"}
+    if unknown:
+        raise ValueError(f"Unknown rules section(s): {', '.join(sorted(unknown))}")
+    tables = [("interpolations", rules.get("interpolations", {}))]
+    bindings = rules.get("bindings", {})
+    if not isinstance(bindings, dict):
+        raise ValueError("'bindings' must be a mapping")
+    for name, table in bindings.items():
+        if name not in BINDINGS:
+            raise ValueError(f"Unknown binding '{name}' (choose from: {', '.join(BINDINGS)})")
+        tables.append((f"bindings.{name}", table))
+    for section, table in tables:
+        if not isinstance(table, dict):
+            raise ValueError(f"'{section}' must be a mapping")
+        for key, value in table.items():
+            if not isinstance(key, str) or not isinstance(value, str):
+                raise ValueError(f"'{section}': {key!r}: keys and values must be strings")
+    if not isinstance(rules.get("default", ""), str):
+        raise ValueError("'default' must be a string")
+
+
+def load_rules(path):
+    """StaticRules from a JSON or YAML (requires PyYAML) rules file"""
+    path = Path(path)
+    with open(path, encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ValueError("YAML rules require: pip install pyyaml")
+            rules = yaml.safe_load(f)
+        else:
+            rules = json.load(f)
+    return StaticRules(rules)
+
+
+_DEFAULT = StaticRules()
+
+
+def _hide_inactive_tab(match):
+    """v-show tab panels - show first tab, hide others"""
+    tab_name = match.group(1)
+    attrs = match.group(2)
+
+    # First tab (settings) should be visible, others hidden
+    if tab_name == 'settings':
+        return f'<div {attrs}>'
+    else:
+        # Add display: none for other tabs
+        if 'style=' in attrs:
+            # Append to existing style
+            attrs = _STYLE.sub(r'style="\1; display: none;"', attrs)
+        else:
+            attrs = f'style="display: none;" {attrs}'
+        return f'<div {attrs}>'
+
+
+def replace_interpolation(match, rules=None):
+    """Remove {{ }} interpolations and replace with static values"""
+    return (rules or _DEFAULT).interpolate(match.group(1))
+
+
+def _binding(name):
+    """Replacement of a name binding (v-if, v-model ...) from the rules"""
+    def replace(match, rules=None):
+        return (rules or _DEFAULT).binding(name, match.group(0), match.group(1))
+    return replace
+
+
+_STYLE = re.compile(r'style="([^"]*)"')
+_V_CLOAK = re.compile(r'\s+v-cloak')
+_TAB = re.compile(r'<div\s+v-show="activeTab\s*===\s*[\'"](\w+)[\'"]"\s*([^>]*)>')
+
+
+def _static_tab(text):
+    # v-cloak is removed before tabs are matched, also between <div and v-show
+    text = _V_CLOAK.sub('', text)
+    match = _TAB.match(text)
+    if match is None:
+        return text
+    return _hide_inactive_tab(match) + text[match.end():]
 
-def convert_to_static(html_content):
-    """Convert Vue.js HTML to static HTML"""
-    
+
+# (pattern, replacement) in the order the rules apply: a string replaces the
+# match, a function gets the match of its own pattern and the StaticRules.
+# A rule's output is rescanned by the rules after it only.
+RULES = [
     # Remove v-cloak attribute
-    html_content = re.sub(r'\s+v-cloak', '', html_content)
-    
-    # Remove Vue script tags
-    html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL)
-    
-    # Remove Vue CDN links
-    html_content = re.sub(r'<script[^>]*src="https://unpkg.com/vue[^"]*"[^>]*></script>', '', html_content)
-    
+    (r'\s+v-cloak', ''),
+    # Remove Vue script tags (Vue CDN links included)
+    (r'<script[^>]*>.*?</script>', ''),
     # Remove v-cloak style
-    html_content = re.sub(r'\[v-cloak\]\s*\{[^}]*\}', '', html_content)
-    
+    (r'\[v-cloak\]\s*\{[^}]*\}', ''),
     # Handle v-show directives - show first tab, hide others
-    tab_contents = []
-    tab_pattern = r'<div\s+v-show="activeTab\s*===\s*[\'"](\w+)[\'"]"\s*([^>]*)>'
-    
-    def replace_v_show(match):
-        tab_name = match.group(1)
-        attrs = match.group(2)
-        
-        # First tab (settings) should be visible, others hidden
-        if tab_name == 'settings':
-            return f'<div {attrs}>'
-        else:
-            # Add display: none for other tabs
-            if 'style=' in attrs:
-                # Append to existing style
-                attrs = re.sub(r'style="([^"]*)"', r'style="\1; display: none;"', attrs)
-            else:
-                attrs = f'style="display: none;" {attrs}'
-            return f'<div {attrs}>'
-    
-    html_content = re.sub(tab_pattern, replace_v_show, html_content)
-    
-    # Remove v-model attributes and add value/checked attributes
-    def replace_v_model(match):
-        element = match.group(0)
-        v_model = match.group(1)
-        
-        # For inputs, add value attribute
-        if '<input' in element:
-            if 'type="checkbox"' in element:
-                # For checkboxes, add checked if it's likely checked
-                if 'debug' in v_model.lower() or 'mock' in v_model.lower():
-                    element = element.replace('v-model=', 'checked ')
-                else:
-                    element = element.replace('v-model=', '')
-            elif 'type="number"' in element:
-                # For number inputs, add default value
-                if 'amount' in v_model.lower():
-                    element = element.replace('v-model.number=', 'value="10000" ')
-                elif 'timeout' in v_model.lower():
-                    element = element.replace('v-model.number=', 'value="10" ')
-                else:
-                    element = element.replace('v-model.number=', 'value="0" ')
-            else:
-                # For text inputs, add default value
-                if 'brokerUrl' in v_model:
-                    element = element.replace('v-model=', 'value="https://212.235.22.50:5000" ')
-                elif 'terminalId' in v_model:
-                    element = element.replace('v-model=', 'value="0880264" ')
-                elif 'terminalNo' in v_model:
-                    element = element.replace('v-model=', 'value="001" ')
-                else:
-                    element = element.replace('v-model=', 'value="" ')
-        elif '<select' in element:
-            element = element.replace('v-model.number=', 'value="1" ')
-            element = element.replace('v-model=', 'value="1" ')
-        elif '<textarea' in element:
-            element = element.replace('v-model=', '')
-        
-        return element
-    
-    html_content = re.sub(r'v-model(?:\.number)?="([^"]+)"', replace_v_model, html_content)
-    
-    # Remove v-if directives and handle conditions
-    def replace_v_if(match):
-        condition = match.group(1)
-        element = match.group(0)
-        
-        # For most v-if conditions, hide the element
-        # But we can show some default states
-        if 'filteredLogs.length === 0' in condition:
-            # Show empty state
-            return element.replace('v-if="filteredLogs.length === 0"', '')
-        elif 'transactionHistory.length === 0' in condition:
-            # Show empty history
-            return element.replace('v-if="transactionHistory.length === 0"', '')
-        elif 'isConnected' in condition:
-            # Hide connection status elements
-            return element.replace('v-if="isConnected"', 'style="display: none;"')
-        else:
-            # Hide other conditional elements
-            return element.replace('v-if="[^"]*"', 'style="display: none;"')
-    
-    html_content = re.sub(r'v-if="([^"]+)"', replace_v_if, html_content)
-    
+    (r'<div(?:\s+v-cloak)*\s+v-show="activeTab\s*===\s*[\'"]\w+[\'"]"\s*[^>]*>', _static_tab),
+    (r'v-model(?:\.number)?="([^"]+)"', _binding('v-model')),
+    (r'v-if="([^"]+)"', _binding('v-if')),
     # Remove v-else
-    html_content = re.sub(r'\s+v-else', '', html_content)
-    
-    # Remove v-for directives
-    def replace_v_for(match):
-        element = match.group(0)
-        # For v-for, we'll show a single example or hide
-        if 'filteredLogs' in element:
-            # Show one example log entry
-            return element.replace('v-for="(log, index) in filteredLogs" :key="index"', '')
-        elif 'transactionHistory' in element:
-            # Hide history entries
-            return element.replace('v-for="(trans, index) in transactionHistory" :key="index"', 'style="display: none;"')
-        else:
-            return element.replace('v-for="[^"]*"', '')
-    
-    html_content = re.sub(r'v-for="([^"]+)"', replace_v_for, html_content)
-    
+    (r'\s+v-else', ''),
+    (r'v-for="([^"]+)"', _binding('v-for')),
     # Remove @click handlers
-    html_content = re.sub(r'\s+@click="[^"]*"', '', html_content)
-    
-    # Remove :class bindings and replace with static classes
-    def replace_class_binding(match):
-        binding = match.group(1)
-        element = match.group(0)
-        
-        # Handle common class bindings
-        if 'activeTab ===' in binding:
-            # Tab buttons - first is active
-            if "'settings'" in binding or '"settings"' in binding:
-                return element.replace(':class="[^"]*"', 'class="tab-button tab-active"')
-            else:
-                return element.replace(':class="[^"]*"', 'class="tab-button tab-inactive"')
-        elif 'xmlView' in binding:
-            # XML view button - default to JSON view
-            return element.replace(':class="[^"]*"', 'class="text-xs px-3 py-1 bg-gray-100 text-gray-600 rounded transition-colors"')
-        elif 'statusClass' in binding:
-            # Status - default to disconnected
-            return element.replace(':class="[^"]*"', 'class="text-red-600"')
-        elif 'isConnected' in binding:
-            # Connection indicator - default to disconnected
-            return element.replace(':class="[^"]*"', 'class="relative inline-flex rounded-full h-2.5 w-2.5 bg-red-500"')
-        elif 'getLogClass' in binding:
-            # Log entry - default to success
-            return element.replace(':class="[^"]*"', 'class="mb-1 leading-relaxed whitespace-pre-wrap break-words text-green-500"')
+    (r'\s+@click="[^"]*"', ''),
+    (r':class="([^"]+)"', _binding(':class')),
+    (r'\{\{\s*([^}]+)\s*\}\}', replace_interpolation),
+    # Remove :disabled / :value / :key bindings
+    (r'\s+:disabled="[^"]*"', ''),
+    (r'\s+:value="[^"]*"', ''),
+    (r'\s+:key="[^"]*"', ''),
+]
+
+_RULE_PATTERNS = [re.compile(pattern, re.DOTALL) for pattern, _ in RULES]
+
+_SPACES = r'\s+'
+
+# Every rule starts with one of these - the scanner skips other positions quickly
+_FIRST_CHARS = r'[\s<\[v:{]'
+
+
+def _scanner(start):
+    """
+    One alternation of the rules from index start on, group r<n> is rule n.
+    Rules starting with whitespace share one branch that is only tried where
+    a whitespace run starts - a match inside the run also matches from its
+    start, and trying every position would be quadratic in the indentation.
+    """
+    branches, spaced = [], []
+    for n in range(start, len(RULES)):
+        pattern = RULES[n][0]
+        if pattern.startswith(_SPACES):
+            spaced.append(f"(?P<r{n}>{pattern[len(_SPACES):]})")
         else:
-            # Remove binding, keep static classes
-            return element.replace(':class="[^"]*"', '')
-    
-    html_content = re.sub(r':class="([^"]+)"', replace_class_binding, html_content)
-    
-    # Remove {{ }} interpolations and replace with static values
-    def replace_interpolation(match):
-        expr = match.group(1)
-        
-        # Handle common interpolations
-        if 'amount / 100' in expr:
-            return '100.00'
-        elif 'xmlView' in expr:
-            return 'JSON'
-        elif 'statusText' in expr:
-            return 'לא מחובר'
-        elif 'config.brokerUrl' in expr:
-            return 'https://212.235.22.50:5000'
-        elif 'stats.totalRequests' in expr:
-            return '0'
-        elif 'stats.successCount' in expr:
-            return '0'
-        elif 'stats.errorCount' in expr:
-            return '0'
-        elif 'log.time' in expr:
-            return '10:39:54'
-        elif 'log.message' in expr:
-            return 'CASPIT SDK נטען בהצלחה'
-        elif 'trans.amount' in expr:
-            return '0.00'
-        elif 'trans.uid' in expr:
-            return ''
-        elif 'trans.timestamp' in expr:
-            return ''
-        elif 'trans.status' in expr:
-            return 'success'
-        elif 'trans.authNo' in expr:
-            return ''
-        elif 'trans.cardName' in expr:
-            return ''
-        elif 'trans.pan' in expr:
-            return ''
-        elif 'filesPagination.statisCurrentRecord' in expr:
-            return '0'
-        elif 'filesPagination.statisTotalRecords' in expr:
-            return '0'
-        elif 'filesPagination.tranCurrentRecord' in expr:
-            return '0'
-        elif 'filesPagination.tranTotalRecords' in expr:
-            return '0'
-        elif 'advancedTran.showFuel' in expr:
-            return '▶'
+            branches.append(f"(?P<r{n}>{pattern})")
+    if spaced:
+        branches.append(r'(?<!\s)' + _SPACES + '(?:' + "|".join(spaced) + ')')
+    return re.compile(f"(?={_FIRST_CHARS})(?:" + "|".join(branches) + ")", re.DOTALL)
+
+
+# Scanner for the rules from index i on
+_SCANNERS = [_scanner(start) for start in range(len(RULES))]
+_GROUP_RULES = {f"r{n}": n for n in range(len(RULES))}
+
+
+def _rewrite(text, rules, start=0):
+    """Apply the rules from index start on to text, in one pass"""
+    out = []
+    pos = 0
+    # (rule, result) -> result rewritten by the later rules; static values repeat
+    rescanned = {}
+    for match in _SCANNERS[start].finditer(text):
+        n = _GROUP_RULES[match.lastgroup]
+        replacement = RULES[n][1]
+        out.append(text[pos:match.start()])
+        pos = match.end()
+        if isinstance(replacement, str):
+            out.append(replacement)
+            continue
+        matched = match.group()
+        if replacement is _static_tab:
+            result = _static_tab(matched)
         else:
-            return ''
-    
-    html_content = re.sub(r'\{\{\s*([^}]+)\s*\}\}', replace_interpolation, html_content)
-    
-    # Remove :disabled bindings
-    html_content = re.sub(r'\s+:disabled="[^"]*"', '', html_content)
-    
-    # Remove :value bindings
-    html_content = re.sub(r'\s+:value="[^"]*"', '', html_content)
-    
-    # Remove :key bindings
-    html_content = re.sub(r'\s+:key="[^"]*"', '', html_content)
-    
-    return html_content
+            result = replacement(_RULE_PATTERNS[n].match(matched), rules)
+        if result and n + 1 < len(RULES):
+            key = (n, result)
+            if key not in rescanned:
+                rescanned[key] = _rewrite(result, rules, n + 1)
+            result = rescanned[key]
+        out.append(result)
+    out.append(text[pos:])
+    return "".join(out)
+
+
+_TAG_STOP = re.compile(r'[>"\']')
+
+
+def _segments(chunks):
+    """
+    Regroup text chunks into segments that end after a tag, a comment or a
+    script/style element (outside quoted attribute values and {{ }}
+    interpolations), so no directive is split between two segments.
+    """
+    buffer = ""
+    scan = 0          # where to continue scanning in buffer
+    cut = 0           # end of the complete part of buffer
+    state = "text"    # text, tag, interpolation, comment, raw (script/style)
+    quote = None
+    raw_end = None
+    for chunk in chunks:
+        buffer += chunk
+        n = len(buffer)
+        i = scan
+        while i < n:
+            if state == "text":
+                j = buffer.find("<", i)
+                k = buffer.find("{{", i, n if j < 0 else j)
+                if k >= 0:
+                    # {{ a<b&&c>d }} - an interpolation can hold < and >
+                    state, i = "interpolation", k + 2
+                    continue
+                # Wait for enough input to tell a comment from a tag
+                if j < 0 or j + 3 >= n:
+                    # (or a "{{" split between two chunks)
+                    i = j if j >= 0 else n - 1 if buffer.endswith("{") else n
+                    break
+                c = buffer[j + 1]
+                if buffer.startswith("<!--", j):
+                    state, i = "comment", j + 4
+                elif c.isalpha() or c in "/!?":
+                    state, i = "tag", j + 1
+                    tag_start = j
+                    quote = None
+                else:
+                    i = j + 1
+            elif state == "tag":
+                if quote:
+                    j = buffer.find(quote, i)
+                    if j < 0:
+                        i = n
+                        break
+                    quote, i = None, j + 1
+                    continue
+                m = _TAG_STOP.search(buffer, i)
+                if not m:
+                    i = n
+                    break
+                if m.group() != ">":
+                    quote, i = m.group(), m.end()
+                    continue
+                i = m.end()
+                state = "text"
+                for name in ("script", "style"):
+                    if buffer.startswith("<" + name, tag_start):
+                        state, raw_end = "raw", "</" + name + ">"
+                if state == "text":
+                    cut = i
+            elif state == "interpolation":
+                # The interpolation rule stops at the first "}"
+                j = buffer.find("}", i)
+                if j < 0:
+                    i = n
+                    break
+                state, i = "text", j + 1
+            elif state == "comment":
+                j = buffer.find("-->", i)
+                if j < 0:
+                    i = max(i, n - 2)
+                    break
+                i = cut = j + 3
+                state = "text"
+            else:
+                j = buffer.find(raw_end, i)
+                if j < 0:
+                    i = max(i, n - len(raw_end) + 1)
+                    break
+                i = cut = j + len(raw_end)
+                state = "text"
+        if cut >= CHUNK_SIZE:
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+            i -= cut
+            if state == "tag":
+                tag_start -= cut
+            cut = 0
+        scan = i
+    if buffer:
+        yield buffer
+
+
+def convert_to_static(html_content, rules=None):
+    """Convert Vue.js HTML to static HTML (rules: StaticRules, the defaults if None)"""
+    return _rewrite(html_content, rules or _DEFAULT)
+
+
+def convert_file(source, target, encoding='utf-8', rules=None):
+    """
+    Convert a file, streamed in chunks. The output goes to a temporary file
+    next to target that replaces it at the end, so target may be source.
+    """
+    rules = rules or _DEFAULT
+    target = Path(target)
+    tmp = target.with_name(target.name + '.tmp')
+    try:
+        with open(source, 'r', encoding=encoding) as src, open(tmp, 'w', encoding=encoding) as dst:
+            chunks = iter(lambda: src.read(CHUNK_SIZE), '')
+            for segment in _segments(chunks):
+                dst.write(_rewrite(segment, rules))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, target)
+
 
 def main():
-    # Read the original HTML file
-    with open('index.html', 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a Vue.js page to static HTML")
+    parser.add_argument("source", nargs="?", default="index.html")
+    parser.add_argument("target", nargs="?", default="index_static.html")
+    parser.add_argument("--rules", help="JSON or YAML rules file (default: the CASPIT page values)")
+    parser.add_argument("--stats", action="store_true", help="print how often every rule fired")
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.rules) if args.rules else StaticRules()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
     # Convert to static
-    static_html = convert_to_static(html_content)
-    
-    # Write the static version
-    with open('index_static.html', 'w', encoding='utf-8') as f:
-        f.write(static_html)
-    
-    print("Conversion complete! Created index_static.html")
+    try:
+        convert_file(args.source, args.target, rules=rules)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
 
-if __name__ == '__main__':
-    main()
+    print(f"Conversion complete! Created {args.target}")
+    if args.stats:
+        print("\n".join(rules.report()))
+    return 0
 
+
+if __name__ == '__main__':
+    sys.exit(main())
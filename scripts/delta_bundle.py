@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Delta bundles between two versions of an app.
+
+make_delta() compares two bundles written by the converters and produces a
+patch archive with only what changed:
+
+    delta.json        - manifest: added / changed / deleted entries, the
+                        SHA-256 of every entry of the new bundle, the SHA-256
+                        of both bundles and the layout of the new bundle
+    entries/<name>    - the raw ZIP record (header + compressed data) of
+                        every added or changed entry
+    index.bin         - the rest of the new archive that is not in the old
+                        one: headers of unchanged entries (their timestamps
+                        change on every build) and the central directory
+
+apply_delta() rebuilds the new bundle byte for byte: the compressed data of
+unchanged entries is copied from the old bundle, everything else comes from
+the patch. Nothing is decompressed or compressed again, so the result does
+not depend on the zlib version, and it is checked against the SHA-256 of
+the new bundle. Unchanged data is matched by content, so a renamed screen
+or asset is not shipped again either.
+
+    python delta_bundle.py make OLD.zip NEW.zip -o PATCH.zip
+    python delta_bundle.py apply OLD.zip PATCH.zip -o NEW.zip
+"""
+import hashlib
+import io
+import json
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+DELTA_FORMAT = "dynamicui-delta"
+DELTA_VERSION = 1
+MANIFEST_NAME = "delta.json"
+INDEX_NAME = "index.bin"
+ENTRY_PREFIX = "entries/"
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _records(data: bytes):
+    """
+    Split an archive into its entry records.
+
+    Returns:
+        ([(name, header start, data start, data end, record end)], central directory start)
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        infos = sorted(zf.infolist(), key=lambda info: info.header_offset)
+        directory_start = zf.start_dir
+    records = []
+    for i, info in enumerate(infos):
+        start = info.header_offset
+        fields = _LOCAL_HEADER.unpack_from(data, start)
+        if fields[0] != _LOCAL_HEADER_SIGNATURE:
+            raise ValueError(f"Bad local header for {info.filename}")
+        name_length, extra_length = fields[-2], fields[-1]
+        data_start = start + _LOCAL_HEADER.size + name_length + extra_length
+        data_end = data_start + info.compress_size
+        end = infos[i + 1].header_offset if i + 1 < len(infos) else directory_start
+        records.append((info.filename, start, data_start, data_end, end))
+    return records, directory_start
+
+
+def _entry_hashes(data: bytes) -> dict:
+    """{name: {"sha256", "size"}} of the uncompressed entries"""
+    hashes = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for info in zf.infolist():
+            content = zf.read(info)
+            hashes[info.filename] = {"sha256": _sha256(content), "size": len(content)}
+    return hashes
+
+
+def make_delta(old_path, new_path, patch_path) -> dict:
+    """
+    Write the patch that turns the old bundle into the new one.
+
+    Returns:
+        the manifest (delta.json)
+    """
+    old = Path(old_path).read_bytes()
+    new = Path(new_path).read_bytes()
+
+    old_records, _ = _records(old)
+    new_records, directory_start = _records(new)
+
+    # Compressed data of the old bundle by content
+    old_data = {}
+    for _, _, data_start, data_end, _ in old_records:
+        old_data.setdefault(_sha256(old[data_start:data_end]), (data_start, data_end - data_start))
+
+    old_hashes = _entry_hashes(old)
+    new_hashes = _entry_hashes(new)
+
+    index = bytearray()
+    entries = {}
+    layout = []
+
+    def from_index(start, end):
+        if end > start:
+            layout.append(["index", len(index), end - start])
+            index.extend(new[start:end])
+
+    from_index(0, new_records[0][1] if new_records else directory_start)
+    for name, start, data_start, data_end, end in new_records:
+        reused = old_data.get(_sha256(new[data_start:data_end]))
+        if reused is not None and data_end > data_start:
+            from_index(start, data_start)
+            layout.append(["base", reused[0], reused[1]])
+            from_index(data_end, end)
+        else:
+            entries[name] = new[start:end]
+            layout.append(["entry", name])
+    from_index(directory_start, len(new))
+
+    manifest = {
+        "format": DELTA_FORMAT,
+        "version": DELTA_VERSION,
+        "base": {"sha256": _sha256(old), "size": len(old)},
+        "target": {"sha256": _sha256(new), "size": len(new)},
+        "added": sorted(set(new_hashes) - set(old_hashes)),
+        "changed": sorted(name for name in set(new_hashes) & set(old_hashes)
+                          if new_hashes[name] != old_hashes[name]),
+        "deleted": sorted(set(old_hashes) - set(new_hashes)),
+        "entries": new_hashes,
+        "layout": layout,
+    }
+
+    with zipfile.ZipFile(patch_path, "w", zipfile.ZIP_DEFLATED) as patch:
+        patch.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+        patch.writestr(INDEX_NAME, bytes(index))
+        for name, record in entries.items():
+            patch.writestr(ENTRY_PREFIX + name, record)
+    return manifest
+
+
+def apply_delta(old_path, patch_path, new_path=None) -> bytes:
+    """
+    Rebuild the new bundle from the old one and a patch, verified against
+    the hashes in the manifest. Writes it to new_path (if given) and returns it.
+    """
+    old = Path(old_path).read_bytes()
+    with zipfile.ZipFile(patch_path) as patch:
+        manifest = json.loads(patch.read(MANIFEST_NAME).decode("utf-8"))
+        if manifest.get("format") != DELTA_FORMAT or manifest.get("version") != DELTA_VERSION:
+            raise ValueError(f"{patch_path} is not a version {DELTA_VERSION} delta bundle")
+        if _sha256(old) != manifest["base"]["sha256"]:
+            raise ValueError(f"{old_path} is not the bundle this patch was made for")
+
+        index = patch.read(INDEX_NAME)
+        out = bytearray()
+        for segment in manifest["layout"]:
+            kind = segment[0]
+            if kind == "base":
+                offset, length = segment[1], segment[2]
+                out.extend(old[offset:offset + length])
+            elif kind == "index":
+                offset, length = segment[1], segment[2]
+                out.extend(index[offset:offset + length])
+            else:
+                out.extend(patch.read(ENTRY_PREFIX + segment[1]))
+
+    new = bytes(out)
+    if _sha256(new) != manifest["target"]["sha256"]:
+        raise ValueError("Rebuilt bundle does not match the target hash")
+    if _entry_hashes(new) != manifest["entries"]:
+        raise ValueError("Rebuilt bundle entries do not match the manifest")
+    if new_path is not None:
+        Path(new_path).write_bytes(new)
+    return new
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create and apply delta bundles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    make = commands.add_parser("make", help="patch from OLD to NEW")
+    make.add_argument("old")
+    make.add_argument("new")
+    make.add_argument("-o", "--output", required=True, help="patch archive to write")
+    apply = commands.add_parser("apply", help="rebuild NEW from OLD and a patch")
+    apply.add_argument("old")
+    apply.add_argument("patch")
+    apply.add_argument("-o", "--output", required=True, help="bundle to write")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "make":
+            manifest = make_delta(args.old, args.new, args.output)
+            patch_size = Path(args.output).stat().st_size
+            target_size = manifest["target"]["size"]
+            print(f"added {len(manifest['added'])}, changed {len(manifest['changed'])}, "
+                  f"deleted {len(manifest['deleted'])}")
+            print(f"Patch: {patch_size / 1024:.1f} KB "
+                  f"(full bundle {target_size / 1024:.1f} KB, {patch_size / target_size:.0%})")
+        else:
+            apply_delta(args.old, args.patch, args.output)
+            print(f"Rebuilt {args.output} (verified)")
+    except (ValueError, zipfile.BadZipFile, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
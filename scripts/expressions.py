@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Precompiled expression table for bundles.
+
+Nodes carry Vue expressions (v-if / v-show as visibleIf, v-model as bindTo,
+:class as classBinding, @click as the expression of a logic action) that
+the client would otherwise parse every time it evaluates them. compile()
+parses each one once at build time into a compact AST, stores every
+distinct AST once in an expression table and replaces the string with its
+index:
+
+    "visibleIf": "activeTab === 'settings'"  ->  "visibleIf": 3
+    expressions.json: {"version": 1, "expressions": [..., ["===", ["v", "activeTab"], "settings"], ...]}
+
+The table is written as expressions.json and app.json points at it under
+"expressions". Expressions that differ only in spacing or quotes share an
+entry. An AST is a JSON scalar (a literal) or a list [op, operands...]:
+
+    ["v", name]                      variable (state key, v-for item, $event)
+    [".", object, name]              member, ["?.", ...] optional member
+    ["[]", object, index]            computed member
+    ["call", callee, args...]        call
+    [op, a, b]                       binary: === !== == != < <= > >= + - * / % ** && || ?? in instanceof
+    ["!", a] ["neg", a] ["pos", a] ["typeof", a] ["void", a]
+    ["?:", test, then, else]         conditional
+    ["=", target, value]             assignment, also += -= *= /= %= &&= ||= ??=
+    ["++x", target] ["x++", target]  (and -- likewise)
+    ["arr", items...]  ["obj", key, value, key, value...]
+    [";", expressions...]            statements of a handler (a(); b())
+
+An @click that only names a method (@click="getTotal") compiles to the
+method reference; the client calls it, like Vue does. Anything the parser
+doesn't know (arrow functions, template substitutions ...) keeps its
+source instead: {"source": "..."}.
+"""
+import json
+import re
+
+from js_literals import JSSyntaxError, parse_value
+
+EXPRESSIONS_NAME = "expressions.json"
+EXPRESSIONS_VERSION = 1
+
+# Node keys holding an expression
+EXPRESSION_KEYS = ("visibleIf", "bindTo", "classBinding")
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<name>[A-Za-z_$\u00a0-\uffff][\w$\u00a0-\uffff]*)
+  | (?P<literal>['"`]|\.?\d)
+  | (?P<punct>\?\?=|\|\|=|&&=|\*\*|===|!==|\?\.|\.\.\.|==|!=|<=|>=|&&|\|\||\?\?|\+\+|--|[-+*/%]=|=>|[-+*/%<>!=?:.,;()\[\]{}])
+""", re.X)
+
+_NAMED_LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+
+# Binary operators: binding power (higher binds tighter)
+_BINARY = {
+    "??": 4, "||": 5, "&&": 6,
+    "===": 9, "!==": 9, "==": 9, "!=": 9,
+    "<": 10, "<=": 10, ">": 10, ">=": 10, "in": 10, "instanceof": 10,
+    "+": 11, "-": 11,
+    "*": 12, "/": 12, "%": 12,
+    "**": 13,
+}
+_ASSIGNMENT = {"=", "+=", "-=", "*=", "/=", "%=", "&&=", "||=", "??="}
+_UNARY = {"!": "!", "-": "neg", "+": "pos", "typeof": "typeof", "void": "void"}
+_UNARY_POWER = 14
+_CONDITIONAL_POWER = 3
+
+
+def _tokenize(source: str):
+    """[(kind, value)] - kind is "name", "literal" or "punct" """
+    tokens = []
+    pos, n = 0, len(source)
+    while pos < n:
+        match = _TOKEN.match(source, pos)
+        if not match:
+            raise JSSyntaxError(f"Unexpected {source[pos]!r} at offset {pos}")
+        kind = match.lastgroup
+        if kind == "literal":
+            value, pos = parse_value(source, pos)
+            tokens.append(("literal", value))
+            continue
+        if kind != "space":
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self.tokens = _tokenize(source)
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else ("end", None)
+
+    def next(self):
+        token = self.peek()
+        self.index += 1
+        return token
+
+    def accept(self, value) -> bool:
+        if self.peek() == ("punct", value):
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise JSSyntaxError(f"Expected {value!r}, got {self.peek()[1]!r}")
+
+    def program(self):
+        statements = []
+        while self.peek()[0] != "end":
+            if self.accept(";") or self.accept(","):
+                continue
+            statements.append(self.expression(0))
+            if self.peek()[0] != "end" and self.peek() not in (("punct", ";"), ("punct", ",")):
+                raise JSSyntaxError(f"Unexpected {self.peek()[1]!r}")
+        if not statements:
+            raise JSSyntaxError("Empty expression")
+        return statements[0] if len(statements) == 1 else [";", *statements]
+
+    def expression(self, min_power):
+        left = self.unary()
+        while True:
+            kind, value = self.peek()
+            if kind == "punct" and value in _ASSIGNMENT and min_power <= 2:
+                if not _is_target(left):
+                    raise JSSyntaxError("Invalid assignment target")
+                self.index += 1
+                left = [value, left, self.expression(2)]
+            elif kind == "punct" and value == "?" and min_power <= _CONDITIONAL_POWER:
+                self.index += 1
+                then = self.expression(2)
+                self.expect(":")
+                left = ["?:", left, then, self.expression(2)]
+            elif value in _BINARY and kind in ("punct", "name") and _BINARY[value] > min_power:
+                self.index += 1
+                power = _BINARY[value]
+                # ** is right-associative
+                left = [value, left, self.expression(power - 1 if value == "**" else power)]
+            else:
+                return left
+
+    def unary(self):
+        kind, value = self.peek()
+        if value in _UNARY and kind in ("punct", "name"):
+            self.index += 1
+            return [_UNARY[value], self.expression(_UNARY_POWER)]
+        if kind == "punct" and value in ("++", "--"):
+            self.index += 1
+            target = self.postfix()
+            if not _is_target(target):
+                raise JSSyntaxError("Invalid update target")
+            return [value + "x", target]
+        result = self.postfix()
+        kind, value = self.peek()
+        if kind == "punct" and value in ("++", "--") and _is_target(result):
+            self.index += 1
+            return ["x" + value, result]
+        return result
+
+    def postfix(self):
+        node = self.primary()
+        while True:
+            if self.accept("."):
+                node = [".", node, self.property_name()]
+            elif self.accept("?."):
+                if self.accept("("):
+                    raise JSSyntaxError("Optional call")
+                node = ["?.", node, self.property_name()]
+            elif self.accept("["):
+                index = self.expression(0)
+                self.expect("]")
+                node = ["[]", node, index]
+            elif self.accept("("):
+                node = ["call", node, *self.arguments(")")]
+            else:
+                return node
+
+    def property_name(self):
+        kind, value = self.next()
+        if kind != "name":
+            raise JSSyntaxError(f"Expected a property name, got {value!r}")
+        return value
+
+    def arguments(self, closing):
+        items = []
+        while not self.accept(closing):
+            if self.peek() == ("punct", "..."):
+                raise JSSyntaxError("Spread")
+            items.append(self.expression(2))
+            if not self.accept(","):
+                self.expect(closing)
+                break
+        return items
+
+    def primary(self):
+        kind, value = self.next()
+        if kind == "literal":
+            return value
+        if kind == "name":
+            if value in _NAMED_LITERALS:
+                return _NAMED_LITERALS[value]
+            if self.peek() == ("punct", "=>"):
+                raise JSSyntaxError("Arrow function")
+            return ["v", value]
+        if (kind, value) == ("punct", "("):
+            node = self.expression(0)
+            self.expect(")")
+            if self.peek() == ("punct", "=>"):
+                raise JSSyntaxError("Arrow function")
+            return node
+        if (kind, value) == ("punct", "["):
+            return ["arr", *self.arguments("]")]
+        if (kind, value) == ("punct", "{"):
+            return self.object()
+        raise JSSyntaxError(f"Unexpected {value!r}")
+
+    def object(self):
+        node = ["obj"]
+        while not self.accept("}"):
+            kind, key = self.next()
+            if kind == "literal" and isinstance(key, (str, int, float)) and not isinstance(key, bool):
+                key = str(key)
+            elif kind != "name":
+                raise JSSyntaxError(f"Unsupported object key {key!r}")
+            if self.accept(":"):
+                value = self.expression(2)
+            elif kind == "name":
+                value = ["v", key]  # shorthand { key }
+            else:
+                raise JSSyntaxError("Expected ':'")
+            node += [key, value]
+            if not self.accept(","):
+                self.expect("}")
+                break
+        return node
+
+
+def _is_target(node) -> bool:
+    return isinstance(node, list) and node[0] in ("v", ".", "[]")
+
+
+def compile_expression(source: str):
+    """AST of an expression (see the module docstring); raises ValueError if it can't be compiled"""
+    return _Parser(source).program()
+
+
+class ExpressionTable:
+    """Distinct compiled expressions of a bundle, by index"""
+
+    def __init__(self):
+        self.expressions = []
+        self._indexes = {}     # compact JSON of the AST (or source) -> index
+        self.references = 0
+
+    def add(self, source: str) -> int:
+        """Index of an expression, compiled and added if it is new"""
+        self.references += 1
+        try:
+            entry = compile_expression(source)
+        except (ValueError, RecursionError):
+            entry = {"source": source.strip()}
+        key = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = len(self.expressions)
+            self.expressions.append(entry)
+        return index
+
+    def __len__(self):
+        return len(self.expressions)
+
+    def document(self) -> dict:
+        return {"version": EXPRESSIONS_VERSION, "expressions": self.expressions}
+
+
+def compile_documents(documents, table: ExpressionTable):
+    """
+    Replace the expression strings (EXPRESSION_KEYS) of every node in
+    documents ({name: document}) with their index in table, in place.
+    """
+    stack = [document for document in documents.values() if isinstance(document, (dict, list))]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key in EXPRESSION_KEYS:
+                if isinstance(node.get(key), str):
+                    node[key] = table.add(node[key])
+            values = node.values()
+        else:
+            values = node
+        # Reversed - indexes follow document order
+        stack.extend(reversed([v for v in values if isinstance(v, (dict, list))]))
+
+
+def compile_actions(actions: dict, table: ExpressionTable):
+    """Same for the "expression" of logic actions (actions.json), in place"""
+    for action in actions.values():
+        if isinstance(action, dict) and isinstance(action.get("expression"), str):
+            action["expression"] = table.add(action["expression"])
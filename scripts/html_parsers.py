@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends shared by all converters.
+
+Every converter builds its soup through make_soup(), so the backend is
+chosen with --parser instead of being hard-coded to 'html.parser':
+
+    html.parser  - stdlib, always available (default)
+    lxml         - pip install lxml
+    html5lib     - pip install html5lib
+    selectolax   - pip install selectolax (lexbor engine)
+
+selectolax is plugged in as a BeautifulSoup tree builder, so the
+converters keep using the regular Tag / NavigableString API on its output.
+Note that selectolax does not expose the contents of <template> elements.
+
+Running this file checks that every installed backend produces the same
+bundle JSON as html.parser and prints parse time per backend:
+
+    python html_parsers.py [html_dir] [--repeat N]
+"""
+import re
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Comment, Doctype
+from bs4.builder import HTMLTreeBuilder, ParserRejectedMarkup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional
+    LexborHTMLParser = None
+
+
+PARSERS = ["html.parser", "lxml", "html5lib", "selectolax"]
+DEFAULT_PARSER = "html.parser"
+
+
+class SelectolaxTreeBuilder(HTMLTreeBuilder):
+    """Feeds a selectolax (lexbor) parse tree into BeautifulSoup"""
+
+    NAME = "selectolax"
+    features = [NAME, "html", "fast"]
+
+    def feed(self, markup):
+        if LexborHTMLParser is None:
+            raise ParserRejectedMarkup("selectolax is not installed")
+        if isinstance(markup, bytes):
+            markup = markup.decode("utf-8", "replace")
+
+        soup = self.soup
+        document = LexborHTMLParser(markup).root.parent
+
+        # Explicit stack so deeply nested markup can't hit the recursion limit.
+        # Entries are nodes, or tag names (str) marking where an element ends.
+        stack = self._children(document)
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                soup.endData()
+                soup.handle_endtag(node)
+                continue
+
+            tag = node.tag
+            if tag == "-text":
+                soup.handle_data(node.text_content)
+            elif tag == "-comment":
+                soup.endData()
+                soup.handle_data(node.html[len("<!--"):-len("-->")])
+                soup.endData(Comment)
+            elif tag == "-doctype":
+                soup.endData()
+                soup.handle_data(node.html[len("<!DOCTYPE "):-1])
+                soup.endData(Doctype)
+            elif node.is_element_node:
+                attrs = {
+                    name: "" if value is None else value
+                    for name, value in node.attributes.items()
+                }
+                soup.endData()
+                soup.handle_starttag(tag, None, None, attrs)
+                stack.append(tag)
+                stack.extend(self._children(node))
+
+    @staticmethod
+    def _children(node):
+        """Children of a selectolax node, reversed for popping off a stack"""
+        children = []
+        child = node.child
+        while child is not None:
+            children.append(child)
+            child = child.next
+        children.reverse()
+        return children
+
+    def test_fragment_to_document(self, fragment):
+        return "<html><body>%s</body></html>" % fragment
+
+
+def available_parsers():
+    """Parser backends that can be used in this environment"""
+    available = []
+    for parser in PARSERS:
+        try:
+            make_soup("<p></p>", parser)
+        except Exception:
+            continue
+        available.append(parser)
+    return available
+
+
+def make_soup(markup, parser=DEFAULT_PARSER):
+    """Parse markup with the requested backend"""
+    if parser == "selectolax":
+        if LexborHTMLParser is None:
+            raise ValueError("Parser 'selectolax' requires: pip install selectolax")
+        soup = BeautifulSoup(markup, builder=SelectolaxTreeBuilder())
+    elif parser in PARSERS:
+        soup = BeautifulSoup(markup, parser)
+    else:
+        raise ValueError(f"Unknown parser '{parser}' (choose from: {', '.join(PARSERS)})")
+
+    if parser != "html.parser":
+        _drop_implied_wrappers(soup, markup)
+    return soup
+
+
+_WRAPPER_TAG = re.compile(r"<(html|head|body)[\s/>]", re.I)
+
+
+def _drop_implied_wrappers(soup, markup):
+    """
+    HTML5 parsers add <html>/<head>/<body> to partial pages such as
+    common_menu.html, html.parser doesn't. Unwrap the ones the markup never
+    had so every backend gives the converters the same tree shape.
+    """
+    if isinstance(markup, bytes):
+        markup = markup.decode("utf-8", "replace")
+    present = {name.lower() for name in _WRAPPER_TAG.findall(markup)}
+    for name in ("body", "head", "html"):
+        if name in present:
+            continue
+        tag = soup.find(name)
+        if tag is None:
+            continue
+        if tag.contents:
+            tag.unwrap()
+        else:
+            tag.decompose()
+
+
+# =========================================================
+# Conformance check + benchmark
+# =========================================================
+def _bundle_entries(zip_path):
+    with zipfile.ZipFile(zip_path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def _convert_with(parser, html_files, work_dir):
+    """Run the converters with one backend, return {bundle entry: bytes}"""
+    from convert_multiple_html_to_zip import MultiScreenConverter
+    from html_to_zip_converter import HTMLToZipConverter
+
+    entries = {}
+    multi = MultiScreenConverter(str(html_files[0].parent), str(work_dir / "multi"), parser=parser)
+    for html_file in html_files:
+        multi.convert_html_file(html_file)
+    for name, data in _bundle_entries(multi.build_zip()).items():
+        entries[f"multi_screen_app/{name}"] = data
+
+    for html_file in html_files:
+        converter = HTMLToZipConverter(str(html_file), str(work_dir / "single"), parser=parser)
+        try:
+            converter.convert()
+        except Exception as e:
+            entries[f"{html_file.stem}/error"] = str(e).encode("utf-8")
+            continue
+        zip_path = converter.output_dir / f"{converter.app_id}.zip"
+        for name, data in _bundle_entries(zip_path).items():
+            entries[f"{html_file.stem}/{name}"] = data
+    return entries
+
+
+def _time_parse(parser, sources, repeat):
+    """Median time (ms) to parse all sources once"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for source in sources:
+            make_soup(source, parser)
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+def main():
+    import argparse
+    import contextlib
+    import io
+
+    parser = argparse.ArgumentParser(description="Check and benchmark HTML parser backends")
+    parser.add_argument("html_dir", nargs="?", default="./html_screens")
+    parser.add_argument("--repeat", type=int, default=5, help="parse runs per backend (median is reported)")
+    args = parser.parse_args()
+
+    html_files = sorted(Path(args.html_dir).glob("*.html"))
+    if not html_files:
+        print(f"No HTML files found in {args.html_dir}")
+        return 1
+    sources = [f.read_text(encoding="utf-8") for f in html_files]
+    total_kb = sum(len(s.encode("utf-8")) for s in sources) / 1024
+
+    reference = None
+    failures = 0
+    rows = []
+    for backend in available_parsers():
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            entries = _convert_with(backend, html_files, Path(tmp))
+        if reference is None:
+            reference = entries
+            diff = []
+        else:
+            names = set(reference) | set(entries)
+            diff = sorted(n for n in names if reference.get(n) != entries.get(n))
+        failures += bool(diff)
+        rows.append((backend, _time_parse(backend, sources, args.repeat), diff))
+
+    print(f"{len(html_files)} files, {total_kb:.1f} KB, reference: {rows[0][0]}\n")
+    print(f"{'parser':<12} {'parse ms':>10} {'vs ref':>8}  bundle JSON")
+    base_ms = rows[0][1]
+    for backend, ms, diff in rows:
+        status = "identical" if not diff else f"{len(diff)} entries differ"
+        print(f"{backend:<12} {ms:>10.1f} {base_ms / ms:>7.2f}x  {status}")
+    for backend, _, diff in rows:
+        for name in diff:
+            print(f"  {backend}: {name}")
+
+    missing = [p for p in PARSERS if p not in (r[0] for r in rows)]
+    if missing:
+        print(f"\nNot installed: {', '.join(missing)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 import os
 import json
-import re
 import zipfile
 from pathlib import Path
-from bs4 import BeautifulSoup, Tag
 from typing import Dict, Any
+from bs4 import Tag
+
+import js_literals
+from html_parsers import DEFAULT_PARSER, make_soup
 
 
 class RuntimeConverter:
 
-    def __init__(self, html_path: str, output_dir: str):
+    def __init__(self, html_path: str, output_dir: str, parser: str = DEFAULT_PARSER):
         self.html_path = Path(html_path)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -18,7 +20,7 @@ class RuntimeConverter:
         with open(self.html_path, "r", encoding="utf-8") as f:
             self.html = f.read()
 
-        self.soup = BeautifulSoup(self.html, "html.parser")
+        self.soup = make_soup(self.html, parser)
 
         self.runtime = {
             "app": {},
@@ -34,44 +36,12 @@ class RuntimeConverter:
         script_tags = self.soup.find_all("script")
     
         for script in script_tags:
-            if script.string and "data()" in script.string:
-            
-                match = re.search(
-                    r"data\s*\(\)\s*{[^}]*return\s*{(.*?)}\s*}",
-                    script.string,
-                    re.DOTALL
-                )
-    
-                if match:
-                    raw_state = match.group(1)
-    
-                    state = {}
-    
-                    # מחלץ שורות כמו: key: value,
-                    pairs = re.findall(r"(\w+)\s*:\s*([^,\n]+)", raw_state)
+            # מערכים ואובייקטים נקראים במלואם, רק ביטויים נשארים "DYNAMIC"
+            state = js_literals.extract_vue_state(script.string)
     
-                    for key, value in pairs:
-                        value = value.strip()
-    
-                        # טיפול בערכים פשוטים בלבד
-                        if value in ["true", "false"]:
-                            state[key] = value == "true"
-                        elif value == "null":
-                            state[key] = None
-                        elif re.match(r"^\d+$", value):
-                            state[key] = int(value)
-                        elif re.match(r"^\d+\.\d+$", value):
-                            state[key] = float(value)
-                        elif value.startswith("'") or value.startswith('"'):
-                            state[key] = value.strip("'\"")
-                        else:
-                            # אם זה משהו מורכב (array / object / function)
-                            state[key] = "DYNAMIC"
-    
-                    self.runtime["state"] = state
-                    print("✅ Vue state extracted safely")
-
-
+            if state is not None:
+                self.runtime["state"] = state
+                print("✅ Vue state extracted safely")
 
     # ==========================
     # 2️⃣ Extract Layout
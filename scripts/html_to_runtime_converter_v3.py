@@ -1,22 +1,41 @@
 #!/usr/bin/env python3
-import json
-import re
-import zipfile
 from pathlib import Path
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
+
+import bindings
+import expressions
+import js_literals
+import tree_walker
+from bundle_writer import DEFAULT_FORMAT, FORMATS, BundleWriter, console_for, is_stream
+from compression_policy import DEFAULT_POLICY, available_policies
+from html_parsers import DEFAULT_PARSER, PARSERS, make_soup
+from tailwind_resolver import style_and_layout
 
 
 class RuntimeConverter:
 
-    def __init__(self, html_path: str, output_dir: str):
+    def __init__(self, html_path: str, output_dir: str, parser: str = DEFAULT_PARSER,
+                 fmt: str = DEFAULT_FORMAT, compression: str = DEFAULT_POLICY,
+                 compile_expressions: bool = False, dependencies: bool = False):
         self.html_path = Path(html_path)
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.format = fmt
+        self.compression = compression
+        self.compile_expressions = compile_expressions
+        self.expression_table = expressions.ExpressionTable()
+        self.dependencies = dependencies
+        if output_dir == "-":
+            # Stream the ZIP to stdout
+            self.output_dir = None
+            self.zip_path = "-"
+        else:
+            self.output_dir = Path(output_dir)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.zip_path = self.output_dir / f"{self.html_path.stem}.zip"
 
         with open(self.html_path, "r", encoding="utf-8") as f:
             self.html = f.read()
 
-        self.soup = BeautifulSoup(self.html, "html.parser")
+        self.soup = make_soup(self.html, parser)
 
         self.runtime = {
             "app": {},
@@ -32,86 +51,16 @@ class RuntimeConverter:
         scripts = self.soup.find_all("script")
 
         for script in scripts:
-            if script.string and "data()" in script.string:
-                match = re.search(
-                    r"data\s*\(\)\s*{[^}]*return\s*{(.*?)}\s*}",
-                    script.string,
-                    re.DOTALL
-                )
-
-                if match:
-                    raw = match.group(1)
-                    state = {}
-
-                    pairs = re.findall(r"(\w+)\s*:\s*([^,\n]+)", raw)
-
-                    for key, value in pairs:
-                        value = value.strip()
-
-                        if value in ["true", "false"]:
-                            state[key] = value == "true"
-                        elif value == "null":
-                            state[key] = None
-                        elif re.match(r"^\d+$", value):
-                            state[key] = int(value)
-                        elif re.match(r"^\d+\.\d+$", value):
-                            state[key] = float(value)
-                        elif value.startswith(("'", '"')):
-                            state[key] = value.strip("'\"")
-                        else:
-                            state[key] = "DYNAMIC"
-
-                    self.runtime["state"] = state
-                    print("✅ State extracted")
+            state = js_literals.extract_vue_state(script.string)
+            if state is not None:
+                self.runtime["state"] = state
+                print("✅ State extracted")
 
     # =========================================================
     # 2️⃣ Tailwind → Style Engine
     # =========================================================
     def parse_tailwind(self, classes):
-        style = {}
-        layout = {}
-
-        for c in classes:
-
-            # Padding
-            if c.startswith("p-"):
-                style["padding"] = int(c.split("-")[1]) * 4
-
-            # Gap
-            if c.startswith("gap-"):
-                layout["gap"] = int(c.split("-")[1]) * 4
-
-            # Rounded
-            if c.startswith("rounded"):
-                style["radius"] = 16
-
-            # Shadow
-            if c.startswith("shadow"):
-                style["elevation"] = 4
-
-            # Grid
-            if c.startswith("grid-cols-"):
-                layout["type"] = "grid"
-                layout["columns"] = int(c.split("-")[-1])
-
-            # Flex
-            if c == "flex":
-                layout["type"] = "row"
-
-            if c == "flex-col":
-                layout["type"] = "column"
-
-            if c.startswith("justify-"):
-                layout["mainAxis"] = c.split("-")[1]
-
-            if c.startswith("items-"):
-                layout["crossAxis"] = c.split("-")[1]
-
-            # Background
-            if c == "bg-white":
-                style["background"] = "#FFFFFF"
-
-        return style, layout
+        return style_and_layout(classes)
 
     # =========================================================
     # 3️⃣ Convert Element
@@ -121,6 +70,13 @@ class RuntimeConverter:
         if not isinstance(element, Tag):
             return None
 
+        return tree_walker.convert_element(element, self._enter_element, self._finish_element)
+
+    def convert_children(self, element):
+        return tree_walker.convert_children(element, self._enter_element, self._finish_element)
+
+    def _enter_element(self, element):
+
         tag = element.name.lower()
         classes = element.get("class", [])
 
@@ -147,6 +103,11 @@ class RuntimeConverter:
         if model:
             node["bindTo"] = model
 
+        # :class (only kept when expressions are compiled or indexed)
+        bound_class = element.get(":class")
+        if bound_class and (self.compile_expressions or self.dependencies):
+            node["classBinding"] = bound_class
+
         # =====================================================
         # Tag mapping
         # =====================================================
@@ -189,21 +150,16 @@ class RuntimeConverter:
             if k in layout:
                 node[k] = layout[k]
 
+        return node
+
+    def _finish_element(self, node, children):
+
         # Children
-        children = self.convert_children(element)
         if children:
             node["children"] = children
 
         return node
 
-    def convert_children(self, element):
-        children = []
-        for child in element.children:
-            converted = self.convert_element(child)
-            if converted:
-                children.append(converted)
-        return children
-
     # =========================================================
     # 4️⃣ Build Screen
     # =========================================================
@@ -232,38 +188,66 @@ class RuntimeConverter:
             "rtl": True
         }
 
-        zip_path = self.output_dir / f"{self.html_path.stem}.zip"
+        # State key -> nodes reading it, from the expressions as written
+        if self.dependencies:
+            index = bindings.index_screen(self.runtime["screens"]["main"], self.runtime["state"], "main")
+            print(f"✅ Dependencies of {len(index)} state keys indexed")
+
+        # Parse every expression once, nodes and actions refer to them by index
+        if self.compile_expressions:
+            expressions.compile_documents(self.runtime["screens"], self.expression_table)
+            expressions.compile_actions(self.runtime["actions"], self.expression_table)
+            print(f"✅ {len(self.expression_table)} expressions compiled")
 
-        with zipfile.ZipFile(zip_path, "w") as z:
+        with BundleWriter(self.zip_path, compression=self.compression, fmt=self.format) as bundle:
 
-            z.writestr("app.json", json.dumps(app_json, indent=2, ensure_ascii=False))
-            z.writestr("state.json", json.dumps(self.runtime["state"], indent=2, ensure_ascii=False))
-            z.writestr("actions.json", json.dumps(self.runtime["actions"], indent=2, ensure_ascii=False))
-            z.writestr("screens/main.json", json.dumps(self.runtime["screens"]["main"], indent=2, ensure_ascii=False))
+            if self.expression_table:
+                app_json["expressions"] = bundle.entry_name(expressions.EXPRESSIONS_NAME)
+            bundle.write_json("app.json", app_json)
+            bundle.write_json("state.json", self.runtime["state"])
+            bundle.write_json("actions.json", self.runtime["actions"])
+            bundle.write_json("screens/main.json", self.runtime["screens"]["main"])
+            if self.expression_table:
+                bundle.write_json(expressions.EXPRESSIONS_NAME, self.expression_table.document())
 
-        print(f"✅ ZIP created: {zip_path}")
+        print(f"✅ ZIP created: {self.zip_path if not is_stream(self.zip_path) else '<stdout>'}")
 
     # =========================================================
     def run(self):
-        print("🔍 Extracting state")
-        self.extract_vue_state()
+        # Progress goes to stderr when the ZIP itself is written to stdout
+        with console_for(self.zip_path):
+            print("🔍 Extracting state")
+            self.extract_vue_state()
 
-        print("🧱 Converting layout")
-        self.extract_screen()
+            print("🧱 Converting layout")
+            self.extract_screen()
 
-        print("📦 Building ZIP")
-        self.build_zip()
+            print("📦 Building ZIP")
+            self.build_zip()
 
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) < 2:
-        print("Usage: python html_to_runtime_converter_v3.py <html_file> [output_dir]")
-        exit()
-
-    html_file = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else "./output"
-
-    converter = RuntimeConverter(html_file, output_dir)
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        usage="python html_to_runtime_converter_v3.py <html_file> [output_dir] [--parser NAME] [--format NAME] [--compression NAME] [--expressions] [--dependencies]"
+    )
+    arg_parser.add_argument("html_file")
+    arg_parser.add_argument("output_dir", nargs="?", default="./output",
+                            help='Output directory, or "-" to stream the ZIP to stdout')
+    arg_parser.add_argument("--parser", choices=PARSERS, default=DEFAULT_PARSER,
+                            help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    arg_parser.add_argument("--format", choices=FORMATS, default=DEFAULT_FORMAT,
+                            help=f"Bundle document format (default: {DEFAULT_FORMAT})")
+    arg_parser.add_argument("--compression", choices=available_policies(), default=DEFAULT_POLICY,
+                            help=f"ZIP compression policy (default: {DEFAULT_POLICY})")
+    arg_parser.add_argument("--expressions", action="store_true",
+                            help="Compile v-if/v-show/v-model/:class/@click expressions once into expressions.json")
+    arg_parser.add_argument("--dependencies", action="store_true",
+                            help="Index which nodes read each state key")
+    args = arg_parser.parse_args()
+
+    converter = RuntimeConverter(args.html_file, args.output_dir, parser=args.parser, fmt=args.format,
+                                 compression=args.compression, compile_expressions=args.expressions,
+                                 dependencies=args.dependencies)
     converter.run()
@@ -15,38 +15,70 @@ HTML to ZIP Converter
 """
 
 import os
-import json
+import sys
 import re
-import zipfile
 from pathlib import Path
-from bs4 import BeautifulSoup, NavigableString, Tag
-from typing import Dict, List, Optional, Any
-from urllib.parse import urlparse
+from bs4 import NavigableString, Tag
+from typing import Dict, List, Optional
+
+import asset_store
+import bundle_manifest
+import bundle_writer
+import compression_policy
+import html_parsers
+import tailwind_resolver
+from asset_store import STORE_DIR_NAME, AssetStore
+from build_cache import BuildCache, code_fingerprint, input_key, referenced_images
+from bundle_writer import DEFAULT_FORMAT, FORMATS, BundleWriter, console_for, entry_name, is_stream
+from compression_policy import DEFAULT_POLICY, available_policies
+from html_parsers import DEFAULT_PARSER, PARSERS, make_soup
+from tailwind_resolver import first_value
 
 class HTMLToZipConverter:
     """ממיר HTML לקובץ ZIP בפורמט Dynamic UI"""
     
-    def __init__(self, html_file: str, output_dir: str = None, app_id: str = None):
+    def __init__(self, html_file: str, output_dir: str = None, app_id: str = None,
+                 parser: str = DEFAULT_PARSER, write_json_dir: bool = True,
+                 fmt: str = DEFAULT_FORMAT, webp: bool = False, density: float = None,
+                 compression: str = DEFAULT_POLICY, lazy_tabs: bool = False):
         """
         Args:
             html_file: נתיב לקובץ HTML
-            output_dir: תיקיית פלט (אם None, ישאל את המשתמש)
+            output_dir: תיקיית פלט (אם None, ישאל את המשתמש; "-" = ZIP ל-stdout)
             app_id: מזהה האפליקציה (אם None, יקח משם הקובץ)
+            parser: מנתח HTML (html.parser / lxml / html5lib / selectolax)
+            write_json_dir: האם לשמור גם תיקיית JSONs פרוסה לצד ה-ZIP
+            fmt: פורמט המסמכים ב-bundle (json / json-min / msgpack / cbor)
+            webp: קידוד מחדש של תמונות ל-WebP (דורש Pillow)
+            density: הקטנת תמונות ל-density פיקסלים של המכשיר לכל פיקסל CSS (דורש Pillow)
+            compression: מדיניות הדחיסה של ה-ZIP לפי סוג הקובץ (ראו compression_policy.py)
+            lazy_tabs: תוכן כל טאב (מלבד הטאב הראשון) נכתב לקובץ נפרד שנטען רק כשהטאב נפתח
         """
         self.html_file = Path(html_file)
         self.app_id = app_id or self.html_file.stem
+        self.write_json_dir = write_json_dir
+        self.format = fmt
+        self.compression = compression
+        self.lazy_tabs = lazy_tabs
         
         # תיקיית פלט
-        if output_dir:
-            self.output_dir = Path(output_dir)
+        if output_dir == "-":
+            # הזרמה ל-stdout - בלי תיקיית פלט ובלי תיקיית JSONs
+            self.output_dir = None
+            self.output_zip = "-"
+            self.write_json_dir = False
         else:
-            # שאילת המשתמש
-            self.output_dir = self._ask_output_directory()
-        
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+            if output_dir:
+                self.output_dir = Path(output_dir)
+            else:
+                # שאילת המשתמש
+                self.output_dir = self._ask_output_directory()
+            
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.output_zip = self.output_dir / f"{self.app_id}.zip"
         
         # תיקיות עבודה
-        self.app_dir = self.output_dir / self.app_id
+        self.app_dir = (self.output_dir or Path(".")) / self.app_id
         self.screens_dir = self.app_dir / "screens"
         self.assets_dir = self.app_dir / "assets"
         
@@ -55,12 +87,123 @@ class HTMLToZipConverter:
         self.actions = {}
         self.routes = {}
         self.styles = {}
+        # assets לפי תוכן - תמונות מותאמות נשמרות בתיקייה משותפת לכל האפליקציות בתיקיית הפלט
+        store_dir = self.output_dir / STORE_DIR_NAME if self.output_dir else None
+        self.assets = AssetStore(store_dir, webp=webp, density=density)
         self.current_screen_id = None
+        self.io_bytes_saved = 0
+        self.bundle = None          # BundleWriter פתוח בזמן convert()
         
         # טעינת HTML
         with open(self.html_file, 'r', encoding='utf-8') as f:
             self.html_content = f.read()
-            self.soup = BeautifulSoup(self.html_content, 'html.parser')
+            self.soup = make_soup(self.html_content, parser)
+        
+        # אינדקס DOM - מעבר יחיד על המסמך
+        self._build_index()
+    
+    def _build_index(self):
+        """
+        בונה טבלאות חיפוש במעבר יחיד על ה-DOM.
+        כל שלבי ההמרה קוראים מהטבלאות במקום להריץ find_all משלהם.
+        """
+        self.click_elements = []    # button/a עם @click או onclick (לפי סדר המסמך)
+        self.v_show_divs = []       # divs עם v-show
+        self.tab_divs = {}          # tab_id -> div עם v-show="activeTab === '...'"
+        self.labels_by_for = {}     # for -> label
+        self.elements_by_id = {}    # id -> element
+        self.form_controls = {}     # id(form) -> input/button ששייכים לטופס
+        self.style_tags = []
+        self.console_div = None     # div עם class של console/output
+        self.dark_div = None        # div עם bg-gray-900/bg-black (קונסולה חלופית)
+        self.header = None
+        self.title_tag = None
+        self.body_tag = None
+        
+        console_re = re.compile(r'console|output', re.I)
+        dark_re = re.compile(r'bg-gray-900|bg-black', re.I)
+        external_controls = []      # שדות עם form="..." שנפתרים אחרי המעבר
+        positions = {}              # id(tag) -> מיקום במסמך, לשדות של טפסים
+        enclosing_forms = {}        # id(tag) -> ה-<form> הקרוב שמכיל אותו (רק לתגיות בתוך טופס)
+        
+        for position, tag in enumerate(self.soup.find_all(True)):
+            name = tag.name
+            
+            # המעבר לפי סדר המסמך - ההורה כבר עבר, אז הטופס העוטף ידוע ב-O(1)
+            parent = tag.parent
+            form = parent if parent.name == 'form' else enclosing_forms.get(id(parent))
+            if form is not None:
+                enclosing_forms[id(tag)] = form
+            
+            element_id = tag.get('id')
+            if element_id:
+                self.elements_by_id.setdefault(element_id, tag)
+            
+            if name in ('input', 'button'):
+                positions[id(tag)] = position
+                form_id = tag.get('form')
+                if form_id:
+                    external_controls.append((position, form_id, tag))
+                elif form is not None:
+                    self.form_controls.setdefault(id(form), []).append(tag)
+            
+            if name in ('button', 'a'):
+                onclick = tag.get('@click') or tag.get('onclick')
+                if onclick and isinstance(onclick, str):
+                    self.click_elements.append(tag)
+            
+            elif name == 'div':
+                v_show = tag.get('v-show')
+                if v_show:
+                    self.v_show_divs.append(tag)
+                    match = re.search(r'activeTab\s*===\s*[\'"](\w+)[\'"]', v_show)
+                    if match:
+                        self.tab_divs.setdefault(match.group(1), tag)
+                
+                if self.console_div is None or self.dark_div is None:
+                    classes = tag.get('class', [])
+                    if isinstance(classes, str):
+                        classes = classes.split()
+                    if self.console_div is None and any(console_re.search(c) for c in classes):
+                        self.console_div = tag
+                    if self.dark_div is None and any(dark_re.search(c) for c in classes):
+                        self.dark_div = tag
+            
+            elif name == 'label':
+                label_for = tag.get('for')
+                if label_for:
+                    self.labels_by_for.setdefault(label_for, tag)
+            
+            elif name == 'style':
+                self.style_tags.append(tag)
+            
+            elif name == 'header' and self.header is None:
+                self.header = tag
+            
+            elif name == 'title' and self.title_tag is None:
+                self.title_tag = tag
+            
+            elif name == 'body' and self.body_tag is None:
+                self.body_tag = tag
+        
+        # שיוך שדות לטופס לפי מאפיין form (גם מחוץ ל-<form>), לפי סדר המסמך
+        for position, form_id, tag in external_controls:
+            form = self.elements_by_id.get(form_id)
+            if form is not None and form.name == 'form':
+                controls = self.form_controls.setdefault(id(form), [])
+                insert_at = len(controls)
+                while insert_at and positions[id(controls[insert_at - 1])] > position:
+                    insert_at -= 1
+                controls.insert(insert_at, tag)
+    
+    def _find_tab_content(self, tab_id: str):
+        """מחזיר את ה-div של תוכן הטאב מתוך האינדקס"""
+        if tab_id in self.tab_divs:
+            return self.tab_divs[tab_id]
+        for div in self.v_show_divs:
+            if tab_id in div.get('v-show', ''):
+                return div
+        return None
     
     def _ask_output_directory(self) -> Path:
         """שואל את המשתמש איפה ליצור את התיקייה"""
@@ -80,31 +223,32 @@ class HTMLToZipConverter:
         return output_path
     
     def convert(self):
-        """המרה ראשית - ממיר את ה-HTML ל-ZIP"""
-        print(f"\n🔄 מתחיל המרת {self.html_file.name}...")
-        
-        # יצירת תיקיות
-        self.app_dir.mkdir(parents=True, exist_ok=True)
-        self.screens_dir.mkdir(parents=True, exist_ok=True)
-        self.assets_dir.mkdir(parents=True, exist_ok=True)
-        
-        # ניתוח HTML
-        self._extract_styles()
-        self._extract_actions()
-        self._extract_screens()
-        
-        # יצירת קבצי הגדרה
-        self._create_app_json()
-        self._create_routes_json()
-        self._create_styles_json()
-        self._create_actions_json()
-        
-        # יצירת ZIP
-        output_zip = self.output_dir / f"{self.app_id}.zip"
-        self._create_zip(output_zip)
-        
-        print(f"✅ הושלם! קובץ ZIP נוצר: {output_zip}")
-        print(f"📁 תיקיית JSONs: {self.app_dir}")
+        """
+        המרה ראשית - ממיר את ה-HTML ל-ZIP.
+        כל מסך נכתב לארכיון ברגע שנוצר (גם כשהפלט הוא stdout / pipe),
+        קבצי ההגדרה וה-assets נכתבים בסוף.
+        """
+        with console_for(self.output_zip):
+            print(f"\n🔄 מתחיל המרת {self.html_file.name}...")
+            
+            exploded_dir = self.app_dir if self.write_json_dir else None
+            with BundleWriter(self.output_zip, exploded_dir=exploded_dir,
+                              compression=self.compression, fmt=self.format) as self.bundle:
+                # ניתוח HTML
+                self._extract_styles()
+                self._extract_actions()
+                self._extract_screens()
+                
+                # השלמת ה-ZIP (קבצי הגדרה ו-assets)
+                self._create_zip(self.bundle)
+            
+            self.io_bytes_saved = self.bundle.io_bytes_saved
+            self.bundle = None
+            
+            target = self.output_zip if not is_stream(self.output_zip) else "<stdout>"
+            print(f"✅ הושלם! קובץ ZIP נוצר: {target}")
+            if self.write_json_dir:
+                print(f"📁 תיקיית JSONs: {self.app_dir}")
     
     def _extract_styles(self):
         """חילוץ הגדרות עיצוב מה-HTML"""
@@ -116,8 +260,7 @@ class HTMLToZipConverter:
         bg_color = "#f3f4f6"  # gray-100
         
         # חיפוש צבעים ב-CSS
-        style_tags = self.soup.find_all('style')
-        for style in style_tags:
+        for style in self.style_tags:
             style_text = style.get_text()
             # חיפוש צבעים ב-CSS
             if 'indigo-600' in style_text or 'indigo' in style_text:
@@ -136,15 +279,12 @@ class HTMLToZipConverter:
         """חילוץ פעולות מה-HTML (כפתורים עם @click)"""
         print("🔧 מחלץ פעולות...")
         
-        # חיפוש כפתורים עם @click
-        buttons = self.soup.find_all(['button', 'a'])
+        # כפתורים עם @click (מהאינדקס)
         action_counter = 1
         
-        for button in buttons:
-            if not isinstance(button, Tag):
-                continue
+        for button in self.click_elements:
             onclick = button.get('@click') or button.get('onclick')
-            if onclick and isinstance(onclick, str):
+            if onclick:
                 # ניקוי ה-action
                 action_name = onclick.strip()
                 # הסרת Vue.js syntax
@@ -194,13 +334,10 @@ class HTMLToZipConverter:
         tabs = {}
         
         # חיפוש כפתורי טאבים
-        buttons = self.soup.find_all('button')
-        for button in buttons:
-            if not isinstance(button, Tag):
+        for button in self.click_elements:
+            if button.name != 'button':
                 continue
             onclick = button.get('@click') or button.get('onclick', '')
-            if not onclick:
-                continue
             match = re.search(r'activeTab\s*=\s*[\'"](\w+)[\'"]', onclick)
             if match:
                 tab_id = match.group(1)
@@ -210,22 +347,13 @@ class HTMLToZipConverter:
                     'button': button
                 }
         
-        # חיפוש divs עם v-show
-        divs = self.soup.find_all('div', {'v-show': True})
-        for div in divs:
-            if not isinstance(div, Tag):
-                continue
-            v_show = div.get('v-show', '')
-            if not v_show:
-                continue
-            match = re.search(r'activeTab\s*===\s*[\'"](\w+)[\'"]', v_show)
-            if match:
-                tab_id = match.group(1)
-                if tab_id not in tabs:
-                    tabs[tab_id] = {
-                        'text': tab_id.title(),
-                        'content': div
-                    }
+        # divs עם v-show
+        for tab_id, div in self.tab_divs.items():
+            if tab_id not in tabs:
+                tabs[tab_id] = {
+                    'text': tab_id.title(),
+                    'content': div
+                }
         
         return tabs
     
@@ -234,7 +362,7 @@ class HTMLToZipConverter:
         print("🏠 יוצר מסך ראשי...")
         
         # חילוץ כותרת מה-header
-        header = self.soup.find('header')
+        header = self.header
         title = "מסך ראשי"
         subtitle = ""
         
@@ -283,7 +411,7 @@ class HTMLToZipConverter:
             }
         }
         
-        self.screens["home"] = screen_json
+        self._add_screen("home", screen_json)
         self.routes["home"] = "screens/home.json"
     
     def _create_screen_from_tab(self, tab_id: str, tab_info: Dict):
@@ -295,13 +423,7 @@ class HTMLToZipConverter:
         if 'content' in tab_info:
             content_div = tab_info['content']
         else:
-            # חיפוש div עם v-show
-            divs = self.soup.find_all('div', {'v-show': True})
-            for div in divs:
-                v_show = div.get('v-show', '')
-                if tab_id in v_show:
-                    content_div = div
-                    break
+            content_div = self._find_tab_content(tab_id)
         
         if not content_div:
             # יצירת מסך ריק
@@ -329,7 +451,7 @@ class HTMLToZipConverter:
             }
         }
         
-        self.screens[tab_id] = screen_json
+        self._add_screen(tab_id, screen_json)
         self.routes[tab_id] = f"screens/{tab_id}.json"
         
         # הוספת action לחזרה אם לא קיים
@@ -344,7 +466,7 @@ class HTMLToZipConverter:
         print("📄 יוצר מסך יחיד עם טאבים...")
         
         # חילוץ header
-        header = self.soup.find('header')
+        header = self.header
         title = "מסך ראשי"
         if header:
             h1 = header.find('h1')
@@ -358,30 +480,27 @@ class HTMLToZipConverter:
             if 'content' in tab_info:
                 content_div = tab_info['content']
             else:
-                # חיפוש div עם v-show
-                divs = self.soup.find_all('div', {'v-show': True})
-                for div in divs:
-                    v_show = div.get('v-show', '')
-                    if tab_id in v_show:
-                        content_div = div
-                        break
+                content_div = self._find_tab_content(tab_id)
             
             if content_div:
                 children = self._convert_element_to_json(content_div)
-                tab_contents.append({
-                    "label": tab_info.get('text', tab_id.title()),
-                    "content": {
-                        "type": "column",
-                        "children": children
-                    }
-                })
+                content = {
+                    "type": "column",
+                    "children": children
+                }
+                label = tab_info.get('text', tab_id.title())
+                if self.lazy_tabs and tab_contents:
+                    # תת-מסך: רק הטאב הראשון (הגלוי) נטען עם המסך, השאר לפי דרישה
+                    tab_contents.append({"label": label, "src": self._add_tab_screen(tab_id, content)})
+                else:
+                    tab_contents.append({"label": label, "content": content})
         
         # חילוץ קונסולת פלט (אם קיימת)
         console_content = None
-        console_div = self.soup.find('div', class_=re.compile(r'console|output', re.I))
+        console_div = self.console_div
         if not console_div:
-            # חיפוש div עם bg-gray-900 (קונסולה)
-            console_div = self.soup.find('div', class_=re.compile(r'bg-gray-900|bg-black', re.I))
+            # div עם bg-gray-900 (קונסולה)
+            console_div = self.dark_div
         
         if console_div:
             console_text = console_div.get_text(strip=True) or "Output will appear here..."
@@ -428,16 +547,23 @@ class HTMLToZipConverter:
             "body": body
         }
         
-        self.screens["main"] = screen_json
+        self._add_screen("main", screen_json)
         self.routes["main"] = "screens/main.json"
         # גם home route
         self.routes["home"] = "screens/main.json"
     
+    def _add_tab_screen(self, tab_id: str, content: Dict) -> str:
+        """רושם את תוכן הטאב כתת-מסך screens/main/<tab>.json ומחזיר את הנתיב שלו ב-bundle"""
+        screen_id = f"main/{tab_id}"
+        self._add_screen(screen_id, content)
+        path = f"screens/{screen_id}.json"
+        return self.bundle.entry_name(path) if self.bundle is not None else entry_name(path, self.format)
+    
     def _create_single_screen(self):
         """יוצר מסך יחיד מה-HTML"""
         print("📄 יוצר מסך יחיד...")
         
-        body = self.soup.find('body')
+        body = self.body_tag
         if not body:
             body = self.soup
         
@@ -448,7 +574,7 @@ class HTMLToZipConverter:
             "type": "screen",
             "id": "main",
             "appBar": {
-                "title": self.soup.find('title').get_text() if self.soup.find('title') else "מסך ראשי"
+                "title": self.title_tag.get_text() if self.title_tag else "מסך ראשי"
             },
             "body": {
                 "type": "column",
@@ -456,7 +582,7 @@ class HTMLToZipConverter:
             }
         }
         
-        self.screens["main"] = screen_json
+        self._add_screen("main", screen_json)
         self.routes["main"] = "screens/main.json"
     
     def _convert_element_to_json(self, element) -> List[Dict]:
@@ -720,7 +846,7 @@ class HTMLToZipConverter:
         # חיפוש label קשור
         label_id = element.get('id')
         if label_id:
-            label = self.soup.find('label', {'for': label_id})
+            label = self.labels_by_for.get(label_id)
             if label:
                 label_text = label.get_text(strip=True)
         
@@ -781,7 +907,7 @@ class HTMLToZipConverter:
                 width = None
         
         # העתקת תמונה ל-assets אם צריך
-        asset_path = self._copy_image_to_assets(src)
+        asset_path = self._copy_image_to_assets(src, width, height)
         
         return {
             "type": "image",
@@ -798,16 +924,21 @@ class HTMLToZipConverter:
         fields = []
         actions = []
         
+        # שדות וכפתורים ששייכים לטופס (מהאינדקס)
+        controls = self.form_controls.get(id(element), [])
+        
         # חילוץ שדות
-        inputs = element.find_all('input')
-        for inp in inputs:
+        for inp in controls:
+            if inp.name != 'input':
+                continue
             field = self._parse_input(inp)
             if field:
                 fields.append(field)
         
         # חילוץ כפתורים
-        buttons = element.find_all('button')
-        for btn in buttons:
+        for btn in controls:
+            if btn.name != 'button':
+                continue
             button_json = self._parse_button(btn)
             if button_json:
                 actions.append(button_json)
@@ -820,71 +951,28 @@ class HTMLToZipConverter:
     
     def _extract_color_from_classes(self, classes: List[str]) -> Optional[str]:
         """חילוץ צבע מ-Tailwind classes"""
-        color_map = {
-            'text-white': '#ffffff',
-            'text-black': '#000000',
-            'text-gray-500': '#6b7280',
-            'text-gray-600': '#4b5563',
-            'text-gray-700': '#374151',
-            'text-indigo-600': '#4f46e5',
-            'text-purple-600': '#7c3aed',
-            'text-green-600': '#10b981',
-            'text-red-600': '#dc2626',
-            'text-blue-600': '#2563eb',
-        }
-        
-        for cls in classes:
-            if cls in color_map:
-                return color_map[cls]
-        
-        return None
+        return first_value(classes, 'color')
     
     def _extract_bg_color_from_classes(self, classes: List[str]) -> Optional[str]:
         """חילוץ צבע רקע מ-Tailwind classes"""
-        color_map = {
-            'bg-indigo-600': '#4f46e5',
-            'bg-purple-600': '#7c3aed',
-            'bg-gray-100': '#f3f4f6',
-            'bg-white': '#ffffff',
-        }
-        
-        for cls in classes:
-            if cls in color_map:
-                return color_map[cls]
-        
-        return None
+        return first_value(classes, 'background')
     
     def _extract_font_size_from_classes(self, classes: List[str]) -> float:
         """חילוץ גודל גופן מ-Tailwind classes"""
-        size_map = {
-            'text-xs': 12,
-            'text-sm': 14,
-            'text-base': 16,
-            'text-lg': 18,
-            'text-xl': 20,
-            'text-2xl': 24,
-            'text-3xl': 30,
-        }
-        
-        for cls in classes:
-            if cls in size_map:
-                return size_map[cls]
-        
-        return 16.0
+        return first_value(classes, 'fontSize', 16.0)
     
-    def _copy_image_to_assets(self, src: str) -> str:
-        """מעתיק תמונה ל-assets ומחזיר נתיב יחסי"""
+    def _copy_image_to_assets(self, src: str, width: int = None, height: int = None) -> str:
+        """
+        רושם תמונה ב-asset store ומחזיר נתיב יחסי לפי hash של התוכן.
+        אותה תמונה נכתבת ל-ZIP פעם אחת בלבד, ושני קבצים בשם זהה לא מתנגשים.
+        """
         if not src or src.startswith('http'):
             return src
         
         # ניקוי נתיב
         src_path = Path(src)
-        if src_path.exists():
-            # העתקה
-            dest_path = self.assets_dir / src_path.name
-            import shutil
-            shutil.copy2(src_path, dest_path)
-            return f"assets/{src_path.name}"
+        if src_path.is_file():
+            return self.assets.add(src_path, width, height)
         
         return src
     
@@ -896,7 +984,15 @@ class HTMLToZipConverter:
         text = re.sub(r'(?<!^)(?=[A-Z])', '_', text)
         return text.lower()
     
-    def _create_app_json(self):
+    def _add_screen(self, screen_id: str, screen_json: Dict):
+        """רושם מסך - בזמן convert() הוא נכתב מיד ל-ZIP ולא נשמר בזיכרון"""
+        if self.bundle is not None:
+            self.bundle.write_json(f"screens/{screen_id}.json", screen_json)
+            self.screens[screen_id] = None
+        else:
+            self.screens[screen_id] = screen_json
+    
+    def _create_app_json(self, bundle: BundleWriter):
         """יוצר app.json"""
         app_json = {
             "appId": self.app_id,
@@ -905,20 +1001,18 @@ class HTMLToZipConverter:
             "rtl": True  # נניח RTL אם יש עברית
         }
         
-        with open(self.app_dir / "app.json", 'w', encoding='utf-8') as f:
-            json.dump(app_json, f, ensure_ascii=False, indent=2)
+        bundle.write_json("app.json", app_json)
     
-    def _create_routes_json(self):
+    def _create_routes_json(self, bundle: BundleWriter):
         """יוצר routes.json"""
-        with open(self.app_dir / "routes.json", 'w', encoding='utf-8') as f:
-            json.dump(self.routes, f, ensure_ascii=False, indent=2)
+        routes = {route: bundle.entry_name(path) for route, path in self.routes.items()}
+        bundle.write_json("routes.json", routes)
     
-    def _create_styles_json(self):
+    def _create_styles_json(self, bundle: BundleWriter):
         """יוצר styles.json"""
-        with open(self.app_dir / "styles.json", 'w', encoding='utf-8') as f:
-            json.dump(self.styles, f, ensure_ascii=False, indent=2)
+        bundle.write_json("styles.json", self.styles)
     
-    def _create_actions_json(self):
+    def _create_actions_json(self, bundle: BundleWriter):
         """יוצר actions.json"""
         if not self.actions:
             # יצירת actions בסיסיים
@@ -929,48 +1023,120 @@ class HTMLToZipConverter:
                 }
             }
         
-        with open(self.app_dir / "actions.json", 'w', encoding='utf-8') as f:
-            json.dump(self.actions, f, ensure_ascii=False, indent=2)
+        bundle.write_json("actions.json", self.actions)
     
-    def _create_zip(self, output_zip_path: Path):
-        """יוצר קובץ ZIP"""
-        print(f"📦 יוצר קובץ ZIP: {output_zip_path.name}...")
-        
-        with zipfile.ZipFile(output_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # הוספת קבצי הגדרה
-            for file in ['app.json', 'routes.json', 'styles.json', 'actions.json']:
-                file_path = self.app_dir / file
-                if file_path.exists():
-                    zipf.write(file_path, file)
-            
-            # הוספת מסכים
-            for screen_id, screen_json in self.screens.items():
-                screen_file = self.screens_dir / f"{screen_id}.json"
-                with open(screen_file, 'w', encoding='utf-8') as f:
-                    json.dump(screen_json, f, ensure_ascii=False, indent=2)
-                zipf.write(screen_file, f"screens/{screen_id}.json")
-            
-            # הוספת assets
-            if self.assets_dir.exists():
-                for asset_file in self.assets_dir.rglob('*'):
-                    if asset_file.is_file():
-                        zipf.write(asset_file, f"assets/{asset_file.name}")
+    def _create_zip(self, bundle: BundleWriter):
+        """
+        משלים את קובץ ה-ZIP - כל מסמך מסודר פעם אחת ונכתב ישירות לארכיון.
+        מסכים שכבר נכתבו בזמן החילוץ לא נכתבים שוב.
+        תיקיית ה-JSONs הפרוסה נכתבת רק אם write_json_dir.
+        """
+        print(f"📦 משלים קובץ ZIP: {self.app_id}.zip...")
+        
+        # קבצי הגדרה
+        self._create_app_json(bundle)
+        self._create_routes_json(bundle)
+        self._create_styles_json(bundle)
+        self._create_actions_json(bundle)
+        
+        # מסכים שלא נכתבו עדיין
+        for screen_id, screen_json in self.screens.items():
+            if screen_json is not None:
+                bundle.write_json(f"screens/{screen_id}.json", screen_json)
+        
+        # assets - ישירות מקובץ המקור (תמונות מותאמות מעובדות במקביל)
+        self.assets.write(bundle)
+        if self.assets.references > len(self.assets.assets):
+            print(f"🖼️ {len(self.assets.assets)} assets ({self.assets.references} הפניות)")
+
 
+def _cache_entry(html_file: Path, app_id: str, parser: str, write_json_dir: bool = True,
+                 fmt: str = DEFAULT_FORMAT, webp: bool = False, density: float = None,
+                 compression: str = DEFAULT_POLICY, lazy_tabs: bool = False):
+    """
+    שם ומפתח ב-cache עבור קובץ HTML - מבלי לנתח אותו.
+    המפתח: SHA-256 של ה-HTML, התמונות המקומיות שהוא מפנה אליהן, קוד הממיר והאפשרויות.
+    """
+    html_bytes = html_file.read_bytes()
+    images = referenced_images(html_bytes.decode('utf-8', 'replace'))
+    fingerprint = code_fingerprint(__file__, html_parsers.__file__, tailwind_resolver.__file__,
+                                   asset_store.__file__, bundle_manifest.__file__, bundle_writer.__file__,
+                                   compression_policy.__file__)
+    key = input_key(html_bytes, images, fingerprint,
+                    {"appId": app_id, "parser": parser, "jsonDir": write_json_dir, "format": fmt,
+                     "webp": webp, "density": density, "compression": compression,
+                     "lazyTabs": lazy_tabs})
+    return f"html_to_zip:{app_id}", key
 
-def convert_directory(input_dir: str, output_dir: str = None):
-    """ממיר תיקייה שלמה עם קבצי HTML"""
+
+def _convert_file(html_file: str, output_dir: str, parser: str = DEFAULT_PARSER,
+                  capture_output: bool = False, write_json_dir: bool = True,
+                  fmt: str = DEFAULT_FORMAT, webp: bool = False, density: float = None,
+                  compression: str = DEFAULT_POLICY, lazy_tabs: bool = False):
+    """
+    ממיר קובץ HTML יחיד - רץ גם בתוך worker של ProcessPoolExecutor.
+    
+    Returns:
+        (success, log, error, io_bytes_saved) - כש-capture_output, הפלט נאסף ומודפס ע"י התהליך הראשי
+    """
+    import contextlib
+    import io
+    
+    log = io.StringIO()
+    redirect = contextlib.redirect_stdout(log) if capture_output else contextlib.nullcontext()
+    try:
+        with redirect:
+            converter = HTMLToZipConverter(
+                html_file=html_file,
+                output_dir=output_dir,
+                app_id=Path(html_file).stem,
+                parser=parser,
+                write_json_dir=write_json_dir,
+                fmt=fmt,
+                webp=webp,
+                density=density,
+                compression=compression,
+                lazy_tabs=lazy_tabs
+            )
+            converter.convert()
+        return True, log.getvalue(), None, converter.io_bytes_saved
+    except Exception as e:
+        return False, log.getvalue(), str(e), 0
+
+
+def convert_directory(input_dir: str, output_dir: str = None, parser: str = DEFAULT_PARSER,
+                      jobs: int = 1, strict: bool = False, use_cache: bool = True,
+                      write_json_dir: bool = True, fmt: str = DEFAULT_FORMAT,
+                      webp: bool = False, density: float = None,
+                      compression: str = DEFAULT_POLICY, lazy_tabs: bool = False) -> int:
+    """
+    ממיר תיקייה שלמה עם קבצי HTML
+    
+    Args:
+        jobs: מספר תהליכים להמרה מקבילית (0 = מספר הליבות)
+        strict: מצב לא-אינטראקטיבי - לעולם לא שואל את המשתמש
+        use_cache: דילוג על קבצים שלא השתנו מאז ההמרה הקודמת
+        write_json_dir: האם לשמור גם תיקיית JSONs פרוסה לכל אפליקציה
+        fmt: פורמט המסמכים ב-bundle
+        webp, density: אופטימיזציית תמונות (ראו HTMLToZipConverter)
+        compression: מדיניות הדחיסה של ה-ZIP
+        lazy_tabs: כל טאב בקובץ נפרד שנטען לפי דרישה
+    
+    Returns:
+        מספר הקבצים שנכשלו (או 1 אם לא ניתן היה להתחיל)
+    """
     input_path = Path(input_dir)
     
     if not input_path.exists():
         print(f"❌ שגיאה: התיקייה {input_dir} לא קיימת")
-        return
+        return 1
     
-    # חיפוש קבצי HTML
-    html_files = list(input_path.glob('*.html')) + list(input_path.glob('*.htm'))
+    # חיפוש קבצי HTML (ממוין - סדר דטרמיניסטי)
+    html_files = sorted(list(input_path.glob('*.html')) + list(input_path.glob('*.htm')))
     
     if not html_files:
         print(f"❌ לא נמצאו קבצי HTML בתיקייה {input_dir}")
-        return
+        return 1
     
     print(f"\n📁 נמצאו {len(html_files)} קבצי HTML:")
     for i, html_file in enumerate(html_files, 1):
@@ -978,6 +1144,9 @@ def convert_directory(input_dir: str, output_dir: str = None):
     
     # שאילת המשתמש על תיקיית פלט
     if not output_dir:
+        if strict:
+            print("❌ שגיאה: במצב --strict חובה להגדיר תיקיית פלט (-o)")
+            return 1
         print("\n" + "="*60)
         print("📁 בחירת תיקיית פלט")
         print("="*60)
@@ -994,28 +1163,79 @@ def convert_directory(input_dir: str, output_dir: str = None):
     
     output_path.mkdir(parents=True, exist_ok=True)
     
+    # קבצים שלא השתנו - שימוש חוזר ב-ZIP הקיים ללא ניתוח מחדש
+    cache = BuildCache(output_path, enabled=use_cache)
+    pending = []
+    unchanged = 0
+    for html_file in html_files:
+        name, key = _cache_entry(html_file, html_file.stem, parser, write_json_dir, fmt, webp, density,
+                                 compression, lazy_tabs)
+        if cache.lookup_file(name, key, output_path / f"{html_file.stem}.zip"):
+            unchanged += 1
+        else:
+            pending.append((html_file, name, key))
+    
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(pending)))
+    
     print(f"\n✅ תיקיית פלט: {output_path}")
-    print(f"🔄 מתחיל המרה של {len(html_files)} קבצים...\n")
+    if unchanged:
+        print(f"⚡ {unchanged} קבצים לא השתנו (cache)")
+    print(f"🔄 מתחיל המרה של {len(pending)} קבצים ({jobs} תהליכים)...\n")
+    
+    failed = []
+    io_bytes_saved = 0
+    
+    def report(html_file, name, key, success, error, saved):
+        nonlocal io_bytes_saved
+        io_bytes_saved += saved
+        if success:
+            cache.store_file(name, key, output_path / f"{html_file.stem}.zip")
+        else:
+            failed.append(html_file)
+            print(f"❌ שגיאה בהמרת {html_file.name}: {error}")
     
     # המרה של כל קובץ
-    converted_count = 0
-    for html_file in html_files:
-        try:
-            converter = HTMLToZipConverter(
-                html_file=str(html_file),
-                output_dir=str(output_path),
-                app_id=html_file.stem
-            )
-            converter.convert()
-            converted_count += 1
-        except Exception as e:
-            print(f"❌ שגיאה בהמרת {html_file.name}: {e}")
+    if jobs == 1:
+        for html_file, name, key in pending:
+            success, _, error, saved = _convert_file(str(html_file), str(output_path), parser,
+                                                     write_json_dir=write_json_dir, fmt=fmt,
+                                                     webp=webp, density=density,
+                                                     compression=compression, lazy_tabs=lazy_tabs)
+            report(html_file, name, key, success, error, saved)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_convert_file, str(html_file), str(output_path), parser, True,
+                            write_json_dir, fmt, webp, density, compression, lazy_tabs)
+                for html_file, _, _ in pending
+            ]
+            # תוצאות מודפסות לפי סדר הקבצים, לא לפי סדר הסיום
+            for (html_file, name, key), future in zip(pending, futures):
+                try:
+                    success, log, error, saved = future.result()
+                except Exception as e:
+                    success, log, error, saved = False, "", str(e), 0
+                print(log, end="")
+                report(html_file, name, key, success, error, saved)
     
+    cache.save()
+    
+    converted_count = len(html_files) - len(failed)
     print(f"\n{'='*60}")
     print(f"✅ הושלם! הומרו {converted_count}/{len(html_files)} קבצים")
+    if failed:
+        print(f"❌ נכשלו: {', '.join(f.name for f in failed)}")
+    if io_bytes_saved:
+        print(f"💾 נחסכו {io_bytes_saved / 1024:.1f} KB של קריאה/כתיבה לדיסק (כתיבה ישירה ל-ZIP)")
     print(f"📁 תיקיית פלט: {output_path}")
     print(f"📦 קבצי ZIP נוצרו בתיקייה: {output_path}")
     print(f"{'='*60}\n")
+    
+    return len(failed)
 
 
 def main():
@@ -1035,31 +1255,105 @@ def main():
   
   # המרת קובץ יחיד
   python html_to_zip_converter.py index.html -o ./output
+  
+  # המרה מקבילית ולא-אינטראקטיבית (CI)
+  python html_to_zip_converter.py ./html_files -o ./output --jobs 0 --strict
+  
+  # הזרמת ה-ZIP ל-stdout (קובץ יחיד)
+  python html_to_zip_converter.py index.html -o - | ssh host 'cat > app.zip'
         """
     )
     parser.add_argument('input', help='נתיב לקובץ HTML או תיקייה עם קבצי HTML')
-    parser.add_argument('-o', '--output', help='נתיב לתיקיית פלט (אם לא מוגדר, ישאל את המשתמש)')
+    parser.add_argument('-o', '--output',
+                        help='נתיב לתיקיית פלט (אם לא מוגדר, ישאל את המשתמש; "-" = ZIP ל-stdout, קובץ יחיד בלבד)')
     parser.add_argument('-a', '--app-id', help='מזהה האפליקציה (רק לקובץ יחיד)')
+    parser.add_argument('--parser', choices=PARSERS, default=DEFAULT_PARSER,
+                        help=f'מנתח HTML (ברירת מחדל: {DEFAULT_PARSER})')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='מספר תהליכים להמרת תיקייה במקביל (0 = מספר הליבות)')
+    parser.add_argument('--strict', action='store_true',
+                        help='מצב לא-אינטראקטיבי: לא שואל אף פעם, יוצא עם קוד שגיאה אם המרה נכשלה')
+    parser.add_argument('--force', action='store_true',
+                        help='המרה מחדש של כל הקבצים, גם אם לא השתנו (ללא cache)')
+    parser.add_argument('--format', choices=FORMATS, default=DEFAULT_FORMAT,
+                        help=f'פורמט המסמכים ב-bundle (ברירת מחדל: {DEFAULT_FORMAT}; msgpack/cbor דורשים התקנה)')
+    parser.add_argument('--webp', action='store_true',
+                        help='קידוד מחדש של תמונות ל-WebP (דורש Pillow)')
+    parser.add_argument('--density', type=float,
+                        help='הקטנת תמונות עם width/height ל-N פיקסלים של המכשיר לכל פיקסל CSS, למשל 2 או 3 (דורש Pillow)')
+    parser.add_argument('--compression', choices=available_policies(), default=DEFAULT_POLICY,
+                        help=f'מדיניות דחיסה: auto = מדיה בלי דחיסה ו-JSON בדחיסה חזקה (ברירת מחדל: {DEFAULT_POLICY}; zstd דורש Python 3.14)')
+    parser.add_argument('--lazy-tabs', action='store_true',
+                        help='כל טאב (מלבד הראשון) בקובץ screens/main/<tab> נפרד שנטען רק כשהטאב נפתח')
+    parser.add_argument('--zip-only', action='store_true',
+                        help='כתיבה ישירה ל-ZIP בלבד, ללא תיקיית JSONs פרוסה')
     
     args = parser.parse_args()
     
     input_path = Path(args.input)
     
+    if args.strict and not args.output:
+        print("❌ שגיאה: במצב --strict חובה להגדיר תיקיית פלט (-o)")
+        return 2
+    
+    streaming = args.output == "-"
+    
     if input_path.is_file():
         # קובץ יחיד
+        app_id = args.app_id or input_path.stem
+        cache_name, cache_key = _cache_entry(input_path, app_id, args.parser, not args.zip_only,
+                                             args.format, args.webp, args.density, args.compression,
+                                             args.lazy_tabs)
+        if args.output and not args.force and not streaming:
+            cache = BuildCache(args.output)
+            zip_path = Path(args.output) / f"{app_id}.zip"
+            if cache.lookup_file(cache_name, cache_key, zip_path):
+                print(f"⚡ {input_path.name} לא השתנה - {zip_path} מעודכן")
+                return 0
+        
         converter = HTMLToZipConverter(
             html_file=str(input_path),
             output_dir=args.output,
-            app_id=args.app_id or input_path.stem
+            app_id=app_id,
+            parser=args.parser,
+            write_json_dir=not args.zip_only,
+            fmt=args.format,
+            webp=args.webp,
+            density=args.density,
+            compression=args.compression,
+            lazy_tabs=args.lazy_tabs
         )
-        converter.convert()
+        try:
+            converter.convert()
+        except Exception as e:
+            if not args.strict:
+                raise
+            print(f"❌ שגיאה בהמרת {input_path.name}: {e}", file=sys.stderr if streaming else sys.stdout)
+            return 1
+        
+        if streaming:
+            return 0
+        cache = BuildCache(converter.output_dir, enabled=not args.force)
+        cache.store_file(cache_name, cache_key, converter.output_dir / f"{app_id}.zip")
+        cache.save()
     elif input_path.is_dir():
         # תיקייה
-        convert_directory(str(input_path), args.output)
+        if streaming:
+            print("❌ שגיאה: הזרמה ל-stdout (-o -) נתמכת רק לקובץ יחיד", file=sys.stderr)
+            return 2
+        failed = convert_directory(str(input_path), args.output, args.parser,
+                                   jobs=args.jobs, strict=args.strict, use_cache=not args.force,
+                                   write_json_dir=not args.zip_only, fmt=args.format,
+                                   webp=args.webp, density=args.density,
+                                   compression=args.compression, lazy_tabs=args.lazy_tabs)
+        if args.strict and failed:
+            return 1
     else:
         print(f"❌ שגיאה: {args.input} אינו קובץ או תיקייה תקינים")
+        return 2
+    
+    return 0
 
 
 if __name__ == '__main__':
-    main()
-
+    sys.exit(main())
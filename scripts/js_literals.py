@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Single-pass reader for JavaScript literals, shared by the converters for
+the Vue state (data()) of a page.
+
+parse_value() reads objects, arrays, strings (including templates without
+${}), numbers (decimal, hex, octal, binary, exponents, separators) and
+true / false / null / undefined straight from the script text, skipping
+whitespace and comments. Keys may be identifiers, strings or numbers.
+
+Anything that is not a literal (a function call, an identifier, `a + b`,
+a regex, a method, a spread) becomes DYNAMIC - the rest of the object is
+still read. NaN and Infinity become None, JSON has no form for them.
+The reader never backtracks more than once over a value, so a script is
+read in time linear to its size, unlike a regular expression that stops at
+the first "}".
+
+    extract_vue_state(script_text)  ->  {"activeTab": "settings", "config": {...}, "logs": [], ...}
+"""
+import re
+
+# Value of anything that is only known at runtime
+DYNAMIC = "DYNAMIC"
+
+_NUMBER = re.compile(
+    r"[+-]?(?:0[xX][0-9a-fA-F_]+|0[oO][0-7_]+|0[bB][01_]+"
+    r"|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?)n?"
+)
+_IDENTIFIER = re.compile(r"[A-Za-z_$\u00a0-\uffff][\w$\u00a0-\uffff]*")
+# NaN and Infinity have no JSON form - null, like JSON.stringify writes them
+_KEYWORDS = {"true": True, "false": False, "null": None, "undefined": None,
+             "NaN": None, "Infinity": None}
+
+# data() { ... return {...} }, data: function () {...}, data: () => ({...})
+_DATA_FUNCTION = re.compile(r"\bdata\s*(?:\(\s*\)|:\s*function\s*\(\s*\))\s*\{")
+_DATA_ARROW = re.compile(r"\bdata\s*:\s*\(\s*\)\s*=>\s*\(")
+
+_SPACE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.S)
+# Strings without escapes - the common case, read in one step
+_SIMPLE_STRINGS = {quote: re.compile(quote + r"([^\\\n" + quote + "]*)" + quote) for quote in "'\""}
+
+# A "/" after one of these (or at the start) starts a regex literal, not a division
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^") | {"return", "typeof", "case", "in", "of", "new",
+                                               "delete", "void", "throw"}
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+_CLOSING = {"{": "}", "[": "]", "(": ")"}
+
+
+class JSSyntaxError(ValueError):
+    pass
+
+
+class _Reader:
+    def __init__(self, text: str, pos: int = 0):
+        self.text = text
+        self.pos = pos
+
+    def error(self, message):
+        return JSSyntaxError(f"{message} at offset {self.pos}")
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def skip_space(self):
+        """Skip whitespace and comments"""
+        self.pos = _SPACE.match(self.text, self.pos).end()
+
+    # ---------------------------------------------------------
+    # Literals
+    # ---------------------------------------------------------
+    def value(self):
+        """A value up to (not including) the next "," or closing bracket"""
+        self.skip_space()
+        start = self.pos
+        c = self.peek()
+        try:
+            if c == "{":
+                result = self.object()
+            elif c == "[":
+                result = self.array()
+            elif c in "'\"`":
+                result = self.string()
+            else:
+                result = self.scalar()
+        except JSSyntaxError:
+            result = DYNAMIC
+            self.pos = start
+        self.skip_space()
+        if self.pos == start or self.peek() not in ",}]":
+            # Not (only) a literal, e.g. `10 * 60` or `new Date()`
+            self.pos = start
+            self.skip_expression()
+            return DYNAMIC
+        return result
+
+    def scalar(self):
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if match:
+            if match.group() not in _KEYWORDS:
+                raise self.error("Not a literal")
+            self.pos = match.end()
+            return _KEYWORDS[match.group()]
+        match = _NUMBER.match(self.text, self.pos)
+        if not match or not any(ch.isdigit() for ch in match.group()):
+            raise self.error("Not a literal")
+        self.pos = match.end()
+        return _number(match.group())
+
+    def string(self):
+        quote = self.text[self.pos]
+        simple = _SIMPLE_STRINGS.get(quote)
+        match = simple.match(self.text, self.pos) if simple else None
+        if match:
+            self.pos = match.end()
+            return match.group(1)
+        self.pos += 1
+        out = []
+        text, n = self.text, len(self.text)
+        while self.pos < n:
+            c = text[self.pos]
+            if c == quote:
+                self.pos += 1
+                return "".join(out)
+            if c == "\\":
+                out.append(self.escape())
+                continue
+            if quote == "`" and text.startswith("${", self.pos):
+                raise self.error("Template with substitutions")
+            if c == "\n" and quote != "`":
+                raise self.error("Unterminated string")
+            out.append(c)
+            self.pos += 1
+        raise self.error("Unterminated string")
+
+    def escape(self) -> str:
+        text = self.text
+        c = text[self.pos + 1:self.pos + 2]
+        self.pos += 2
+        if c in _ESCAPES and not (c == "0" and text[self.pos:self.pos + 1].isdigit()):
+            return _ESCAPES[c]
+        if c == "x":
+            code = text[self.pos:self.pos + 2]
+            self.pos += 2
+            return chr(int(code, 16))
+        if c == "u":
+            if text.startswith("{", self.pos):
+                end = text.index("}", self.pos)
+                code, self.pos = text[self.pos + 1:end], end + 1
+            else:
+                code = text[self.pos:self.pos + 4]
+                self.pos += 4
+            return chr(int(code, 16))
+        if c == "\r" and text.startswith("\n", self.pos):
+            self.pos += 1
+            return ""
+        if c in ("\n", "\u2028", "\u2029"):
+            return ""  # line continuation
+        return c
+
+    def key(self):
+        """A property name, or None for a spread (...x)"""
+        c = self.peek()
+        if c in "'\"":
+            return self.string()
+        if c == "[":
+            raise self.error("Computed key")
+        if self.text.startswith("...", self.pos):
+            self.pos += 3
+            return None
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            return match.group()
+        match = _NUMBER.match(self.text, self.pos)
+        if match and match.group():
+            self.pos = match.end()
+            value = _number(match.group())
+            return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+        raise self.error("Expected a property name")
+
+    def object(self) -> dict:
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip_space()
+            if self.peek() == "}":
+                self.pos += 1
+                return result
+            key = self.key()
+            self.skip_space()
+            c = self.peek()
+            if key is None:
+                self.skip_expression()
+            elif c == ":":
+                self.pos += 1
+                result[key] = self.value()
+            elif c in ",}":
+                result[key] = DYNAMIC  # shorthand { key }
+            else:
+                # Method (key() {...}), getter / setter / async
+                self.skip_expression()
+                if key not in ("get", "set", "async"):
+                    result[key] = DYNAMIC
+            self.skip_space()
+            c = self.peek()
+            if c == ",":
+                self.pos += 1
+            elif c != "}":
+                raise self.error("Expected ',' or '}'")
+
+    def array(self) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_space()
+            c = self.peek()
+            if c == "]":
+                self.pos += 1
+                return result
+            if c == ",":
+                # Hole ([1, , 2])
+                result.append(None)
+                self.pos += 1
+                continue
+            if self.text.startswith("...", self.pos):
+                self.skip_expression()
+                result.append(DYNAMIC)
+            else:
+                result.append(self.value())
+            self.skip_space()
+            c = self.peek()
+            if c == ",":
+                self.pos += 1
+            elif c != "]":
+                raise self.error("Expected ',' or ']'")
+
+    # ---------------------------------------------------------
+    # Skipping code
+    # ---------------------------------------------------------
+    def skip_string(self):
+        quote = self.text[self.pos]
+        self.pos += 1
+        text, n = self.text, len(self.text)
+        while self.pos < n:
+            c = text[self.pos]
+            if c == "\\":
+                self.pos += 2
+                continue
+            self.pos += 1
+            if c == quote:
+                return
+            if quote == "`" and c == "$" and text.startswith("{", self.pos):
+                self.pos += 1
+                self.skip_until("}")
+                self.pos += 1
+        raise self.error("Unterminated string")
+
+    def skip_regex(self):
+        """Skip a regex literal (/[/]}/g) - its brackets and slashes are not code"""
+        text, n = self.text, len(self.text)
+        self.pos += 1
+        in_class = False
+        while self.pos < n:
+            c = text[self.pos]
+            if c == "\\":
+                self.pos += 2
+                continue
+            if c == "\n":
+                break
+            self.pos += 1
+            if c == "[":
+                in_class = True
+            elif c == "]":
+                in_class = False
+            elif c == "/" and not in_class:
+                match = _IDENTIFIER.match(text, self.pos)  # flags
+                if match:
+                    self.pos = match.end()
+                return
+        raise self.error("Unterminated regex")
+
+    def skip_until(self, stops: str, stop_at_return: bool = False):
+        """
+        Skip code up to a character of stops outside brackets, strings and
+        comments (or to the keyword return when stop_at_return).
+        Returns True if it stopped at return.
+        """
+        text, n = self.text, len(self.text)
+        closers = []
+        prev = ""  # last token skipped (a character or a word)
+        while True:
+            self.skip_space()
+            if self.pos >= n:
+                raise self.error("Unexpected end of script")
+            c = text[self.pos]
+            if not closers and c in stops:
+                return False
+            if c in "'\"`":
+                self.skip_string()
+            elif c in _CLOSING:
+                closers.append(_CLOSING[c])
+                self.pos += 1
+            elif c in ")]}":
+                if not closers or closers.pop() != c:
+                    raise self.error(f"Unbalanced '{c}'")
+                self.pos += 1
+            elif c == "_" or c == "$" or c.isalpha():
+                match = _IDENTIFIER.match(text, self.pos)
+                if stop_at_return and not closers and match.group() == "return":
+                    return True
+                self.pos = match.end()
+                prev = match.group()
+                continue
+            elif c == "/" and (not prev or prev in _REGEX_AFTER):
+                self.skip_regex()
+            else:
+                self.pos += 1
+            prev = c
+
+    def skip_expression(self):
+        """Skip an expression up to the next "," or closing bracket"""
+        self.skip_until(",}])")
+
+
+def _number(token: str):
+    token = token.replace("_", "")
+    if token.endswith("n"):
+        return int(token[:-1], 0)
+    sign = -1 if token.startswith("-") else 1
+    body = token.lstrip("+-")
+    if body[:2].lower() in ("0x", "0o", "0b"):
+        return sign * int(body, 0)
+    if re.fullmatch(r"\d+", body):
+        return sign * int(body)
+    return sign * float(body)
+
+
+def parse_value(text: str, pos: int = 0):
+    """
+    The literal starting at pos (after whitespace / comments).
+
+    Returns:
+        (value, end offset); non-literal parts are DYNAMIC
+    """
+    reader = _Reader(text, pos)
+    reader.skip_space()
+    c = reader.peek()
+    if c == "{":
+        value = reader.object()
+    elif c == "[":
+        value = reader.array()
+    elif c in "'\"`":
+        value = reader.string()
+    else:
+        value = reader.scalar()
+    return value, reader.pos
+
+
+def extract_vue_state(script: str):
+    """
+    The object returned by the data() of a Vue component in script, or
+    None if there is none (or it can't be read).
+    """
+    if not script or "data" not in script:
+        return None
+    for pattern, is_arrow in ((_DATA_FUNCTION, False), (_DATA_ARROW, True)):
+        for match in pattern.finditer(script):
+            reader = _Reader(script, match.end())
+            try:
+                if not is_arrow and not reader.skip_until("}", stop_at_return=True):
+                    continue
+                if not is_arrow:
+                    reader.pos += len("return")
+                state, _ = parse_value(script, reader.pos)
+            except (JSSyntaxError, ValueError, IndexError, RecursionError):
+                continue
+            if isinstance(state, dict):
+                return state
+    return None
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Deterministic generator of large synthetic Vue/Tailwind pages.
+
+The pages follow html_screens/*.html and the Caspit page: an RTL Hebrew
+document with a header, a navigate() menu, a Vue app with tab buttons
+(@click="activeTab = '...'") and v-show tab panels holding cards, headings,
+buttons, labelled v-model inputs, v-for lists and images, plus the
+createApp({ data() { ... } }) script the converters extract state from.
+
+Everything comes from random.Random(seed), so a given seed and set of knobs
+always produces the same bytes on every machine:
+
+    python synthetic_pages.py OUT_DIR [--pages N] [--seed S] [--elements N]
+                              [--depth N] [--tabs N] [--lists N] [--inputs N] [--images N]
+
+With --write-images, the referenced images are written next to the pages as
+small PNG files (also deterministic).
+"""
+import random
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+WORDS = [
+    "מסך", "הגדרות", "חיבור", "שרת", "מסוף", "עסקה", "תשלום", "סכום", "אישור", "ביטול",
+    "היסטוריה", "קבצים", "סטטוס", "בדיקה", "רשת", "מצלמה", "מפה", "התראות", "אחסון", "חיישנים",
+    "משתמש", "פרטים", "שמירה", "טעינה", "שליחה", "קבלה", "דוח", "יומן", "מספר", "תאריך",
+]
+COLORS = ["blue", "green", "purple", "red", "yellow", "indigo", "pink", "teal", "orange", "gray"]
+CARD_CLASSES = [
+    "bg-white rounded-lg shadow p-6",
+    "bg-white rounded-lg shadow-md p-4",
+    "p-4 bg-{color}-50 rounded",
+    "bg-gray-50 rounded-xl p-3 mb-4",
+]
+LAYOUT_CLASSES = [
+    "space-y-4", "flex gap-2", "flex flex-col gap-4", "grid grid-cols-2 gap-4",
+    "grid grid-cols-3 gap-2", "flex justify-between items-center", "mb-4 space-y-2",
+]
+# Deeper levels are not indented further, so --depth 10000 stays a sane size
+MAX_INDENT = 16
+
+NAV_SCREENS = ["home", "map", "image", "camera", "contacts", "notifications", "storage",
+               "sensors", "network", "settings"]
+
+DEFAULTS = {
+    "elements": 2000,   # approximate number of elements in the body
+    "depth": 8,         # deepest nesting of wrapper divs (at least one branch reaches it)
+    "tabs": 6,
+    "lists": 4,         # v-for lists
+    "inputs": 40,       # labelled v-model inputs
+    "images": 10,
+}
+
+
+class _PageBuilder:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.parts = []
+        self.elements = 0
+        self.state = {"activeTab": None}
+        self.methods = set()
+
+    def words(self, low=1, high=4):
+        return " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def tag(self, indent, html, count=1):
+        self.parts.append(_pad(indent) + html)
+        self.elements += count
+
+    def close(self, indent, name="div"):
+        self.parts.append(_pad(indent) + f"</{name}>")
+
+    # --- content blocks ------------------------------------------------
+    def heading(self, indent):
+        level = self.rng.choice(["h2", "h3"])
+        size = "text-xl" if level == "h2" else "text-sm"
+        self.tag(indent, f'<{level} class="{size} font-bold mb-2">{self.words()}</{level}>')
+
+    def paragraph(self, indent):
+        color = self.rng.choice(["text-gray-700", "text-gray-600", "text-gray-500"])
+        self.tag(indent, f'<p class="{color} mb-4">{self.words(3, 10)}</p>')
+
+    def button(self, indent):
+        color = self.rng.choice(COLORS)
+        method = f"action{self.rng.randint(0, 199)}"
+        self.methods.add(method)
+        self.tag(indent, f'<button @click="{method}()" class="px-4 py-2 bg-{color}-500 text-white '
+                         f'rounded hover:bg-{color}-600">{self.words(1, 3)}</button>')
+
+    def input(self, indent, index):
+        key = f"field{index}"
+        kind = self.rng.choice(["text", "number", "checkbox"])
+        if kind == "number":
+            self.state[key] = self.rng.randint(0, 10000)
+            model = f"v-model.number=\"form.{key}\""
+        elif kind == "checkbox":
+            self.state[key] = self.rng.random() < 0.5
+            model = f"v-model=\"form.{key}\""
+        else:
+            self.state[key] = self.words(1, 2)
+            model = f"v-model=\"form.{key}\""
+        self.tag(indent, '<div>')
+        self.tag(indent + 1, f'<label for="{key}" class="block text-sm font-medium mb-1">{self.words(1, 3)}</label>')
+        self.tag(indent + 1, f'<input id="{key}" {model} type="{kind}" class="input" '
+                             f'placeholder="{self.words(1, 2)}">')
+        self.close(indent)
+
+    def vfor_list(self, indent, index):
+        name = f"items{index}"
+        self.state[name] = [self.words(1, 2) for _ in range(self.rng.randint(2, 6))]
+        self.tag(indent, '<ul class="space-y-2">')
+        self.tag(indent + 1, f'<li v-for="(item, i) in {name}" :key="i" class="p-2 bg-gray-50 rounded">'
+                             '{{ item }}</li>')
+        self.close(indent, "ul")
+
+    def image(self, indent, index):
+        self.tag(indent, f'<img src="images/img_{index:03d}.png" alt="{self.words(1, 2)}" '
+                         f'class="rounded-lg max-w-full">')
+
+
+def _pad(indent):
+    return "    " * min(indent, MAX_INDENT)
+
+
+def _distribute(total, buckets, rng):
+    """Split total into buckets random non-negative parts"""
+    if buckets <= 0:
+        return []
+    cuts = sorted(rng.randint(0, total) for _ in range(buckets - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def generate_page(seed=0, title=None, **knobs) -> str:
+    """
+    Generate one page. Knobs (see DEFAULTS): elements, depth, tabs, lists,
+    inputs, images.
+    """
+    options = {**DEFAULTS, **knobs}
+    unknown = set(options) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown knobs: {', '.join(sorted(unknown))}")
+
+    rng = random.Random(seed)
+    page = _PageBuilder(rng)
+    tabs = [f"tab{i}" for i in range(max(options["tabs"], 1))]
+    page.state["activeTab"] = tabs[0]
+    title = title or f"{page.words(1, 2)} {seed}"
+
+    # Special blocks are spread over the tabs up front so every knob is honoured
+    specials = (["input"] * options["inputs"] + ["list"] * options["lists"]
+                + ["image"] * options["images"])
+    rng.shuffle(specials)
+    per_tab_specials = [[] for _ in tabs]
+    for i, block in enumerate(specials):
+        per_tab_specials[i % len(tabs)].append(block)
+    counters = {"input": 0, "list": 0, "image": 0}
+
+    page.tag(0, '<body class="bg-gray-100">')
+    page.tag(1, '<div id="app" v-cloak>')
+    page.tag(2, '<header class="bg-white shadow-lg p-4 mb-4">')
+    page.tag(3, f'<h1 class="text-2xl font-bold text-center">{title}</h1>')
+    page.parts.append("        </header>")
+    page.tag(2, '<nav class="bg-white shadow-lg p-4 mb-4">')
+    page.tag(3, '<div class="flex flex-wrap gap-2 justify-center">')
+    for screen, color in zip(NAV_SCREENS, COLORS):
+        page.tag(4, f'<button onclick="navigate(\'{screen}\')" class="px-4 py-2 bg-{color}-500 '
+                    f'text-white rounded hover:bg-{color}-600">{page.words(1, 1)}</button>')
+    page.parts.append("            </div>")
+    page.parts.append("        </nav>")
+
+    page.tag(2, '<main class="container mx-auto">')
+    page.tag(3, '<div class="flex border-b border-gray-200">')
+    for tab in tabs:
+        page.tag(4, f'<button @click="activeTab = \'{tab}\'" '
+                    f':class="activeTab === \'{tab}\' ? \'tab-active\' : \'tab-inactive\'" '
+                    f'class="tab-button">{page.words(1, 2)}</button>')
+    page.parts.append("            </div>")
+
+    # Whatever the header, nav and tab bar didn't use is split over the tabs
+    budgets = _distribute(max(options["elements"] - page.elements - len(tabs), 0), len(tabs), rng)
+
+    for tab_index, tab in enumerate(tabs):
+        page.tag(3, f'<div v-show="activeTab === \'{tab}\'" class="space-y-4">')
+        blocks = per_tab_specials[tab_index]
+        tab_end = page.elements + budgets[tab_index]
+        # The first tab always holds one branch nested to the full depth
+        deep_branch = tab_index == 0
+        indent = 4
+        while blocks or page.elements < tab_end or deep_branch:
+            if deep_branch:
+                depth = max(options["depth"], 1)
+            else:
+                left = max((tab_end - page.elements) // 2, 1)
+                depth = min(rng.randint(1, max(options["depth"], 1)), left)
+            deep_branch = False
+            wrappers = []
+            for level in range(depth):
+                classes = rng.choice(CARD_CLASSES if level == 0 else LAYOUT_CLASSES)
+                classes = classes.format(color=rng.choice(COLORS))
+                page.tag(indent + level, f'<div class="{classes}">')
+                wrappers.append(indent + level)
+            inner = indent + depth
+            for _ in range(rng.randint(1, 12)):
+                if blocks and (page.elements >= tab_end or rng.random() < 0.3):
+                    block = blocks.pop()
+                elif page.elements < tab_end:
+                    block = "filler"
+                else:
+                    break
+                if block == "input":
+                    page.input(inner, counters["input"])
+                    counters["input"] += 1
+                elif block == "list":
+                    page.vfor_list(inner, counters["list"])
+                    counters["list"] += 1
+                elif block == "image":
+                    page.image(inner, counters["image"])
+                    counters["image"] += 1
+                else:
+                    rng.choice([page.heading, page.paragraph, page.paragraph, page.button])(inner)
+            for level_indent in reversed(wrappers):
+                page.close(level_indent)
+        page.parts.append("            </div>")
+    page.parts.append("        </main>")
+    page.parts.append("    </div>")
+
+    body = "\n".join(page.parts)
+    return _document(title, body, page.state, sorted(page.methods))
+
+
+def _js_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, list):
+        return "[" + ", ".join(_js_value(v) for v in value) + "]"
+    return "'" + str(value).replace("'", "\\'") + "'"
+
+
+def _document(title, body, state, methods):
+    form = {k: v for k, v in state.items() if k.startswith("field")}
+    lists = {k: v for k, v in state.items() if k.startswith("items")}
+    data = [f"                    activeTab: {_js_value(state['activeTab'])},"]
+    data.append("                    form: {")
+    data += [f"                        {k}: {_js_value(v)}," for k, v in form.items()]
+    data.append("                    },")
+    data += [f"                    {k}: {_js_value(v)}," for k, v in lists.items()]
+    method_lines = [
+        f"                {name}() {{ console.log('{name}'); }},"
+        for name in methods
+    ]
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="he" dir="rtl">',
+        "<head>",
+        '    <meta charset="UTF-8">',
+        '    <meta name="viewport" content="width=device-width, initial-scale=1.0">',
+        f"    <title>{title}</title>",
+        '    <script src="https://cdn.tailwindcss.com"></script>',
+        '    <script src="https://unpkg.com/vue@3/dist/vue.global.js"></script>',
+        "</head>",
+        body,
+        "",
+        "    <script>",
+        "        function navigate(screen) {",
+        "            window.location.href = screen + '.html';",
+        "        }",
+        "",
+        "        const { createApp } = Vue;",
+        "",
+        "        createApp({",
+        "            data() {",
+        "                return {",
+        *data,
+        "                }",
+        "            },",
+        "            methods: {",
+        *method_lines,
+        "            }",
+        "        }).mount('#app');",
+        "    </script>",
+        "</body>",
+        "</html>",
+        "",
+    ])
+
+
+def png_bytes(width: int, height: int, rgb) -> bytes:
+    """A solid-color RGB PNG"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height, 9))
+            + chunk(b"IEND", b""))
+
+
+def write_pages(out_dir, pages=1, seed=0, write_images=False, **knobs):
+    """Write pages page_000.html ... into out_dir, returns their paths"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(pages):
+        path = out_dir / f"page_{i:03d}.html"
+        path.write_text(generate_page(seed=seed + i, title=f"דף {i}", **knobs), encoding="utf-8")
+        paths.append(path)
+
+    if write_images:
+        rng = random.Random(seed)
+        images_dir = out_dir / "images"
+        images_dir.mkdir(exist_ok=True)
+        for i in range(knobs.get("images", DEFAULTS["images"])):
+            size = rng.choice([64, 128, 256, 512])
+            color = [rng.randint(0, 255) for _ in range(3)]
+            (images_dir / f"img_{i:03d}.png").write_bytes(png_bytes(size, size, color))
+    return paths
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic Vue/Tailwind pages")
+    parser.add_argument("out_dir")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    for knob, default in DEFAULTS.items():
+        parser.add_argument(f"--{knob}", type=int, default=default, help=f"(default: {default})")
+    parser.add_argument("--write-images", action="store_true", help="also write the referenced images")
+    args = parser.parse_args()
+
+    knobs = {knob: getattr(args, knob) for knob in DEFAULTS}
+    paths = write_pages(args.out_dir, args.pages, args.seed, args.write_images, **knobs)
+    total = sum(p.stat().st_size for p in paths)
+    print(f"Wrote {len(paths)} pages ({total / 1024:.1f} KB) to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
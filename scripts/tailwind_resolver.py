@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tailwind class resolver shared by all converters.
+
+All lookups go through precomputed tables built once at import: the full
+Tailwind v3 color palette (the pages load the v3 Play CDN) for text-* and
+bg-*, plus the spacing (p-*, gap-*), font size, border radius and shadow
+scales, and the flex/grid layout classes the runtime understands. A class
+list is resolved in one pass with a dict lookup per class, and the result
+is memoized per class string - real pages repeat the same class strings
+over and over.
+
+Classes with a variant prefix (hover:, md:, dark: ...) and classes the
+runtime has no property for are ignored. When several classes set the same
+property the last one wins in resolve(); first_value() returns the first
+one (HTMLToZipConverter's precedence).
+
+Colors are lowercase hex, as Tailwind writes them; style_and_layout()
+returns them uppercase for the runtime converters.
+"""
+from functools import lru_cache
+
+# Tailwind v3 default palette, shades 50 100 200 ... 900 950
+SHADES = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900, 950)
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "stone": "fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "lime": "f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "fuchsia": "fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+BASE_COLORS = {"white": "#ffffff", "black": "#000000"}
+
+# Spacing scale in px (1 unit = 4px)
+SPACING = {
+    "0": 0, "px": 1, "0.5": 2, "1": 4, "1.5": 6, "2": 8, "2.5": 10, "3": 12, "3.5": 14,
+    "4": 16, "5": 20, "6": 24, "7": 28, "8": 32, "9": 36, "10": 40, "11": 44, "12": 48,
+    "14": 56, "16": 64, "20": 80, "24": 96, "28": 112, "32": 128, "36": 144, "40": 160,
+    "44": 176, "48": 192, "52": 208, "56": 224, "60": 240, "64": 256, "72": 288,
+    "80": 320, "96": 384,
+}
+
+FONT_SIZES = {
+    "xs": 12, "sm": 14, "base": 16, "lg": 18, "xl": 20, "2xl": 24, "3xl": 30,
+    "4xl": 36, "5xl": 48, "6xl": 60, "7xl": 72, "8xl": 96, "9xl": 128,
+}
+
+# "" is the bare class (rounded / shadow)
+RADII = {"none": 0, "sm": 2, "": 4, "md": 6, "lg": 8, "xl": 12, "2xl": 16, "3xl": 24, "full": 9999}
+RADIUS_SIDES = ("", "t", "r", "b", "l", "s", "e", "tl", "tr", "br", "bl", "ss", "se", "es", "ee")
+
+# Shadow -> Material elevation
+ELEVATIONS = {"none": 0, "inner": 0, "sm": 1, "": 2, "md": 4, "lg": 8, "xl": 12, "2xl": 16}
+
+MAIN_AXIS = ("normal", "start", "end", "center", "between", "around", "evenly", "stretch")
+CROSS_AXIS = ("start", "end", "center", "baseline", "stretch")
+GRID_COLUMNS = 12
+
+# Properties that go to the runtime's "style", the rest is layout
+STYLE_PROPERTIES = ("padding", "radius", "elevation", "background")
+LAYOUT_PROPERTIES = ("type", "gap", "columns", "mainAxis", "crossAxis")
+
+
+def _scale(prefix, scale):
+    return {
+        f"{prefix}-{name}" if name else prefix: value
+        for name, value in scale.items()
+    }
+
+
+def _build_table():
+    """class name -> ((property, value), ...)"""
+    table = {}
+
+    colors = dict(BASE_COLORS)
+    for name, hexes in PALETTE.items():
+        for shade, hex_value in zip(SHADES, hexes.split()):
+            colors[f"{name}-{shade}"] = f"#{hex_value}"
+    for name, value in colors.items():
+        table[f"text-{name}"] = (("color", value),)
+        table[f"bg-{name}"] = (("background", value),)
+
+    for name, px in FONT_SIZES.items():
+        table[f"text-{name}"] = (("fontSize", px),)
+    for cls, px in _scale("p", SPACING).items():
+        table[cls] = (("padding", px),)
+    for cls, px in _scale("gap", SPACING).items():
+        table[cls] = (("gap", px),)
+    for side in RADIUS_SIDES:
+        # The runtime has a single radius, side variants use the same scale
+        for cls, px in _scale(f"rounded-{side}" if side else "rounded", RADII).items():
+            table[cls] = (("radius", px),)
+    for cls, elevation in _scale("shadow", ELEVATIONS).items():
+        table[cls] = (("elevation", elevation),)
+
+    table["flex"] = (("type", "row"),)
+    table["flex-col"] = (("type", "column"),)
+    for columns in range(1, GRID_COLUMNS + 1):
+        table[f"grid-cols-{columns}"] = (("type", "grid"), ("columns", columns))
+    table["grid-cols-none"] = table["grid-cols-subgrid"] = (("type", "grid"), ("columns", 2))
+    for value in MAIN_AXIS:
+        table[f"justify-{value}"] = (("mainAxis", value),)
+    for value in CROSS_AXIS:
+        table[f"items-{value}"] = (("crossAxis", value),)
+    return table
+
+
+CLASS_TABLE = _build_table()
+
+
+def _class_string(classes) -> str:
+    if not classes:
+        return ""
+    if isinstance(classes, str):
+        return classes
+    try:
+        return " ".join(classes)
+    except TypeError:
+        return " ".join(c for c in classes if isinstance(c, str))
+
+
+@lru_cache(maxsize=None)
+def resolve(class_str: str) -> dict:
+    """
+    Resolve a class attribute to {property: value}, keys in the order the
+    classes first set them. The result is cached - don't modify it.
+    """
+    props = {}
+    for cls in class_str.split():
+        for prop, value in CLASS_TABLE.get(cls, ()):
+            props[prop] = value
+    return props
+
+
+def first_value(classes, prop: str, default=None):
+    """prop as set by the first class of a class list (or string) that sets it"""
+    for cls in _class_string(classes).split():
+        for name, value in CLASS_TABLE.get(cls, ()):
+            if name == prop:
+                return value
+    return default
+
+
+def resolve_classes(classes) -> dict:
+    """resolve() for a bs4 class list (or string)"""
+    return resolve(_class_string(classes))
+
+
+@lru_cache(maxsize=None)
+def _style_and_layout(class_str: str):
+    style, layout = [], []
+    for prop, value in resolve(class_str).items():
+        if prop in STYLE_PROPERTIES:
+            if prop == "background":
+                value = value.upper()
+            style.append((prop, value))
+        elif prop in LAYOUT_PROPERTIES:
+            layout.append((prop, value))
+    return tuple(style), tuple(layout)
+
+
+def style_and_layout(classes):
+    """
+    (style, layout) dicts for the runtime converters - fresh dicts on every
+    call so callers may modify them.
+    """
+    style, layout = _style_and_layout(_class_string(classes))
+    return dict(style), dict(layout)
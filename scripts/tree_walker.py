@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Explicit-stack DOM traversal shared by the runtime converters.
+
+The converters turn each element into a node before looking at its
+children (enter) and complete it once the children are converted (finish).
+Driving that from a stack instead of recursion keeps the output and the
+order of side effects identical (pre-order enter, post-order finish), but
+works on arbitrarily deep markup and skips a Python frame per element.
+"""
+from bs4 import NavigableString, Tag
+
+
+def convert_children(element, enter, finish, text=None):
+    """
+    Convert the children of element, depth first, without recursion.
+
+    Args:
+        enter: enter(tag) -> node, or None to drop the tag and its subtree
+        finish: finish(node, converted_children) -> result; falsy results are dropped
+        text: text(string) -> result for NavigableString children (skipped if None)
+
+    Returns:
+        list of converted children
+    """
+    result = []
+    # Frames: (node, iterator over the element's children, converted children)
+    stack = [(None, iter(element.children), result)]
+    while stack:
+        node, children_iter, children = stack[-1]
+        for child in children_iter:
+            if isinstance(child, NavigableString):
+                if text is not None:
+                    converted = text(child)
+                    if converted:
+                        children.append(converted)
+            elif isinstance(child, Tag):
+                child_node = enter(child)
+                if child_node is not None:
+                    stack.append((child_node, iter(child.children), []))
+                    break
+        else:
+            stack.pop()
+            if stack:
+                converted = finish(node, children)
+                if converted:
+                    stack[-1][2].append(converted)
+    return result
+
+
+def convert_element(element, enter, finish, text=None):
+    """Convert one element and its subtree (see convert_children)"""
+    node = enter(element)
+    if node is None:
+        return None
+    return finish(node, convert_children(element, enter, finish, text))